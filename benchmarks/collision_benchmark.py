@@ -0,0 +1,123 @@
+"""
+Measure edge collision checking cost as the number of obstacles grows.
+
+Scenes scatter random rectangles at a constant density over bounds that grow
+with the obstacle count. Each scene is checked with the grid broadphase, both
+one edge at a time and in RRT*-style batches of edges sharing an end point,
+and with a single-cell grid, which tests every obstacle for every edge.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/collision_benchmark.py
+"""
+
+import random
+import time
+
+import numpy as np
+
+from motion_planning.config.rrt_config import COLLISION_GRID_CELL_SIZE, DELTA
+from motion_planning.rrt.collision import CollisionChecker
+
+OBSTACLE_COUNTS = [10, 100, 1000, 5000]
+# Area of the scene per obstacle
+AREA_PER_OBSTACLE = 500
+NUM_EDGES = 2000
+BATCH_SIZE = 32
+
+
+def random_scene(num_obstacles: int):
+    side = (num_obstacles * AREA_PER_OBSTACLE) ** 0.5
+    obstacles = [
+        (
+            (random.random() * side, random.random() * side),
+            random.uniform(1, 10),
+            random.uniform(1, 10),
+        )
+        for _ in range(num_obstacles)
+    ]
+    return obstacles, side
+
+
+def random_edges(side: float, count: int):
+    """
+    Return edges of length up to DELTA. Every BATCH_SIZE consecutive edges
+    share an end point, like RRT*'s choose-parent candidates.
+    """
+    ends = np.repeat(np.random.rand(count // BATCH_SIZE, 2) * side, BATCH_SIZE, axis=0)
+    angles = np.random.rand(len(ends)) * 2 * np.pi
+    lengths = np.random.rand(len(ends)) * DELTA
+    starts = ends + lengths[:, None] * np.column_stack((np.cos(angles), np.sin(angles)))
+    return starts, ends
+
+
+def time_per_edge(check, starts, ends):
+    start = time.perf_counter()
+    result = check(starts, ends)
+    return result, (time.perf_counter() - start) / len(starts)
+
+
+def check_one_at_a_time(checker):
+    def check(starts, ends):
+        return np.array(
+            [checker.segment_free(tuple(a), tuple(b)) for a, b in zip(starts, ends)]
+        )
+
+    return check
+
+
+def check_in_batches(checker):
+    def check(starts, ends):
+        return np.concatenate(
+            [
+                checker.segments_free(starts[i : i + BATCH_SIZE], ends[i])
+                for i in range(0, len(starts), BATCH_SIZE)
+            ]
+        )
+
+    return check
+
+
+def main():
+    random.seed(0)
+    np.random.seed(0)
+    print(
+        "{:>10} {:>18} {:>18} {:>18} {:>18}".format(
+            "obstacles",
+            "no grid (us)",
+            "grid (us)",
+            "no grid batch (us)",
+            "grid batch (us)",
+        )
+    )
+    for count in OBSTACLE_COUNTS:
+        obstacles, side = random_scene(count)
+        starts, ends = random_edges(side, NUM_EDGES)
+        grid = CollisionChecker(obstacles, COLLISION_GRID_CELL_SIZE)
+        no_grid = CollisionChecker(obstacles, side * 2)
+
+        no_grid_result, no_grid_time = time_per_edge(
+            check_one_at_a_time(no_grid), starts, ends
+        )
+        grid_result, grid_time = time_per_edge(check_one_at_a_time(grid), starts, ends)
+        assert (no_grid_result == grid_result).all(), "collision results differ"
+
+        no_grid_batch, no_grid_batch_time = time_per_edge(
+            check_in_batches(no_grid), starts, ends
+        )
+        grid_batch, grid_batch_time = time_per_edge(
+            check_in_batches(grid), starts, ends
+        )
+        assert (no_grid_batch == grid_batch).all(), "batched results differ"
+        print(
+            "{:>10} {:>18.2f} {:>18.2f} {:>18.2f} {:>18.2f}".format(
+                count,
+                no_grid_time * 1e6,
+                grid_time * 1e6,
+                no_grid_batch_time * 1e6,
+                grid_batch_time * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measure how long anytime RRT* takes to repair its tree after a small
+obstacle appears, moves and disappears, for trees of different sizes.
+
+The repair only looks at nodes near the change and below it, so its latency
+should stay about the same as the tree grows, unlike growing a new tree,
+whose time is shown for comparison.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/dynamic_obstacles_benchmark.py
+"""
+
+import random
+import time
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from motion_planning.rrt.profiler import PhaseProfiler
+
+TREE_STEPS = [2000, 8000, 32000]
+# A 4x4 obstacle in the corridor the paths to the goal go through, then
+# moved along it
+OBSTACLE = ((48, 46), 4, 4)
+MOVED_OBSTACLE = ((54, 46), 4, 4)
+SEED = 0
+
+
+def grow(steps: int) -> AnytimeRRTStar:
+    random.seed(SEED)
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    # Keep every node, so the tree really has all these steps' nodes
+    rrt.branch_and_bound_interval = None
+    for _ in range(steps):
+        rrt.step(visualize=False)
+    return rrt
+
+
+def timed(change) -> float:
+    start_time = time.perf_counter()
+    change()
+    return (time.perf_counter() - start_time) * 1000
+
+
+def main():
+    print(
+        "{:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+            "nodes", "add (ms)", "move (ms)", "remove (ms)", "orphaned", "grow (ms)"
+        )
+    )
+    for steps in TREE_STEPS:
+        start_time = time.perf_counter()
+        rrt = grow(steps)
+        grow_time = (time.perf_counter() - start_time) * 1000
+        nodes = len(rrt.tree)
+        rrt.profiler = PhaseProfiler()
+        obstacle_id = None
+
+        def add():
+            nonlocal obstacle_id
+            obstacle_id = rrt.add_obstacle(OBSTACLE, visualize=False)
+
+        add_time = timed(add)
+        move_time = timed(
+            lambda: rrt.move_obstacle(obstacle_id, MOVED_OBSTACLE, visualize=False)
+        )
+        remove_time = timed(lambda: rrt.remove_obstacle(obstacle_id, visualize=False))
+        print(
+            "{:>8} {:>10.2f} {:>10.2f} {:>10.2f} {:>10} {:>10.0f}".format(
+                nodes,
+                add_time,
+                move_time,
+                remove_time,
+                rrt.profiler.counters.get("nodes_orphaned", 0),
+                grow_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the best path cost RRT* reaches after a given number of iterations
+with informed sampling off and on, averaged over several seeds.
+
+Both runs with the same seed are identical up to the first solution, since
+informed sampling only changes where points are sampled after that.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/informed_sampling_benchmark.py
+"""
+
+from math import inf
+import random
+
+from motion_planning.benchmark.scenarios import SCENARIOS
+from motion_planning.rrt.rrt_star import RRTStar
+
+SCENARIO_NAMES = ["default", "cluttered", "large"]
+# Iteration counts at which to report cost
+CHECKPOINTS = [2000, 4000, 8000, 16000]
+SEEDS = [0, 1, 2]
+
+
+def costs(scenario, seed: int, informed: bool):
+    """
+    Return the best path cost at each checkpoint for one run.
+    """
+    random.seed(seed)
+    rrt = RRTStar(
+        scenario.start,
+        scenario.goal,
+        obstacles=scenario.obstacles,
+        bounds=scenario.bounds,
+    )
+    rrt.informed_sampling = informed
+    results = []
+    for steps in range(1, CHECKPOINTS[-1] + 1):
+        rrt.step(visualize=False)
+        if steps in CHECKPOINTS:
+            results.append(rrt.best_cost_to_goal())
+    return results
+
+
+def mean_costs(scenario, informed: bool):
+    runs = [costs(scenario, seed, informed) for seed in SEEDS]
+    return [sum(run[i] for run in runs) / len(runs) for i in range(len(CHECKPOINTS))]
+
+
+def main():
+    print(
+        "{:>10} {:>10} {:>12} {:>12} {:>10}".format(
+            "scenario", "steps", "uniform", "informed", "change"
+        )
+    )
+    for name in SCENARIO_NAMES:
+        uniform = mean_costs(SCENARIOS[name], informed=False)
+        informed = mean_costs(SCENARIOS[name], informed=True)
+        for steps, uniform_cost, informed_cost in zip(CHECKPOINTS, uniform, informed):
+            if uniform_cost < inf and informed_cost < inf:
+                change = "{:.1f}%".format((informed_cost / uniform_cost - 1) * 100)
+            else:
+                change = "-"
+            print(
+                "{:>10} {:>10} {:>12.2f} {:>12.2f} {:>10}".format(
+                    name, steps, uniform_cost, informed_cost, change
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare RRT, RRT* and RRT-Connect in configuration spaces of more than two
+dimensions: steps and time to the first solution, time per step, and the
+cost of that solution.
+
+Every space is a cube with a wall across the middle of the first axis and
+a gap at the top of the second, so the straight line from the start to the
+goal is blocked in any number of dimensions.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/nd_planning_benchmark.py
+"""
+
+from math import inf
+from statistics import mean
+import time
+
+from motion_planning.benchmark.harness import PLANNERS
+from motion_planning.rrt.collision import BoxCollisionChecker
+from motion_planning.rrt.sampling import UniformSampler
+
+PLANNER_NAMES = ["rrt", "rrt_star", "rrt_connect"]
+DIMENSIONS = [2, 3, 6]
+SEEDS = range(5)
+MAX_STEPS = 20000
+SIDE = 100.0
+
+
+def make_planner(planner: str, dim: int, seed: int):
+    wall = (
+        (0.45 * SIDE,) + (0.0,) * (dim - 1),
+        (0.55 * SIDE, 0.7 * SIDE) + (SIDE,) * (dim - 2),
+    )
+    return PLANNERS[planner](
+        (0.1 * SIDE,) * dim,
+        ((0.8 * SIDE,) * dim, (SIDE,) * dim),
+        collision_map=BoxCollisionChecker([wall]),
+        sampler=UniformSampler(seed),
+        bounds=((0.0,) * dim, (SIDE,) * dim),
+    )
+
+
+def run(planner: str, dim: int, seed: int):
+    rrt = make_planner(planner, dim, seed)
+    start_time = time.perf_counter()
+    for steps in range(1, MAX_STEPS + 1):
+        rrt.step(visualize=False)
+        if rrt.best_goal_node is not None:
+            break
+    elapsed = time.perf_counter() - start_time
+    return {
+        "solved": rrt.best_goal_node is not None,
+        "steps": steps,
+        "time": elapsed,
+        "us_per_step": elapsed / steps * 1e6,
+        "cost": rrt.best_cost_to_goal(),
+    }
+
+
+def main():
+    print(
+        "{:>4} {:>12} {:>8} {:>12} {:>12} {:>10} {:>10}".format(
+            "dim", "planner", "solved", "mean steps", "mean time", "us/step", "cost"
+        )
+    )
+    for dim in DIMENSIONS:
+        for planner in PLANNER_NAMES:
+            runs = [run(planner, dim, seed) for seed in SEEDS]
+            solved = [run for run in runs if run["solved"]]
+            print(
+                "{:>4} {:>12} {:>8} {:>12.0f} {:>12.4f} {:>10.1f} {:>10.1f}".format(
+                    dim,
+                    planner,
+                    "{}/{}".format(len(solved), len(runs)),
+                    mean(run["steps"] for run in runs),
+                    mean(run["time"] for run in runs),
+                    mean(run["us_per_step"] for run in runs),
+                    mean(run["cost"] for run in solved) if solved else inf,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the brute-force and grid neighbor indexes as the tree grows.
+
+For each tree size, builds a tree of that many uniformly random points and
+indexes it with both indexes, then times nearest and radius queries at random query points and
+checks that both indexes return the same neighbors.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/neighbor_index_benchmark.py
+"""
+
+import random
+import time
+
+from motion_planning.config.rrt_config import (
+    BOUNDS,
+    DELTA,
+    NEIGHBOR_INDEX_CELL_SIZE,
+)
+from motion_planning.rrt.neighbor_index import BruteForceIndex, GridIndex
+from motion_planning.rrt.tree import Tree
+
+TREE_SIZES = [1000, 2000, 5000, 10000, 20000, 50000]
+NUM_QUERIES = 200
+
+
+def random_point(scale: float):
+    _, (width, height) = BOUNDS
+    return random.random() * width * scale, random.random() * height * scale
+
+
+def time_queries(index, queries, radius):
+    start = time.perf_counter()
+    nearest = [index.nearest(q) for q in queries]
+    nearest_time = time.perf_counter() - start
+    start = time.perf_counter()
+    within = [sorted(index.within(q, radius)) for q in queries]
+    within_time = time.perf_counter() - start
+    return nearest, within, nearest_time / len(queries), within_time / len(queries)
+
+
+def main():
+    random.seed(0)
+    print(
+        "{:>8} {:>16} {:>16} {:>16} {:>16}".format(
+            "points",
+            "brute nn (us)",
+            "grid nn (us)",
+            "brute rad (us)",
+            "grid rad (us)",
+        )
+    )
+    for size in TREE_SIZES:
+        # Grow the sampled area with the tree so that the density, and so the
+        # number of points per radius query, stays close to a real RRT's.
+        scale = (size / 1000) ** 0.5
+        points = [random_point(scale) for _ in range(size)]
+        queries = [random_point(scale) for _ in range(NUM_QUERIES)]
+        tree = Tree(points[0])
+        for point in points[1:]:
+            tree.add(point, tree.root, 0.0)
+        brute, grid = BruteForceIndex(tree), GridIndex(tree, NEIGHBOR_INDEX_CELL_SIZE)
+        for node in tree.nodes():
+            brute.insert(int(node))
+            grid.insert(int(node))
+
+        brute_nn, brute_within, brute_nn_time, brute_within_time = time_queries(
+            brute, queries, DELTA
+        )
+        grid_nn, grid_within, grid_nn_time, grid_within_time = time_queries(
+            grid, queries, DELTA
+        )
+        assert brute_nn == grid_nn, "nearest neighbors differ"
+        assert brute_within == grid_within, "radius neighbors differ"
+        print(
+            "{:>8} {:>16.1f} {:>16.1f} {:>16.1f} {:>16.1f}".format(
+                size,
+                brute_nn_time * 1e6,
+                grid_nn_time * 1e6,
+                brute_within_time * 1e6,
+                grid_within_time * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare anytime RRT* with different node budgets: how big the tree gets,
+how much is evicted, and what that costs in path quality and speed.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/node_budget_benchmark.py
+"""
+
+from math import inf
+from statistics import mean
+import random
+import time
+
+from motion_planning.benchmark.scenarios import SCENARIOS
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+
+SCENARIO_NAMES = ["cluttered", "large"]
+NODE_BUDGETS = [None, 4000, 1000, 250]
+NUM_STEPS = 10000
+SEEDS = [0, 1, 2]
+
+
+def run(scenario, node_budget, seed: int):
+    random.seed(seed)
+    rrt = AnytimeRRTStar(
+        scenario.start,
+        scenario.goal,
+        obstacles=scenario.obstacles,
+        bounds=scenario.bounds,
+    )
+    rrt.node_budget = node_budget
+    peak_nodes = 0
+    first_solution = None
+    start_time = time.perf_counter()
+    for steps in range(1, NUM_STEPS + 1):
+        rrt.step(visualize=False)
+        peak_nodes = max(peak_nodes, len(rrt.tree))
+        if first_solution is None and rrt.best_goal_node is not None:
+            first_solution = steps
+    elapsed = time.perf_counter() - start_time
+    footprint = rrt.footprint()
+    return {
+        "peak_nodes": peak_nodes,
+        "tree_kb": footprint.tree_bytes / 1024,
+        "evicted": footprint.nodes_evicted,
+        "first_solution": first_solution if first_solution is not None else inf,
+        "cost": rrt.best_cost_to_goal(),
+        "steps_per_second": NUM_STEPS / elapsed,
+    }
+
+
+def main():
+    columns = ["peak_nodes", "tree_kb", "evicted", "first_solution", "cost"]
+    print(
+        "{:>10} {:>8}".format("scenario", "budget")
+        + "".join("{:>15}".format(column) for column in columns)
+        + "{:>10}".format("steps/s")
+    )
+    for name in SCENARIO_NAMES:
+        for node_budget in NODE_BUDGETS:
+            runs = [run(SCENARIOS[name], node_budget, seed) for seed in SEEDS]
+            print(
+                "{:>10} {:>8}".format(name, str(node_budget))
+                + "".join(
+                    "{:>15.1f}".format(mean(run[column] for run in runs))
+                    for column in columns
+                )
+                + "{:>10.0f}".format(mean(run["steps_per_second"] for run in runs))
+            )
+
+
+if __name__ == "__main__":
+    main()
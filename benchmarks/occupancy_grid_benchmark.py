@@ -0,0 +1,125 @@
+"""
+Measure startup time and memory of planning on a multi-GB occupancy grid,
+memory-mapped versus read fully into RAM.
+
+Writes a GRID_SIDE x GRID_SIDE uint8 grid of random rectangular obstacles
+(GRID_SIDE ** 2 bytes, 1.6 GB by default) to a temporary directory as both a
+.npy file and a raw file, then for each way of loading it reports the time
+to load, the resident memory after loading and after running RRT*, and the
+planner's steps per second.
+
+Resident memory is read from /proc, so this needs Linux.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/occupancy_grid_benchmark.py
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from motion_planning.rrt.occupancy_grid import OccupancyGrid
+from motion_planning.rrt.rrt_star import RRTStar
+
+GRID_SIDE = 40000
+NUM_OBSTACLES = 20000
+# World units per cell, so the map is GRID_SIDE * RESOLUTION units across
+RESOLUTION = 0.025
+NUM_STEPS = 3000
+SEED = 0
+
+
+def resident_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def write_grid(npy_path: str, raw_path: str) -> None:
+    """
+    Write the same random grid as a .npy file and as a raw file. Both start
+    out sparse, so only the obstacles are actually written.
+    """
+    rng = np.random.default_rng(SEED)
+    grid = np.lib.format.open_memmap(
+        npy_path, mode="w+", dtype=np.uint8, shape=(GRID_SIDE, GRID_SIDE)
+    )
+    for _ in range(NUM_OBSTACLES):
+        row, column = rng.integers(0, GRID_SIDE, 2)
+        height, width = rng.integers(GRID_SIDE // 1000, GRID_SIDE // 100, 2)
+        grid[row : row + height, column : column + width] = 1
+    grid.flush()
+    raw = np.memmap(raw_path, dtype=np.uint8, mode="w+", shape=grid.shape)
+    for row in range(0, GRID_SIDE, 1000):
+        raw[row : row + 1000] = grid[row : row + 1000]
+    raw.flush()
+    del grid, raw
+
+
+def plan(grid: OccupancyGrid) -> float:
+    """
+    Run RRT* on the grid and return the steps per second.
+    """
+    random.seed(SEED)
+    extent = grid.extent
+    start = (extent[1] / 2, extent[3] / 2)
+    while not grid.point_free(start):
+        start = (random.uniform(0, extent[1]), random.uniform(0, extent[3]))
+    rrt = RRTStar(
+        start,
+        ((0, 0), (1, 1)),
+        collision_map=grid,
+        bounds=((extent[0], extent[2]), (extent[1], extent[3])),
+    )
+    start_time = time.perf_counter()
+    for _ in range(NUM_STEPS):
+        rrt.step(visualize=False)
+    return NUM_STEPS / (time.perf_counter() - start_time)
+
+
+def measure(name: str, load) -> None:
+    before = resident_mb()
+    start_time = time.perf_counter()
+    grid = load()
+    load_time = time.perf_counter() - start_time
+    after_load = resident_mb()
+    steps_per_second = plan(grid)
+    print(
+        "{:>16} {:>12.3f} {:>16.0f} {:>16.0f} {:>14.0f}".format(
+            name,
+            load_time,
+            after_load - before,
+            resident_mb() - before,
+            steps_per_second,
+        )
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        npy_path = os.path.join(directory, "grid.npy")
+        raw_path = os.path.join(directory, "grid.raw")
+        print("Writing a {0}x{0} grid...".format(GRID_SIDE))
+        write_grid(npy_path, raw_path)
+        print(
+            "{:>16} {:>12} {:>16} {:>16} {:>14}".format(
+                "load", "load (s)", "RSS load (MB)", "RSS plan (MB)", "steps/s"
+            )
+        )
+        measure("memmap .npy", lambda: OccupancyGrid.from_npy(npy_path, RESOLUTION))
+        measure(
+            "memmap raw",
+            lambda: OccupancyGrid.from_raw(
+                raw_path, (GRID_SIDE, GRID_SIDE), resolution=RESOLUTION
+            ),
+        )
+        measure("read .npy", lambda: OccupancyGrid(np.load(npy_path), RESOLUTION))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure cache hit rate, per-query latency and throughput of the planning
+service under concurrent load, with and without room to cache trees.
+
+Sends NUM_QUERIES random queries, spread over two maps, a few start regions
+and a few goals, from CLIENTS threads at once. With a memory budget of zero
+only the most recently used tree is kept, so nearly every query grows a new
+tree. Each is run with and without refining paths after they're found.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/planning_service_benchmark.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+from motion_planning.benchmark.scenarios import SCENARIOS
+from motion_planning.rrt.collision import CollisionChecker
+from motion_planning.rrt.planning_service import PlanningService
+
+MAP_NAMES = ["default", "cluttered"]
+# Bottom left corners of the 10x10 start regions queries start in
+START_REGIONS = [(0, 0), (40, 0), (0, 40)]
+GOALS = [((85, 85), (95, 95)), ((85, 40), (95, 50)), ((40, 85), (50, 95))]
+NUM_QUERIES = 120
+CLIENTS = 4
+SEED = 0
+
+
+def make_queries():
+    rng = random.Random(SEED)
+    checkers = {name: CollisionChecker(SCENARIOS[name].obstacles) for name in MAP_NAMES}
+    queries = []
+    while len(queries) < NUM_QUERIES:
+        name = rng.choice(MAP_NAMES)
+        left, bottom = rng.choice(START_REGIONS)
+        start = (rng.uniform(left, left + 10), rng.uniform(bottom, bottom + 10))
+        if checkers[name].point_free(start):
+            queries.append((name, start, rng.choice(GOALS)))
+    return queries
+
+
+def run(memory_budget: int, refine_steps: int):
+    random.seed(SEED)
+    service = PlanningService(memory_budget=memory_budget, refine_steps=refine_steps)
+    for name in MAP_NAMES:
+        scenario = SCENARIOS[name]
+        service.add_map(
+            name,
+            CollisionChecker(scenario.obstacles),
+            scenario.bounds,
+        )
+    with ThreadPoolExecutor(CLIENTS) as pool:
+        list(pool.map(lambda query: service.plan(*query), make_queries()))
+    return service.stats()
+
+
+def main():
+    print(
+        "{:>8} {:>8} {:>10} {:>12} {:>12} {:>12} {:>10}".format(
+            "budget",
+            "refine",
+            "hit rate",
+            "mean (ms)",
+            "p50 (ms)",
+            "p95 (ms)",
+            "queries/s",
+        )
+    )
+    defaults = PlanningService()
+    for refine_steps in [0, defaults.refine_steps]:
+        for name, budget in [("none", 0), ("default", defaults.memory_budget)]:
+            stats = run(budget, refine_steps)
+            print(
+                "{:>8} {:>8} {:>10.2f} {:>12.1f} {:>12.1f} {:>12.1f} {:>10.1f}".format(
+                    name,
+                    refine_steps,
+                    stats.hit_rate,
+                    stats.mean_latency * 1000,
+                    stats.p50_latency * 1000,
+                    stats.p95_latency * 1000,
+                    stats.throughput,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measure how a portfolio of RRT* planners improves as the number of worker
+processes grows: time until the first path is found, and the best path cost
+found within a fixed wall-clock budget.
+
+Each worker count runs one planner per worker with seeds 0..workers-1, so
+larger portfolios include the smaller ones. Speedup is only possible up to
+the number of cores on the machine.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/portfolio_benchmark.py
+"""
+
+import os
+import time
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.portfolio import PlannerConfig, plan_portfolio
+
+WORKER_COUNTS = [1, 2, 4, 8]
+# Seconds each portfolio gets when measuring cost
+TIME_BUDGET = 5.0
+# Times to repeat the first solution measurement, with different seeds
+FIRST_SOLUTION_TRIALS = 5
+# Most steps each planner may take to find the first path
+FIRST_SOLUTION_MAX_STEPS = 20000
+
+
+def time_to_first_solution(workers: int) -> float:
+    """
+    Return the mean wall-clock time for a portfolio of this many planners to
+    find a path, over FIRST_SOLUTION_TRIALS disjoint seed sets.
+    """
+    total = 0
+    for trial in range(FIRST_SOLUTION_TRIALS):
+        configs = [
+            PlannerConfig(seed=trial * workers + worker) for worker in range(workers)
+        ]
+        start_time = time.perf_counter()
+        plan_portfolio(
+            AGENT_START_POSITION,
+            GOAL_POSITION,
+            configs,
+            max_steps=FIRST_SOLUTION_MAX_STEPS,
+            first_solution=True,
+            workers=workers,
+        )
+        total += time.perf_counter() - start_time
+    return total / FIRST_SOLUTION_TRIALS
+
+
+def cost_at_budget(workers: int) -> float:
+    """
+    Return the best path cost a portfolio of this many planners finds
+    within TIME_BUDGET seconds.
+    """
+    configs = [PlannerConfig(seed=worker) for worker in range(workers)]
+    result = plan_portfolio(
+        AGENT_START_POSITION,
+        GOAL_POSITION,
+        configs,
+        time_budget=TIME_BUDGET,
+        workers=workers,
+    )
+    return result.best.cost if result.best is not None else float("inf")
+
+
+def main():
+    print("cores: {}".format(os.cpu_count()))
+    print(
+        "{:>8} {:>24} {:>10} {:>24}".format(
+            "workers",
+            "time to first path (s)",
+            "speedup",
+            "cost at {}s".format(TIME_BUDGET),
+        )
+    )
+    baseline = None
+    for workers in WORKER_COUNTS:
+        first = time_to_first_solution(workers)
+        if baseline is None:
+            baseline = first
+        print(
+            "{:>8} {:>24.3f} {:>10.2f} {:>24.2f}".format(
+                workers, first, baseline / first, cost_at_budget(workers)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare time and steps to the first solution of RRT, RRT* and RRT-Connect on
+maps where a single tree struggles to find the goal.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/rrt_connect_benchmark.py
+"""
+
+from motion_planning.benchmark.harness import run_planner
+from motion_planning.benchmark.scenarios import SCENARIOS
+
+PLANNERS = ["rrt", "rrt_star", "rrt_connect"]
+SCENARIO_NAMES = ["default", "narrow_passage", "maze"]
+SEEDS = range(10)
+MAX_STEPS = 20000
+
+
+def main():
+    print(
+        "{:>16} {:>12} {:>8} {:>16} {:>16}".format(
+            "scenario", "planner", "solved", "mean time (s)", "mean steps"
+        )
+    )
+    for name in SCENARIO_NAMES:
+        for planner in PLANNERS:
+            runs = [
+                run_planner(
+                    planner,
+                    SCENARIOS[name],
+                    seed,
+                    MAX_STEPS,
+                    sample_interval=MAX_STEPS,
+                    measure_memory=False,
+                    stop_at_first_solution=True,
+                )
+                for seed in SEEDS
+            ]
+            solved = [run for run in runs if run["time_to_first_solution"] is not None]
+            print(
+                "{:>16} {:>12} {:>8} {:>16.4f} {:>16.0f}".format(
+                    name,
+                    planner,
+                    "{}/{}".format(len(solved), len(runs)),
+                    sum(run["time_to_first_solution"] for run in solved)
+                    / max(len(solved), 1),
+                    sum(run["steps_to_first_solution"] for run in solved)
+                    / max(len(solved), 1),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare samplers by how many steps RRT needs to find a first path, and by
+how long each sample takes.
+
+RRT* adds the same points as RRT, only with different edges, so it finds
+its first path after the same number of steps. Each sampler is seeded per
+run, so no run depends on the global random number generator.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/sampler_benchmark.py
+"""
+
+from statistics import mean, median
+import time
+
+from motion_planning.benchmark.scenarios import SCENARIOS
+from motion_planning.config.rrt_config import SAMPLER_PREFETCH_BLOCK
+from motion_planning.rrt.rrt import RRT
+from motion_planning.rrt.sampling import (
+    GoalBiasedSampler,
+    HaltonSampler,
+    SobolSampler,
+    UniformSampler,
+)
+
+SAMPLERS = {
+    "uniform": lambda seed: UniformSampler(seed),
+    "uniform prefetch": lambda seed: UniformSampler(
+        seed, prefetch=SAMPLER_PREFETCH_BLOCK
+    ),
+    "halton": lambda seed: HaltonSampler(seed),
+    "sobol": lambda seed: SobolSampler(seed),
+    "goal biased": lambda seed: GoalBiasedSampler(seed=seed),
+}
+SCENARIO_NAMES = ["default", "narrow_passage", "maze", "cluttered"]
+SEEDS = range(10)
+MAX_STEPS = 20000
+# Samples to draw when timing a sampler
+TIMING_SAMPLES = 100000
+
+
+def steps_to_first_solution(scenario, sampler) -> int:
+    rrt = RRT(
+        scenario.start,
+        scenario.goal,
+        obstacles=scenario.obstacles,
+        sampler=sampler,
+        bounds=scenario.bounds,
+    )
+    for steps in range(1, MAX_STEPS + 1):
+        rrt.step(visualize=False)
+        if rrt.best_goal_node is not None:
+            return steps
+    return MAX_STEPS
+
+
+def microseconds_per_sample(make_sampler) -> float:
+    sampler = make_sampler(0)
+    rrt = RRT((0, 0), ((0, 0), (1, 1)))
+    start_time = time.perf_counter()
+    for _ in range(TIMING_SAMPLES):
+        sampler.sample(rrt)
+    return (time.perf_counter() - start_time) / TIMING_SAMPLES * 1e6
+
+
+def main():
+    print(
+        "Steps to first solution (mean / median over {} seeds), at most {}".format(
+            len(SEEDS), MAX_STEPS
+        )
+    )
+    print(
+        "{:>18}".format("sampler")
+        + "".join("{:>18}".format(name) for name in SCENARIO_NAMES)
+        + "{:>12}".format("us/sample")
+    )
+    for name, make_sampler in SAMPLERS.items():
+        row = "{:>18}".format(name)
+        for scenario_name in SCENARIO_NAMES:
+            steps = [
+                steps_to_first_solution(SCENARIOS[scenario_name], make_sampler(seed))
+                for seed in SEEDS
+            ]
+            row += "{:>18}".format("{:.0f} / {:.0f}".format(mean(steps), median(steps)))
+        row += "{:>12.2f}".format(microseconds_per_sample(make_sampler))
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the throughput, in nodes added per second, of step() and
+step_batch() for RRT and RRT* as the tree grows.
+
+Both methods draw the same samples for the same seed, so they build the same
+tree; only the time taken differs.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/step_batch_benchmark.py
+"""
+
+import random
+import time
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.rrt import RRT
+from motion_planning.rrt.rrt_star import RRTStar
+
+# Tree sizes at which to report throughput
+TREE_SIZES = [1000, 5000, 20000]
+BATCH_SIZE = 256
+SEED = 0
+
+
+def throughput(planner_class, batched: bool):
+    """
+    Grow a tree up to each size in TREE_SIZES and return the nodes per
+    second achieved while growing to each size from the previous one.
+    """
+    random.seed(SEED)
+    rrt = planner_class(AGENT_START_POSITION, GOAL_POSITION)
+    results = []
+    for size in TREE_SIZES:
+        start_nodes, start_time = len(rrt.tree), time.perf_counter()
+        while len(rrt.tree) < size:
+            if batched:
+                rrt.step_batch(BATCH_SIZE, visualize=False)
+            else:
+                for _ in range(BATCH_SIZE):
+                    rrt.step(visualize=False)
+        results.append(
+            (len(rrt.tree) - start_nodes) / (time.perf_counter() - start_time)
+        )
+    return results
+
+
+def main():
+    print(
+        "{:>8} {:>8} {:>16} {:>16} {:>8}".format(
+            "planner", "nodes", "step (nodes/s)", "batch (nodes/s)", "speedup"
+        )
+    )
+    for planner_class in (RRT, RRTStar):
+        single = throughput(planner_class, batched=False)
+        batched = throughput(planner_class, batched=True)
+        for size, single_rate, batched_rate in zip(TREE_SIZES, single, batched):
+            print(
+                "{:>8} {:>8} {:>16.0f} {:>16.0f} {:>8.2f}".format(
+                    planner_class.__name__,
+                    size,
+                    single_rate,
+                    batched_rate,
+                    batched_rate / single_rate,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the cost of moving agents along a path: the old recursive stepper,
+which walked a reversed list of points and recomputed distances every tick,
+against a TrajectoryFollower, and one position lookup per agent against a
+single vectorized call for many agents.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/trajectory_benchmark.py
+"""
+
+from math import sqrt
+import random
+import time
+
+import numpy as np
+
+from motion_planning.config.rrt_config import AGENT_SPEED
+from motion_planning.rrt.trajectory import Trajectory, TrajectoryFollower
+
+PATH_POINTS = [10, 100, 1000]
+NUM_AGENTS = 10000
+SEED = 0
+
+
+def random_path(num_points: int):
+    random.seed(SEED)
+    return [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(num_points)]
+
+
+def recursive_step(position, path, to_travel: float):
+    """
+    The stepper the planners used before, on a path in reverse order.
+    """
+    if not path:
+        return position
+    point = path[-1]
+    distance = sqrt((point[0] - position[0]) ** 2 + (point[1] - position[1]) ** 2)
+    if distance <= to_travel:
+        path.pop()
+        return recursive_step(point, path, to_travel - distance)
+    return (
+        position[0] + to_travel / distance * (point[0] - position[0]),
+        position[1] + to_travel / distance * (point[1] - position[1]),
+    )
+
+
+def microseconds_per_tick_recursive(points) -> float:
+    path = points[::-1]
+    position = path.pop()
+    ticks = 0
+    start_time = time.perf_counter()
+    while path:
+        position = recursive_step(position, path, AGENT_SPEED)
+        ticks += 1
+    return (time.perf_counter() - start_time) / ticks * 1e6
+
+
+def microseconds_per_tick_follower(points) -> float:
+    follower = TrajectoryFollower(Trajectory(points), AGENT_SPEED)
+    ticks = 0
+    start_time = time.perf_counter()
+    while not follower.done:
+        follower.advance()
+        ticks += 1
+    return (time.perf_counter() - start_time) / ticks * 1e6
+
+
+def milliseconds_for_agents(points, vectorized: bool) -> float:
+    trajectory = Trajectory(points)
+    distances = np.random.default_rng(SEED).uniform(0, trajectory.length, NUM_AGENTS)
+    start_time = time.perf_counter()
+    if vectorized:
+        trajectory.positions(distances)
+    else:
+        for s in distances.tolist():
+            trajectory.position(s)
+    return (time.perf_counter() - start_time) * 1000
+
+
+def main():
+    print(
+        "{:>8} {:>16} {:>16} {:>16} {:>16}".format(
+            "points",
+            "recursive us/tick",
+            "follower us/tick",
+            "position ms",
+            "positions ms",
+        )
+    )
+    print(
+        "{:>8} {:>16} {:>16} {:>16} {:>16}".format(
+            "",
+            "",
+            "",
+            "({} agents)".format(NUM_AGENTS),
+            "({} agents)".format(NUM_AGENTS),
+        )
+    )
+    for num_points in PATH_POINTS:
+        points = random_path(num_points)
+        print(
+            "{:>8} {:>16.3f} {:>16.3f} {:>16.2f} {:>16.2f}".format(
+                num_points,
+                microseconds_per_tick_recursive(points),
+                microseconds_per_tick_follower(points),
+                milliseconds_for_agents(points, vectorized=False),
+                milliseconds_for_agents(points, vectorized=True),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare the memory per node and node removal time of the array-backed Tree
+against the previous layout, which stored the tree as a list of point tuples
+plus dicts of parents, costs and child lists keyed by point.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/tree_memory_benchmark.py
+"""
+
+from collections import defaultdict
+import random
+import time
+import tracemalloc
+
+from motion_planning.rrt.tree import Tree
+
+TREE_SIZES = [1000, 10000, 50000]
+
+
+def random_tree_edges(size: int):
+    """
+    Return a list of (point, parent index) pairs describing a random tree,
+    with the root at index 0.
+    """
+    edges = [((random.random() * 100, random.random() * 100), -1)]
+    for i in range(1, size):
+        edges.append(
+            ((random.random() * 100, random.random() * 100), random.randrange(i))
+        )
+    return edges
+
+
+def build_dict_tree(edges):
+    points = []
+    parents = {}
+    costs = {}
+    children = defaultdict(list)
+    for point, parent in edges:
+        points.append(point)
+        costs[point] = 0.0
+        if parent >= 0:
+            parents[point] = points[parent]
+            children[points[parent]].append(point)
+    return points, parents, costs, children
+
+
+def build_array_tree(edges):
+    tree = Tree(edges[0][0])
+    for point, parent in edges[1:]:
+        tree.add(point, parent, 0.0)
+    return tree
+
+
+def measure(build, edges):
+    tracemalloc.start()
+    result = build(edges)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    random.seed(0)
+    print(
+        "{:>8} {:>18} {:>18} {:>20} {:>20}".format(
+            "nodes",
+            "dict bytes/node",
+            "array bytes/node",
+            "dict remove (us)",
+            "array remove (us)",
+        )
+    )
+    for size in TREE_SIZES:
+        edges = random_tree_edges(size)
+        (points, parents, costs, children), dict_size = measure(build_dict_tree, edges)
+        tree, array_size = measure(build_array_tree, edges)
+
+        # Remove the newest half of the nodes, which are all leaves of the
+        # remaining tree, in random order.
+        to_remove = list(range(size // 2, size))
+        random.shuffle(to_remove)
+
+        start = time.perf_counter()
+        for i in to_remove:
+            point = edges[i][0]
+            points.remove(point)
+            children[parents.pop(point)].remove(point)
+            del costs[point]
+        dict_remove = (time.perf_counter() - start) / len(to_remove)
+
+        start = time.perf_counter()
+        for i in to_remove:
+            tree.remove(i)
+        array_remove = (time.perf_counter() - start) / len(to_remove)
+
+        print(
+            "{:>8} {:>18.1f} {:>18.1f} {:>20.2f} {:>20.2f}".format(
+                size,
+                dict_size / size,
+                array_size / size,
+                dict_remove * 1e6,
+                array_remove * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare warm-starting RRT* from a saved tree with growing the tree again.
+
+Grows a tree of NUM_STEPS steps on the large scenario and saves it, then
+reports how long it took to grow, how long loading it takes (including
+rebuilding the neighbor index) with and without memory-mapping, and how long
+re-rooting the loaded tree at a new start takes.
+
+Run from the top-level directory with:
+    PYTHONPATH="." python benchmarks/tree_snapshot_benchmark.py
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from motion_planning.benchmark.scenarios import SCENARIOS
+from motion_planning.rrt.rrt_star import RRTStar
+
+NUM_STEPS = 20000
+SEED = 0
+
+
+def make_planner(scenario) -> RRTStar:
+    return RRTStar(
+        scenario.start,
+        scenario.goal,
+        obstacles=scenario.obstacles,
+        bounds=scenario.bounds,
+    )
+
+
+def main():
+    scenario = SCENARIOS["large"]
+    random.seed(SEED)
+    rrt = make_planner(scenario)
+    start_time = time.perf_counter()
+    for _ in range(NUM_STEPS):
+        rrt.step(visualize=False)
+    grow_time = time.perf_counter() - start_time
+    # A node in the middle of the tree as the new start
+    new_start = rrt.tree.point(rrt.tree.nodes()[len(rrt.tree.nodes()) // 2])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tree.bin")
+        start_time = time.perf_counter()
+        rrt.save_tree(path)
+        save_time = time.perf_counter() - start_time
+        print("{} nodes, {:.0f} kB".format(rrt.tree.size, os.path.getsize(path) / 1024))
+        print("{:>24} {:>10}".format("", "time (s)"))
+        print("{:>24} {:>10.3f}".format("grow", grow_time))
+        print("{:>24} {:>10.3f}".format("save", save_time))
+        for name, mmap in [("load (memmap)", True), ("load (read)", False)]:
+            loaded = make_planner(scenario)
+            start_time = time.perf_counter()
+            loaded.load_tree(path, mmap=mmap)
+            print("{:>24} {:>10.3f}".format(name, time.perf_counter() - start_time))
+        start_time = time.perf_counter()
+        loaded.reroot(new_start)
+        print("{:>24} {:>10.3f}".format("reroot", time.perf_counter() - start_time))
+
+
+if __name__ == "__main__":
+    main()
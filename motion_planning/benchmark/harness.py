@@ -0,0 +1,284 @@
+"""
+Headless, seeded benchmark harness for the planners.
+
+Runs every planner on every scenario with fixed seeds and a fixed step
+budget, and writes the results as JSON so runs from different versions can
+be diffed to catch regressions. Run from the top-level directory with:
+    PYTHONPATH="." python -m motion_planning.benchmark.harness -o results.json
+"""
+
+from typing import Dict, List, Optional, Sequence
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from motion_planning.benchmark.scenarios import SCENARIOS, Scenario
+from motion_planning.config.rrt_config import ANYTIME_TRAJECTORY_LENGTH
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from motion_planning.rrt.profiler import PhaseProfiler
+from motion_planning.rrt.rrt import RRT
+from motion_planning.rrt.rrt_connect import RRTConnect
+from motion_planning.rrt.rrt_base import RRTBase
+from motion_planning.rrt.rrt_star import RRTStar
+from motion_planning.rrt.trajectory import Trajectory, TrajectoryFollower
+
+PLANNERS = {
+    "rrt": RRT,
+    "rrt_star": RRTStar,
+    "anytime_rrt_star": AnytimeRRTStar,
+    "rrt_connect": RRTConnect,
+}
+
+DEFAULT_SEEDS = [0, 1, 2]
+DEFAULT_MAX_STEPS = 2000
+# How many steps between samples of the path cost
+DEFAULT_SAMPLE_INTERVAL = 100
+
+
+class _PlannerLoop:
+    """
+    Steps a planner and reports the cost of the best path from the start.
+    """
+
+    def __init__(self, rrt: RRTBase):
+        self.rrt = rrt
+
+    def step(self) -> None:
+        self.rrt.step(visualize=False)
+
+    def cost(self) -> float:
+        return self.rrt.best_cost_to_goal()
+
+
+class _AnytimeLoop(_PlannerLoop):
+    """
+    Steps an anytime planner the way its demo does: commit a short
+    trajectory along the best path, re-root the tree at its end, and keep
+    stepping while the agent moves along it.
+    """
+
+    def __init__(self, rrt: AnytimeRRTStar):
+        super().__init__(rrt)
+        # Cost of the trajectories committed so far
+        self.committed_cost = 0.0
+        # Follows the committed trajectory, or None if there's none to follow
+        self.follower = None
+
+    def step(self) -> None:
+        if self.follower is None or self.follower.done:
+            self.follower = None
+            trajectory = self.rrt.best_node_path_to_goal()[:ANYTIME_TRAJECTORY_LENGTH]
+            if trajectory:
+                self.committed_cost += self.rrt.tree.cost[trajectory[-1]].item()
+                points = [self.rrt.tree.point(node) for node in trajectory]
+                self.follower = TrajectoryFollower(Trajectory(points))
+                self.rrt.prune_tree_and_set_new_root(trajectory)
+        if self.follower is not None:
+            self.rrt.agent_pos = self.follower.advance()
+        self.rrt.step(visualize=False)
+
+    def cost(self) -> float:
+        return self.committed_cost + self.rrt.best_cost_to_goal()
+
+
+def _make_loop(planner: str, scenario: Scenario) -> _PlannerLoop:
+    rrt = PLANNERS[planner](
+        scenario.start,
+        scenario.goal,
+        obstacles=scenario.obstacles,
+        bounds=scenario.bounds,
+    )
+    if isinstance(rrt, AnytimeRRTStar):
+        return _AnytimeLoop(rrt)
+    return _PlannerLoop(rrt)
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    # JSON has no infinity
+    return value if value != float("inf") else None
+
+
+def run_planner(
+    planner: str,
+    scenario: Scenario,
+    seed: int,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+    measure_memory: bool = True,
+    profile: bool = False,
+    stop_at_first_solution: bool = False,
+) -> Dict:
+    """
+    Return the benchmark results of one planner on one scenario.
+
+    The timed run is not traced, since tracing memory slows it down a lot.
+    Instead, peak memory comes from a second run with the same seed, which
+    builds the same tree.
+
+    planner: name of the planner in PLANNERS
+    scenario: the problem to solve
+    seed: seed for the global random number generator the planners use
+    max_steps: number of steps to run
+    sample_interval: number of steps between samples of the path cost
+    measure_memory: whether to do the second run to find peak memory
+    profile: whether to record time spent per phase of the step loop
+    stop_at_first_solution: whether to stop as soon as a path is found,
+    instead of running all max_steps steps
+    return: dict of results, ready to be written as JSON
+    """
+    random.seed(seed)
+    loop = _make_loop(planner, scenario)
+    if profile:
+        loop.rrt.profiler = PhaseProfiler()
+    cost_over_time = []
+    time_to_first_solution = None
+    steps_to_first_solution = None
+    peak_nodes = len(loop.rrt.tree)
+
+    steps = 0
+    start_time = time.perf_counter()
+    while steps < max_steps:
+        steps += 1
+        loop.step()
+        peak_nodes = max(peak_nodes, len(loop.rrt.tree))
+        if steps_to_first_solution is None and loop.rrt.best_goal_node is not None:
+            time_to_first_solution = time.perf_counter() - start_time
+            steps_to_first_solution = steps
+            if stop_at_first_solution:
+                break
+        if steps % sample_interval == 0:
+            cost_over_time.append(
+                {
+                    "steps": steps,
+                    "time": time.perf_counter() - start_time,
+                    "cost": _finite_or_none(loop.cost()),
+                }
+            )
+    elapsed = time.perf_counter() - start_time
+
+    results = {
+        "planner": planner,
+        "scenario": scenario.name,
+        "seed": seed,
+        "steps": steps,
+        "elapsed": elapsed,
+        "steps_per_second": steps / elapsed,
+        "time_to_first_solution": time_to_first_solution,
+        "steps_to_first_solution": steps_to_first_solution,
+        "final_cost": _finite_or_none(loop.cost()),
+        "cost_over_time": cost_over_time,
+        "nodes": len(loop.rrt.tree),
+        "peak_nodes": peak_nodes,
+        "peak_memory_bytes": None,
+    }
+    if profile:
+        results["profile"] = loop.rrt.profiler.summary()
+    if measure_memory:
+        results["peak_memory_bytes"] = _peak_memory(planner, scenario, seed, steps)
+    return results
+
+
+def _peak_memory(planner: str, scenario: Scenario, seed: int, max_steps: int) -> int:
+    """
+    Return the most memory allocated at once while running the planner.
+    """
+    tracemalloc.start()
+    try:
+        random.seed(seed)
+        loop = _make_loop(planner, scenario)
+        for _ in range(max_steps):
+            loop.step()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(
+    planners: Sequence[str] = tuple(PLANNERS),
+    scenarios: Sequence[str] = tuple(SCENARIOS),
+    seeds: Sequence[int] = DEFAULT_SEEDS,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+    measure_memory: bool = True,
+    profile: bool = False,
+) -> Dict:
+    """
+    Return the results of running every planner on every scenario with
+    every seed, along with the settings and environment they were run in.
+    """
+    results: List[Dict] = []
+    for scenario in scenarios:
+        for planner in planners:
+            for seed in seeds:
+                results.append(
+                    run_planner(
+                        planner,
+                        SCENARIOS[scenario],
+                        seed,
+                        max_steps,
+                        sample_interval,
+                        measure_memory,
+                        profile,
+                    )
+                )
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "settings": {
+            "planners": list(planners),
+            "scenarios": list(scenarios),
+            "seeds": list(seeds),
+            "max_steps": max_steps,
+            "sample_interval": sample_interval,
+            "profile": profile,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--planners", nargs="+", choices=PLANNERS, default=PLANNERS)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seeds", nargs="+", type=int, default=DEFAULT_SEEDS)
+    parser.add_argument("--steps", type=int, default=DEFAULT_MAX_STEPS)
+    parser.add_argument("--sample-interval", type=int, default=DEFAULT_SAMPLE_INTERVAL)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the peak memory runs"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="record time spent per phase"
+    )
+    parser.add_argument(
+        "-o", "--output", help="file to write JSON results to, instead of stdout"
+    )
+    args = parser.parse_args(argv)
+
+    suite = run_suite(
+        list(args.planners),
+        list(args.scenarios),
+        args.seeds,
+        args.steps,
+        args.sample_interval,
+        not args.no_memory,
+        args.profile,
+    )
+    if args.output is None:
+        json.dump(suite, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
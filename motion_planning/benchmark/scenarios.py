@@ -0,0 +1,146 @@
+"""
+Named planning problems for benchmarking. Every scenario is fully determined
+by its name, so results from different versions can be compared directly.
+"""
+
+from typing import Dict, List, NamedTuple, Tuple
+import random
+
+from motion_planning.config.rrt_config import (
+    AGENT_START_POSITION,
+    BOUNDS,
+    GOAL_POSITION,
+    OBSTACLES,
+)
+
+Obstacle = Tuple[Tuple[float, float], float, float]
+
+
+class Scenario(NamedTuple):
+    name: str
+    start: Tuple[float, float]
+    # ((bottom left), (top right)) corners of the goal region
+    goal: Tuple[Tuple[float, float], Tuple[float, float]]
+    obstacles: List[Obstacle]
+    # ((low corner), (high corner)) of the area points are sampled from
+    bounds: Tuple[Tuple[float, float], Tuple[float, float]]
+
+
+def _overlaps(
+    obstacle: Obstacle, low: Tuple[float, float], high: Tuple[float, float]
+) -> bool:
+    """
+    Return whether an obstacle overlaps the box with the given corners.
+    """
+    (left, bottom), width, height = obstacle
+    return (
+        left <= high[0]
+        and low[0] <= left + width
+        and bottom <= high[1]
+        and low[1] <= bottom + height
+    )
+
+
+def _cluttered_obstacles(
+    num_obstacles: int,
+    start: Tuple[float, float],
+    goal: Tuple[Tuple[float, float], Tuple[float, float]],
+    seed: int,
+) -> List[Obstacle]:
+    """
+    Return random small rectangles that keep clear of the start and goal.
+
+    Uses its own random number generator, so the obstacles are the same no
+    matter what the global random state is.
+    """
+    rng = random.Random(seed)
+    (low_x, low_y), (high_x, high_y) = BOUNDS
+    start_box = ((start[0] - 2, start[1] - 2), (start[0] + 2, start[1] + 2))
+    obstacles = []
+    while len(obstacles) < num_obstacles:
+        obstacle = (
+            (rng.uniform(low_x, high_x), rng.uniform(low_y, high_y)),
+            rng.uniform(2, 8),
+            rng.uniform(2, 8),
+        )
+        if not _overlaps(obstacle, *start_box) and not _overlaps(obstacle, *goal):
+            obstacles.append(obstacle)
+    return obstacles
+
+
+def _scaled(obstacles: List[Obstacle], scale: float) -> List[Obstacle]:
+    return [
+        ((left * scale, bottom * scale), width * scale, height * scale)
+        for (left, bottom), width, height in obstacles
+    ]
+
+
+_LARGE_SCALE = 5
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        # The map the demos use
+        Scenario(
+            "default",
+            AGENT_START_POSITION,
+            GOAL_POSITION,
+            OBSTACLES,
+            BOUNDS,
+        ),
+        # A wall across the middle with a gap narrower than one edge, away
+        # from the straight line between start and goal
+        Scenario(
+            "narrow_passage",
+            (10, 20),
+            ((85, 15), (95, 25)),
+            [((45, 0), 10, 78), ((45, 82), 10, 18)],
+            BOUNDS,
+        ),
+        # Walls across the map with gaps at alternating ends, so the path
+        # has to zigzag
+        Scenario(
+            "maze",
+            (10, 10),
+            ((85, 88), (95, 98)),
+            [
+                ((0, 20), 85, 3),
+                ((15, 40), 85, 3),
+                ((0, 60), 85, 3),
+                ((15, 80), 85, 3),
+            ],
+            BOUNDS,
+        ),
+        # Many small rectangles scattered over the whole map
+        Scenario(
+            "cluttered",
+            AGENT_START_POSITION,
+            GOAL_POSITION,
+            _cluttered_obstacles(80, AGENT_START_POSITION, GOAL_POSITION, seed=0),
+            BOUNDS,
+        ),
+        # The default map, scaled up so paths need many more edges
+        Scenario(
+            "large",
+            (
+                AGENT_START_POSITION[0] * _LARGE_SCALE,
+                AGENT_START_POSITION[1] * _LARGE_SCALE,
+            ),
+            (
+                (
+                    GOAL_POSITION[0][0] * _LARGE_SCALE,
+                    GOAL_POSITION[0][1] * _LARGE_SCALE,
+                ),
+                (
+                    GOAL_POSITION[1][0] * _LARGE_SCALE,
+                    GOAL_POSITION[1][1] * _LARGE_SCALE,
+                ),
+            ),
+            _scaled(OBSTACLES, _LARGE_SCALE),
+            (
+                (BOUNDS[0][0] * _LARGE_SCALE, BOUNDS[0][1] * _LARGE_SCALE),
+                (BOUNDS[1][0] * _LARGE_SCALE, BOUNDS[1][1] * _LARGE_SCALE),
+            ),
+        ),
+    ]
+}
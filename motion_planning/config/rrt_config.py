@@ -6,15 +6,61 @@ DELTA = 5
 # for RRT*
 GAMMA_RRT_STAR = DELTA * 50
 
+# Side length of the cells in the grid used to index tree points for
+# nearest neighbor and radius queries. Radius queries are capped at DELTA,
+# so this keeps them to a block of 3 cells along each axis.
+NEIGHBOR_INDEX_CELL_SIZE = DELTA
+
+# Number of node slots to allocate up front for a tree. Trees double
+# their storage whenever they run out of slots.
+INITIAL_TREE_CAPACITY = 1024
+
 # List of rectangular obstacles, ((bottom left corner), length, height))
 OBSTACLES = [
     ((0, 20), 80, 20),
     ((20, 60), 80, 20),
 ]
 
-# Bounds for search space
-RIGHT_BOUND = 100
-BOTTOM_BOUND = 100
+# Side length of the cells in the grid used to look up which obstacles
+# an edge might hit. Edges are at most DELTA long, so each edge overlaps
+# at most a 2x2 block of cells.
+COLLISION_GRID_CELL_SIZE = DELTA * 2
+
+# For goal-biased sampling, the fraction of samples drawn from the goal
+# region instead of the whole search space
+GOAL_SAMPLING_BIAS = 0.05
+
+# For samplers in prefetch mode, how many samples to generate at once
+SAMPLER_PREFETCH_BLOCK = 1024
+
+# Whether RRT* should, once it has found a path, only sample points that
+# could lie on a cheaper path
+INFORMED_SAMPLING = False
+
+# How many points informed sampling may reject before falling back to
+# sampling the whole search space
+INFORMED_SAMPLING_MAX_TRIES = 100
+
+# For anytime RRT*, how many steps between branch-and-bound prunings of
+# nodes that can't improve the best path to the goal
+BRANCH_AND_BOUND_INTERVAL = 100
+
+# For RRT-Connect, how many random points in the goal region to try as the
+# root of the goal tree if the goal's center is inside an obstacle
+RRT_CONNECT_GOAL_ROOT_TRIES = 100
+
+# For RRT-Connect, most steps to take trying to connect the trees before
+# giving up, e.g. when no path exists
+RRT_CONNECT_MAX_STEPS = 20000
+
+# Whether RRT* should check the edges to nearby nodes one at a time, in
+# order of cost, stopping as soon as it knows the answer, instead of
+# checking them all in one batch
+LAZY_COLLISION_CHECKING = True
+
+# Axis-aligned box of the search space, ((low corner), (high corner)).
+# Planners in other numbers of dimensions are given their own bounds.
+BOUNDS = ((0, 0), (100, 100))
 
 # How fast the agent moves along a path
 AGENT_SPEED = 0.1
@@ -25,10 +71,52 @@ EPSILON = 0.000000001
 # How long to pause when animating
 VIS_PAUSE_LENGTH = 0.0000000000001
 
+# Most frames per second to draw when animating. Changes made between
+# frames are batched into the next frame.
+RENDER_MAX_FPS = 30
+
+# Most cells per side of an occupancy grid to draw. Larger grids are drawn
+# with cells skipped.
+RENDER_MAX_GRID_SIDE = 1000
+
+# If set, draw a frame every this many renderer refreshes (usually one
+# per step) instead of limiting by frame rate.
+RENDER_STEPS_PER_FRAME = None
+
+# For anytime RRT*, most nodes to keep in the tree, or None for no limit.
+# Past it, the least useful leaves are evicted.
+NODE_BUDGET = None
+
+# Fraction of the node budget to evict down to once it's exceeded, so that
+# eviction runs once every so many steps instead of on every step
+NODE_BUDGET_LOW_WATERMARK = 0.9
+
 # For anytime RRT*, how long each saved trajectory should be.
 # i.e. how many edges away to set the new root
 ANYTIME_TRAJECTORY_LENGTH = 5
 
+# For portfolio planning in first solution mode, how many steps each worker
+# takes between checks for whether another worker has found a path
+PORTFOLIO_CANCEL_CHECK_INTERVAL = 64
+
+# For the real-time anytime planner, how many seconds the controller waits
+# for a new trajectory each tick before carrying on without one
+REALTIME_TICK_BUDGET = 0.02
+
+# For the planning service, most bytes of tree arrays to keep cached across
+# all maps before evicting the least recently used trees
+SERVICE_MEMORY_BUDGET = 256 * 2**20
+
+# For the planning service, side length of the square start regions that
+# share a cached tree. Queries starting in the same region re-root that tree
+# at their start.
+SERVICE_START_REGION_SIZE = 10
+
+# For the planning service, most steps a query may take to find a path, and
+# how many more steps to take to improve it once found
+SERVICE_MAX_STEPS = 20000
+SERVICE_REFINE_STEPS = 200
+
 # Starting position of the agent
 AGENT_START_POSITION = (10, 10)
 
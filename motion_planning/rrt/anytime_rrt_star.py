@@ -1,36 +1,141 @@
-from matplotlib.backend_bases import MouseEvent
-from matplotlib import pyplot as plt
-from math import log2
-from typing import List, Tuple
-import random
+from typing import TYPE_CHECKING, List, NamedTuple, Tuple
+import heapq
 
-from rrt_star import RRTStar
+import numpy as np
+
+from motion_planning.rrt.rrt_connect import RRTConnect
+from motion_planning.rrt.rrt_star import RRTStar
+from motion_planning.rrt.tree import NO_NODE
 from motion_planning.config.rrt_config import (
     AGENT_START_POSITION,
     GOAL_POSITION,
     ANYTIME_TRAJECTORY_LENGTH,
-    DELTA,
-    GAMMA_RRT_STAR,
-    RIGHT_BOUND,
-    BOTTOM_BOUND,
-    VIS_PAUSE_LENGTH,
+    BRANCH_AND_BOUND_INTERVAL,
     EPSILON,
+    NODE_BUDGET,
+    NODE_BUDGET_LOW_WATERMARK,
 )
 
+if TYPE_CHECKING:
+    from matplotlib.backend_bases import MouseEvent
+
+
+class Footprint(NamedTuple):
+    nodes: int
+    # Node slots allocated, which never shrinks
+    capacity: int
+    # Bytes used by the tree's arrays
+    tree_bytes: int
+    # Nodes evicted to stay within the node budget, and how many times
+    # eviction ran
+    nodes_evicted: int
+    evictions: int
+
 
 class AnytimeRRTStar(RRTStar):
-    def __init__(self, start, goal):
-        super().__init__(start, goal)
-        self.lines_from_start = []
-        self.lines_from_current = []
+    # The tree would otherwise only ever grow between commits
+    branch_and_bound_interval = BRANCH_AND_BOUND_INTERVAL
+    # Most nodes to keep in the tree, or None for no limit. Can be
+    # overridden per instance.
+    node_budget = NODE_BUDGET
+    nodes_evicted = 0
+    evictions = 0
+
+    def step(self, visualize: bool = True):
+        found_goal = super().step(visualize)
+        self._enforce_node_budget(visualize)
+        return found_goal
+
+    def step_batch(self, n: int, visualize: bool = True) -> bool:
+        found_goal = super().step_batch(n, visualize)
+        self._enforce_node_budget(visualize)
+        return found_goal
+
+    def _enforce_node_budget(self, visualize: bool) -> None:
+        if self.node_budget is not None and len(self.tree) > self.node_budget:
+            self.evict(
+                len(self.tree) - int(self.node_budget * NODE_BUDGET_LOW_WATERMARK),
+                visualize,
+            )
+
+    def evict(self, n: int, visualize: bool = True) -> int:
+        """
+        Remove the n least useful leaves, a round of leaves at a time, so
+        that the tree stays connected. A leaf's usefulness is judged by its
+        cost from the root plus its distance to the goal region, the lowest
+        possible cost of a path through it: the higher, the sooner it goes.
+        Nodes on the best path to the goal are never evicted.
+
+        n: number of nodes to remove
+        visualize: Whether to draw the change
+        return: number of nodes removed, less than n if only the root and
+        the best path are left
+        """
+        tree = self.tree
+        keep = set(self.best_node_path_to_goal())
+        keep.add(tree.root)
+        removed = 0
+        with self.profiler.phase("evict"):
+            while removed < n:
+                nodes = tree.nodes()
+                leaves = nodes[tree.first_child[nodes] == NO_NODE]
+                leaves = np.array(
+                    [leaf for leaf in leaves.tolist() if leaf not in keep]
+                )
+                if not len(leaves):
+                    break
+                scores = tree.cost[leaves] + self._distances_to_goal(leaves)
+                count = min(n - removed, len(leaves))
+                worst = np.argpartition(-scores, count - 1)[:count]
+                for leaf in leaves[worst].tolist():
+                    if visualize:
+                        self.renderer.edge_removed(leaf)
+                    self.remove_node(leaf)
+                removed += count
+        self.nodes_evicted += removed
+        self.evictions += 1
+        self.profiler.count("nodes_evicted", removed)
+        return removed
+
+    def footprint(self) -> Footprint:
+        """
+        Return how big the tree is, and how much has been evicted to keep it
+        within the node budget.
+        """
+        return Footprint(
+            nodes=len(self.tree),
+            capacity=self.tree.capacity,
+            tree_bytes=self.tree.nbytes,
+            nodes_evicted=self.nodes_evicted,
+            evictions=self.evictions,
+        )
 
-    def step_until_found_goal(self):
+    def step_until_found_goal(self, connect: bool = False) -> bool:
         """
         Keep running steps of the RRT until the goal is found.
+
+        connect: whether to find the first path with a bidirectional
+        RRTConnect from the current root instead, and add it to this tree.
+        That gives up after RRT_CONNECT_MAX_STEPS steps.
+        return: whether the goal was found
         """
+        if connect:
+            rrt_connect = RRTConnect(
+                self.tree.point(self.tree.root),
+                self.goal,
+                collision_map=self.collision_checker,
+                sampler=self.sampler,
+                bounds=self.bounds,
+            )
+            rrt_connect.delta = self.delta
+            if not rrt_connect.step_until_connected():
+                return False
+            rrt_connect.seed(self)
+            return True
         found_goal = False
         while not found_goal:
             found_goal = self.step()
+        return True
 
     def update_and_draw_current_trajectory(
         self, trajectory: List[Tuple[float, float]]
@@ -44,45 +149,230 @@ class AnytimeRRTStar(RRTStar):
         trajectory: List of points to draw edges from and to update the RRT's
         internal tracker of drawn edges.
         """
-        self.lines_from_start.extend(self.lines_from_current)
-        self.lines_from_current = []
-        for i in range(len(trajectory) - 1):
-            start, end = trajectory[i], trajectory[i + 1]
-            line = plt.plot(
-                [start[0], end[0]],
-                [start[1], end[1]],
-            )[0]
-            line.set_color("#00FF00")
-            line.set_linewidth(2)
-            line.set_zorder(3)
-            self.lines_from_current.append(line)
-
-    def prune_tree_and_set_new_root(
-        self, trajectory: List[Tuple[float, float]]
-    ) -> None:
+        self.renderer.trajectory_committed(trajectory)
+
+    def prune_tree_and_set_new_root(self, trajectory: List[int]) -> None:
         """
         Given a trajectory, set the new root to the end of the trajectory by
         deleting all branches of the tree that originate on that trajectory.
 
-        trajectory: List of points from which to prune branches, so that the
+        trajectory: List of node IDs from which to prune branches, so that the
         new root becomes the end of the trajectory.
         """
         new_root = trajectory[-1]
-        stack = [trajectory[0]]
-        while stack:
-            cur = stack.pop()
-            parent = self.parents.get(cur)
-            if parent:
-                del self.parents[cur]
-                self.edges[parent].remove(cur)
-                self.edges_to_lines[(parent, cur)].remove()
-                del self.edges_to_lines[(parent, cur)]
-            if cur != new_root:
-                self.points.remove(cur)
-                stack.extend(self.edges[cur])
-
-
-def onclick(event: MouseEvent, rrt: AnytimeRRTStar) -> None:
+        pruned = 0
+        with self.profiler.phase("prune"):
+            self.tree.set_root(new_root)
+            stack = [trajectory[0]]
+            while stack:
+                cur = stack.pop()
+                self.renderer.edge_removed(cur)
+                if cur == new_root:
+                    continue
+                stack.extend(self.tree.children(cur))
+                self.remove_node(cur)
+                pruned += 1
+            self.renderer.edge_removed(new_root)
+        self.profiler.count("nodes_pruned", pruned)
+
+    def add_obstacle(
+        self,
+        obstacle: Tuple[Tuple[float, float], float, float],
+        visualize: bool = True,
+    ) -> int:
+        """
+        Add a rectangular obstacle while planning, and repair the tree
+        around it, see _invalidate. The planner's collision map must be a
+        CollisionChecker.
+
+        obstacle: ((bottom left corner), length, height)
+        visualize: Whether to draw the change
+        return: ID of the obstacle, for move_obstacle and remove_obstacle
+        """
+        self._check_clear_of_root(obstacle)
+        obstacle_id = self.collision_checker.add_obstacle(obstacle)
+        self._invalidate(obstacle_id, visualize)
+        self._obstacles_changed(visualize)
+        return obstacle_id
+
+    def move_obstacle(
+        self,
+        obstacle_id: int,
+        obstacle: Tuple[Tuple[float, float], float, float],
+        visualize: bool = True,
+    ) -> None:
+        """
+        Move an obstacle while planning. The tree is repaired around its new
+        position, and nodes around its old position look for cheaper paths
+        through the space it freed.
+
+        obstacle_id: ID returned by add_obstacle, or the obstacle's index in
+        the obstacles the planner was created with
+        obstacle: ((bottom left corner), length, height) of its new rectangle
+        visualize: Whether to draw the change
+        """
+        self._check_not_removed(obstacle_id)
+        self._check_clear_of_root(obstacle)
+        old_bounds = self.collision_checker.bounds[obstacle_id]
+        self.collision_checker.move_obstacle(obstacle_id, obstacle)
+        self._invalidate(obstacle_id, visualize)
+        self._improve_around(old_bounds, visualize)
+        self._obstacles_changed(visualize)
+
+    def remove_obstacle(self, obstacle_id: int, visualize: bool = True) -> None:
+        """
+        Remove an obstacle while planning. Nodes around it look for cheaper
+        paths through the space it freed.
+
+        obstacle_id: ID returned by add_obstacle, or the obstacle's index in
+        the obstacles the planner was created with
+        visualize: Whether to draw the change
+        """
+        self._check_not_removed(obstacle_id)
+        old_bounds = self.collision_checker.bounds[obstacle_id]
+        self.collision_checker.remove_obstacle(obstacle_id)
+        self._improve_around(old_bounds, visualize)
+        self._obstacles_changed(visualize)
+
+    def _check_not_removed(self, obstacle_id: int) -> None:
+        if self.collision_checker.obstacles[obstacle_id] is None:
+            raise ValueError("obstacle {} was removed".format(obstacle_id))
+
+    def _check_clear_of_root(
+        self, obstacle: Tuple[Tuple[float, float], float, float]
+    ) -> None:
+        (left, bottom), length, height = obstacle
+        x, y = self.tree.point(self.tree.root)
+        if left <= x <= left + length and bottom <= y <= bottom + height:
+            raise ValueError("Obstacle {} covers the root".format(obstacle))
+
+    def _invalidate(self, obstacle_id: int, visualize: bool) -> None:
+        """
+        Cut every edge that a new obstacle blocks, then reattach the cut off
+        subtrees, in the style of RRTX.
+
+        No edge is longer than longest_edge, so only nodes within that of
+        the obstacle can have a blocked edge to their parent, and those are
+        found with one region query, see _nodes_near. Each blocked node is cut off from its parent
+        along with its subtree, whose own edges are still free. Going
+        through the cut off nodes from the cheapest before the change, each
+        gets the cheapest parent within delta with a free edge that's still
+        connected to the root, and the cost change is pushed down its
+        subtree. A cut off node inside the obstacle, or with no such parent,
+        is removed and its children are cut off in turn.
+
+        The work done grows with the number of nodes near the obstacle and
+        below it, not with the size of the tree.
+        """
+        tree = self.tree
+        with self.profiler.phase("invalidate"):
+            nearby = self._nodes_near(self.collision_checker.bounds[obstacle_id])
+            nearby = np.array([node for node in nearby if node != tree.root], int)
+            points = tree.points.take(nearby, axis=0)
+            parent_points = tree.points.take(tree.parent[nearby], axis=0)
+            blocked = nearby[
+                self.collision_checker.obstacle_hits(obstacle_id, parent_points, points)
+            ].tolist()
+            inside = set(
+                nearby[
+                    self.collision_checker.obstacle_hits(obstacle_id, points, points)
+                ].tolist()
+            )
+            for node in blocked:
+                if visualize:
+                    self.renderer.edge_removed(node)
+                tree.detach(node)
+            # Nodes not connected to the root, which can't be new parents
+            orphans = set()
+            for node in blocked:
+                orphans.update(tree.subtree(node))
+        self.profiler.count("nodes_orphaned", len(orphans))
+
+        with self.profiler.phase("reattach"):
+            cut_off = [(tree.cost.item(node), node) for node in blocked]
+            heapq.heapify(cut_off)
+            removed = 0
+            while cut_off:
+                _, node = heapq.heappop(cut_off)
+                point = tree.point(node)
+                parent = None
+                if node not in inside:
+                    candidates = [
+                        candidate
+                        for candidate in self.neighbor_index.within(
+                            point, self.delta + EPSILON
+                        )
+                        if candidate not in orphans
+                    ]
+                    parent, _, _ = self._min_cost_neighbor_lazily(point, candidates)
+                if parent is None:
+                    for child in tree.children(node):
+                        if visualize:
+                            self.renderer.edge_removed(child)
+                        tree.detach(child)
+                        heapq.heappush(cut_off, (tree.cost.item(child), child))
+                    orphans.remove(node)
+                    self.remove_node(node)
+                    removed += 1
+                    continue
+                distance = self._calculate_distance(tree.point(parent), point)
+                if distance > self.longest_edge:
+                    self.longest_edge = distance
+                new_cost = self._get_cost(parent) + distance
+                tree.set_parent(node, parent)
+                subtree = tree.shift_subtree_costs(
+                    node, new_cost - tree.cost.item(node)
+                )
+                orphans.difference_update(subtree)
+                if visualize:
+                    self.renderer.edge_added(node)
+            self._recompute_best_goal_node()
+        self.profiler.count("nodes_removed", removed)
+
+    def _improve_around(
+        self, bounds: Tuple[float, float, float, float], visualize: bool
+    ) -> None:
+        """
+        After space is freed, rewire the nodes near it through each other
+        where that's cheaper, cheapest first, as RRT* does for new nodes.
+        Cost changes are pushed down the rewired subtrees only.
+
+        bounds: (left, bottom, right, top) of the freed space
+        """
+        with self.profiler.phase("improve"):
+            nearby = self._nodes_near(bounds)
+            rewires = 0
+            for node in sorted(nearby, key=self.tree.cost.item):
+                neighbors = self.neighbor_index.within(
+                    self.tree.point(node), self.delta + EPSILON
+                )
+                for neighbor in self.neighbors_to_rewire(neighbors, node):
+                    self.rewire_neighbor_through_new_point(neighbor, node, visualize)
+                    rewires += 1
+        self.profiler.count("rewires", rewires)
+
+    def _nodes_near(self, bounds: Tuple[float, float, float, float]) -> List[int]:
+        """
+        Return the nodes that can have an edge crossing a box, either to
+        their parent, which is at most longest_edge long, or to a neighbor
+        within delta that they could be rewired to.
+
+        bounds: (left, bottom, right, top) of the box
+        return: list of IDs of the nodes
+        """
+        left, bottom, right, top = bounds
+        pad = max(self.longest_edge, self.delta) + EPSILON
+        return self.neighbor_index.within_box(
+            (left - pad, bottom - pad), (right + pad, top + pad)
+        )
+
+    def _obstacles_changed(self, visualize: bool) -> None:
+        if visualize:
+            self.renderer.obstacles_changed()
+            self.redraw_path_to_goal()
+
+
+def onclick(event: "MouseEvent", rrt: AnytimeRRTStar) -> None:
     """
     Update the given rrt's goal to be centered at the x, y coordinate
     of the mouse click event.
@@ -90,41 +380,45 @@ def onclick(event: MouseEvent, rrt: AnytimeRRTStar) -> None:
     event: mouse click event with x and y data
     rrt: RRT whose goal to update
     """
-    rrt.goal = (
-        (event.xdata - 5, event.ydata - 5),
-        (event.xdata + 5, event.ydata + 5),
+    rrt.set_goal(
+        (
+            (event.xdata - 5, event.ydata - 5),
+            (event.xdata + 5, event.ydata + 5),
+        )
     )
-    rrt.goal_viz.set_xy((rrt.goal[0]))
-    for line in rrt.lines_from_start:
-        line.remove()
-    rrt.lines_from_start = []
+    rrt.renderer.trajectory_history_cleared()
     rrt.redraw_path_to_goal()
 
 
 def run_rrt_star():
-    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
-    fig, _ = plt.subplots()
-    fig.canvas.mpl_connect("button_press_event", lambda event: onclick(event, rrt))
+    from motion_planning.rrt.matplotlib_renderer import MatplotlibRenderer
+
+    rrt = AnytimeRRTStar(
+        AGENT_START_POSITION, GOAL_POSITION, renderer=MatplotlibRenderer()
+    )
     rrt.init_plot()
+    rrt.renderer.connect_click(lambda event: onclick(event, rrt))
 
     while True:
-        trajectory = rrt.best_path_to_goal()[:ANYTIME_TRAJECTORY_LENGTH]
+        trajectory = rrt.best_node_path_to_goal()[:ANYTIME_TRAJECTORY_LENGTH]
         # Keep stepping the RRT until we find the goal.
         if not trajectory:
             rrt.step_until_found_goal()
-        trajectory = rrt.best_path_to_goal()[:ANYTIME_TRAJECTORY_LENGTH]
-        rrt.update_and_draw_current_trajectory(trajectory)
+        trajectory = rrt.best_node_path_to_goal()[:ANYTIME_TRAJECTORY_LENGTH]
+        trajectory_points = [rrt.tree.point(node) for node in trajectory]
+        rrt.update_and_draw_current_trajectory(trajectory_points)
         # Once we've set the current trajectory, prune the tree and set
         # the new root.
         rrt.prune_tree_and_set_new_root(trajectory)
         rrt.redraw_path_to_goal()
-        plt.pause(VIS_PAUSE_LENGTH)
+        print("Path cost:", rrt.best_cost_to_goal())
+        rrt.renderer.refresh()
         # Move the agent along the trajectory, continuing to expand the
         # RRT as we do so.
         rrt.move_along_path_until_done(
-            trajectory[::-1], keep_stepping=True, visualize=False
+            trajectory_points, keep_stepping=True, visualize=False
         )
-    plt.show()
+    rrt.renderer.show()
 
 
 if __name__ == "__main__":
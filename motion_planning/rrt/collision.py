@@ -0,0 +1,392 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from math import floor, inf
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from motion_planning.config.rrt_config import COLLISION_GRID_CELL_SIZE
+
+
+class CollisionMap(ABC):
+    """
+    The environment as the planners see it: whatever answers whether points
+    and straight segments are free of obstacles. Points have as many
+    coordinates as the map has dimensions.
+    """
+
+    @abstractmethod
+    def point_free(self, point: Sequence[float]) -> bool:
+        """
+        Return whether the point is free of obstacles.
+
+        point: coordinates of the point
+        """
+        pass
+
+    @abstractmethod
+    def segment_free(self, a: Sequence[float], b: Sequence[float]) -> bool:
+        """
+        Return whether the straight segment from a to b is free of obstacles,
+        including both end points.
+
+        a: start of the segment
+        b: end of the segment
+        """
+        pass
+
+    def segments_free(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Batched segment_free. Subclasses should override this with something
+        faster than checking one segment at a time.
+
+        starts: (n, dim) array of segment start points
+        ends: (n, dim) array of segment end points, or a single (dim,) point
+        shared by every segment
+        return: boolean array of length n, True where the segment is free
+        """
+        starts = np.atleast_2d(np.asarray(starts, dtype=np.float64))
+        ends = np.broadcast_to(np.asarray(ends, dtype=np.float64), starts.shape)
+        return np.array(
+            [
+                self.segment_free(start, end)
+                for start, end in zip(starts.tolist(), ends.tolist())
+            ],
+            dtype=bool,
+        )
+
+
+class CollisionChecker(CollisionMap):
+    """
+    Point and segment collision checks against axis-aligned rectangular
+    obstacles.
+
+    Obstacles are bucketed into a uniform grid of square cells (the
+    broadphase), so a query only tests the obstacles overlapping the cells
+    around it and costs about the same no matter how many obstacles are in
+    the scene. Segments are tested against each candidate rectangle with a
+    slab test, either one at a time in Python or many at once with NumPy.
+
+    Obstacles can be added, moved and removed at any time. Each change only
+    touches the grid cells the obstacle overlaps.
+    """
+
+    def __init__(
+        self,
+        obstacles: Sequence[Tuple[Tuple[float, float], float, float]],
+        cell_size: float = COLLISION_GRID_CELL_SIZE,
+    ):
+        """
+        obstacles: list of rectangles, ((bottom left corner), length, height)
+        cell_size: side length of the broadphase grid cells
+        """
+        self.obstacles = list(obstacles)
+        self.cell_size = cell_size
+        # (left, bottom, right, top) of each obstacle
+        self.bounds = [
+            (x, y, x + length, y + height) for (x, y), length, height in obstacles
+        ]
+        # Bottom left and top right corners of each obstacle, one row per
+        # obstacle, for the vectorized slab test
+        bounds = np.array(self.bounds, dtype=np.float64).reshape(-1, 4)
+        self.low, self.high = bounds[:, :2].copy(), bounds[:, 2:].copy()
+        self.cells = defaultdict(list)
+        for i in range(len(self.bounds)):
+            for cell in self._cells_overlapping(i):
+                self.cells[cell].append(i)
+
+    def _cells_overlapping(self, i: int) -> List[Tuple[int, int]]:
+        """
+        Return the grid cells that obstacle i overlaps.
+        """
+        left, bottom, right, top = self.bounds[i]
+        return [
+            (cx, cy)
+            for cx in range(
+                floor(left / self.cell_size), floor(right / self.cell_size) + 1
+            )
+            for cy in range(
+                floor(bottom / self.cell_size), floor(top / self.cell_size) + 1
+            )
+        ]
+
+    def add_obstacle(self, obstacle: Tuple[Tuple[float, float], float, float]) -> int:
+        """
+        Add a rectangular obstacle.
+
+        obstacle: ((bottom left corner), length, height)
+        return: ID of the obstacle, for move_obstacle and remove_obstacle
+        """
+        i = len(self.obstacles)
+        self.obstacles.append(None)
+        self.bounds.append(None)
+        self.low = np.vstack((self.low, np.zeros(2)))
+        self.high = np.vstack((self.high, np.zeros(2)))
+        self._place_obstacle(i, obstacle)
+        return i
+
+    def move_obstacle(
+        self, i: int, obstacle: Tuple[Tuple[float, float], float, float]
+    ) -> None:
+        """
+        Replace an obstacle with another rectangle, keeping its ID. The
+        obstacle must not have been removed.
+
+        i: ID of the obstacle
+        obstacle: ((bottom left corner), length, height) of its new rectangle
+        """
+        self.remove_obstacle(i)
+        self._place_obstacle(i, obstacle)
+
+    def remove_obstacle(self, i: int) -> None:
+        """
+        Remove an obstacle. Its entry in obstacles becomes None, so the IDs of
+        the other obstacles don't change.
+
+        i: ID of the obstacle
+        """
+        if self.obstacles[i] is None:
+            raise ValueError("obstacle {} was removed".format(i))
+        for cell in self._cells_overlapping(i):
+            self.cells[cell].remove(i)
+        self.obstacles[i] = None
+
+    def _place_obstacle(
+        self, i: int, obstacle: Tuple[Tuple[float, float], float, float]
+    ) -> None:
+        (x, y), length, height = obstacle
+        self.obstacles[i] = obstacle
+        self.bounds[i] = (x, y, x + length, y + height)
+        self.low[i] = self.bounds[i][:2]
+        self.high[i] = self.bounds[i][2:]
+        for cell in self._cells_overlapping(i):
+            self.cells[cell].append(i)
+
+    def obstacle_hits(self, i: int, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Return whether each segment hits one particular obstacle. Segments
+        whose start and end are the same test a point.
+
+        i: ID of the obstacle
+        starts: (n, 2) array of segment start points
+        ends: (n, 2) array of segment end points
+        return: boolean array of length n, True where the segment hits it
+        """
+        return _slab_hits(
+            np.asarray(starts, dtype=np.float64).reshape(-1, 2),
+            np.asarray(ends, dtype=np.float64).reshape(-1, 2),
+            self.low[i],
+            self.high[i],
+        )
+
+    def _candidates(
+        self, left: float, bottom: float, right: float, top: float
+    ) -> List[int]:
+        """
+        Return the indices of obstacles in any grid cell overlapping the given
+        box.
+        """
+        min_cx, max_cx = floor(left / self.cell_size), floor(right / self.cell_size)
+        min_cy, max_cy = floor(bottom / self.cell_size), floor(top / self.cell_size)
+        if min_cx == max_cx and min_cy == max_cy:
+            return self.cells.get((min_cx, min_cy), [])
+        candidates = set()
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                candidates.update(self.cells.get((cx, cy), ()))
+        return list(candidates)
+
+    def point_free(self, point: Tuple[float, float]) -> bool:
+        """
+        Return whether the point is outside every obstacle. Points on an
+        obstacle's boundary count as collisions.
+
+        point: (x, y) tuple representing the point
+        """
+        x, y = point
+        for i in self._candidates(x, y, x, y):
+            left, bottom, right, top = self.bounds[i]
+            if left <= x <= right and bottom <= y <= top:
+                return False
+        return True
+
+    def segment_free(self, a: Tuple[float, float], b: Tuple[float, float]) -> bool:
+        """
+        Return whether the straight segment from a to b stays outside every
+        obstacle, including both end points.
+
+        a: (x, y) start of the segment
+        b: (x, y) end of the segment
+        """
+        candidates = self._candidates(
+            min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])
+        )
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        for i in candidates:
+            left, bottom, right, top = self.bounds[i]
+            # Clip the segment's parameter range [0, 1] to each slab in turn.
+            t_min, t_max = 0.0, 1.0
+            for p, d, low, high in ((a[0], dx, left, right), (a[1], dy, bottom, top)):
+                if d == 0:
+                    if p < low or p > high:
+                        t_min = inf
+                        break
+                    continue
+                t1, t2 = (low - p) / d, (high - p) / d
+                if t1 > t2:
+                    t1, t2 = t2, t1
+                t_min, t_max = max(t_min, t1), min(t_max, t2)
+            if t_min <= t_max:
+                return False
+        return True
+
+    def segments_free(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Batched segment_free. When the whole batch fits in a few grid cells,
+        e.g. all edges from a new point to its RRT* neighbors, every segment
+        is checked against every obstacle near the batch in one go. Otherwise
+        each segment is paired with the obstacles near it first.
+
+        starts: (n, 2) array of segment start points
+        ends: (n, 2) array of segment end points, or a single (2,) point
+        shared by every segment
+        return: boolean array of length n, True where the segment is free
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.broadcast_to(np.asarray(ends, dtype=np.float64), starts.shape)
+        if not len(starts):
+            return np.ones(0, dtype=bool)
+        low = np.minimum(starts.min(axis=0), ends.min(axis=0))
+        high = np.maximum(starts.max(axis=0), ends.max(axis=0))
+        num_cells = (
+            floor(high[0] / self.cell_size) - floor(low[0] / self.cell_size) + 1
+        ) * (floor(high[1] / self.cell_size) - floor(low[1] / self.cell_size) + 1)
+        if num_cells > 4:
+            return self._scattered_segments_free(starts, ends)
+        candidates = self._candidates(low[0], low[1], high[0], high[1])
+        if not candidates:
+            return np.ones(len(starts), dtype=bool)
+        # Segments along rows, candidate obstacles along columns.
+        candidates = np.array(candidates)
+        hits = _slab_hits(
+            starts[:, None, :],
+            ends[:, None, :],
+            self.low[candidates],
+            self.high[candidates],
+        )
+        return ~hits.any(axis=1)
+
+    def _scattered_segments_free(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> np.ndarray:
+        """
+        segments_free for segments spread over many grid cells. Looks up the
+        candidate obstacles of each segment, then checks all (segment,
+        obstacle) pairs in one go.
+        """
+        low, high = np.minimum(starts, ends), np.maximum(starts, ends)
+        segments, obstacles = [], []
+        for i, (left, bottom, right, top) in enumerate(
+            np.column_stack((low, high)).tolist()
+        ):
+            candidates = self._candidates(left, bottom, right, top)
+            segments.extend([i] * len(candidates))
+            obstacles.extend(candidates)
+        free = np.ones(len(starts), dtype=bool)
+        if not segments:
+            return free
+        segments, obstacles = np.array(segments), np.array(obstacles)
+        hits = _slab_hits(
+            starts[segments], ends[segments], self.low[obstacles], self.high[obstacles]
+        )
+        free[segments[hits]] = False
+        return free
+
+
+class BoxCollisionChecker(CollisionMap):
+    """
+    Point and segment collision checks against axis-aligned boxes in any
+    number of dimensions, e.g. for a 3D workspace or a 6D configuration
+    space.
+
+    There's no broadphase: every query tests every box at once with a NumPy
+    slab test, which is fast for up to a few hundred boxes. For 2D maps
+    with many obstacles, CollisionChecker is faster.
+    """
+
+    def __init__(self, boxes: Sequence[Tuple[Sequence[float], Sequence[float]]]):
+        """
+        boxes: list of boxes, ((low corner), (high corner)), like the goal
+        region
+        """
+        self.boxes = [(tuple(low), tuple(high)) for low, high in boxes]
+        # Corners of each box, one row per box
+        self.low = np.array([low for low, _ in self.boxes], dtype=np.float64)
+        self.high = np.array([high for _, high in self.boxes], dtype=np.float64)
+
+    def point_free(self, point: Sequence[float]) -> bool:
+        """
+        Return whether the point is outside every box. Points on a box's
+        boundary count as collisions.
+
+        point: coordinates of the point
+        """
+        if not self.boxes:
+            return True
+        return not ((self.low <= point) & (point <= self.high)).all(axis=1).any()
+
+    def segment_free(self, a: Sequence[float], b: Sequence[float]) -> bool:
+        """
+        Return whether the straight segment from a to b stays outside every
+        box, including both end points.
+
+        a: start of the segment
+        b: end of the segment
+        """
+        if not self.boxes:
+            return True
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        return not _slab_hits(a, b, self.low, self.high).any()
+
+    def segments_free(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Batched segment_free, checking every segment against every box in
+        one go.
+
+        starts: (n, dim) array of segment start points
+        ends: (n, dim) array of segment end points, or a single (dim,) point
+        shared by every segment
+        return: boolean array of length n, True where the segment is free
+        """
+        starts = np.atleast_2d(np.asarray(starts, dtype=np.float64))
+        ends = np.broadcast_to(np.asarray(ends, dtype=np.float64), starts.shape)
+        if not self.boxes or not len(starts):
+            return np.ones(len(starts), dtype=bool)
+        # Segments along rows, boxes along columns
+        hits = _slab_hits(starts[:, None, :], ends[:, None, :], self.low, self.high)
+        return ~hits.any(axis=1)
+
+
+def _slab_hits(
+    starts: np.ndarray, ends: np.ndarray, low: np.ndarray, high: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized slab test in any number of dimensions. All four arrays have a
+    trailing axis of coordinates, and the rest of their shapes broadcast
+    against each other.
+
+    return: boolean array, True where the segment hits the box
+    """
+    d = ends - starts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (low - starts) / d
+        t2 = (high - starts) / d
+    # A segment parallel to a slab is inside it for all t or for none
+    inside = (low <= starts) & (starts <= high)
+    parallel = d == 0
+    near = np.where(parallel, np.where(inside, -inf, inf), np.minimum(t1, t2))
+    far = np.where(parallel, np.where(inside, inf, -inf), np.maximum(t1, t2))
+    t_min = np.maximum(near.max(axis=-1), 0.0)
+    t_max = np.minimum(far.min(axis=-1), 1.0)
+    return t_min <= t_max
@@ -0,0 +1,227 @@
+from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import Rectangle
+from typing import Callable, List, Optional, Tuple
+import time
+
+import numpy as np
+
+from motion_planning.config.rrt_config import (
+    RENDER_MAX_FPS,
+    RENDER_MAX_GRID_SIDE,
+    RENDER_STEPS_PER_FRAME,
+    VIS_PAUSE_LENGTH,
+)
+from motion_planning.rrt.occupancy_grid import OccupancyGrid
+from motion_planning.rrt.renderer import Renderer
+from motion_planning.rrt.tree import NO_NODE
+
+
+class MatplotlibRenderer(Renderer):
+    """
+    Interactive pyplot drawing of a planner.
+
+    The whole tree is a single LineCollection rebuilt from the tree's arrays,
+    so rewires and prunes need no per-edge bookkeeping. Changes are batched
+    and drawn at most max_fps times per second, or every steps_per_frame
+    refreshes if that's set. Each frame blits the moving artists over a saved
+    background of the static ones.
+    """
+
+    def __init__(
+        self,
+        max_fps: float = RENDER_MAX_FPS,
+        steps_per_frame: Optional[int] = RENDER_STEPS_PER_FRAME,
+    ):
+        self.max_fps = max_fps
+        self.steps_per_frame = steps_per_frame
+        self.rrt = None
+        self.figure = None
+        self.axes = None
+        self.background = None
+        self.tree_lines = None
+        self.edge_colors = None
+        self.line_to_goal = None
+        self.line_from_current = None
+        self.lines_from_start = []
+        self.agent_viz = None
+        self.goal_viz = None
+        self.obstacle_patches = []
+        self.tree_changed = False
+        self.pending_refreshes = 0
+        self.last_frame_time = 0.0
+
+    def init_plot(self, rrt) -> None:
+        self.rrt = rrt
+        (low_x, low_y), (high_x, high_y) = rrt.bounds
+        plt.xlim([low_x, high_x])
+        plt.ylim([low_y, high_y])
+        self.figure, self.axes = plt.gcf(), plt.gca()
+        self.axes.set_aspect("equal")
+        if isinstance(rrt.collision_checker, OccupancyGrid):
+            self._draw_occupancy_grid(rrt.collision_checker)
+        else:
+            self._draw_obstacles()
+        self.goal_viz = self.axes.add_patch(
+            Rectangle(
+                rrt.goal[0],
+                rrt.goal[1][0] - rrt.goal[0][0],
+                rrt.goal[1][1] - rrt.goal[0][1],
+                color="#00FF00",
+            )
+        )
+        # Color edges by node ID from the color cycle, like one plt.plot call
+        # per edge would.
+        self.edge_colors = to_rgba_array(
+            plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        )
+        self.tree_lines = self.axes.add_collection(
+            LineCollection([], linewidths=1.5, animated=True)
+        )
+        self.line_to_goal = self._path_line("black")
+        self.line_from_current = self._path_line("#00FF00")
+        self.agent_viz = self.axes.plot(*rrt.agent_pos, "ro", zorder=4, animated=True)[
+            0
+        ]
+        self.tree_changed = True
+        self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _draw_occupancy_grid(self, grid: OccupancyGrid) -> None:
+        # Skip cells so that at most about RENDER_MAX_GRID_SIDE are drawn per
+        # side, which also keeps a memory-mapped grid from being read in full
+        stride = max(1, max(grid.rows, grid.columns) // RENDER_MAX_GRID_SIDE)
+        self.axes.imshow(
+            np.asarray(grid.grid[::stride, ::stride]) != 0,
+            origin="lower",
+            extent=grid.extent,
+            cmap="Blues",
+            vmin=0,
+            vmax=1.5,
+            interpolation="nearest",
+        )
+        (low_x, low_y), (high_x, high_y) = self.rrt.bounds
+        self.axes.set_xlim([low_x, high_x])
+        self.axes.set_ylim([low_y, high_y])
+
+    def _draw_obstacles(self) -> None:
+        for patch in self.obstacle_patches:
+            patch.remove()
+        # Removed obstacles are None
+        self.obstacle_patches = [
+            self.axes.add_patch(Rectangle(*obstacle))
+            for obstacle in self.rrt.collision_checker.obstacles
+            if obstacle is not None
+        ]
+
+    def _path_line(self, color: str):
+        return self.axes.plot(
+            [], [], color=color, linewidth=2, zorder=3, animated=True
+        )[0]
+
+    def _animated_artists(self) -> List:
+        return [
+            self.tree_lines,
+            *self.lines_from_start,
+            self.line_from_current,
+            self.line_to_goal,
+            self.agent_viz,
+        ]
+
+    def _update_tree_lines(self) -> None:
+        """
+        Rebuild the tree's line segments from the tree's arrays.
+        """
+        tree = self.rrt.tree
+        nodes = tree.nodes()
+        parents = tree.parent[nodes]
+        nodes, parents = nodes[parents != NO_NODE], parents[parents != NO_NODE]
+        segments = np.empty((len(nodes), 2, 2))
+        segments[:, 0] = tree.points.take(parents, axis=0)
+        segments[:, 1] = tree.points.take(nodes, axis=0)
+        self.tree_lines.set_segments(segments)
+        self.tree_lines.set_color(self.edge_colors[nodes % len(self.edge_colors)])
+        self.tree_changed = False
+
+    def _on_draw(self, event) -> None:
+        """
+        After a full redraw of the static artists, save them as the background
+        for blitting and draw the animated artists on top.
+        """
+        canvas = self.figure.canvas
+        self.background = canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self._animated_artists():
+            self.axes.draw_artist(artist)
+
+    def _draw_frame(self) -> None:
+        if self.tree_changed:
+            self._update_tree_lines()
+        canvas = self.figure.canvas
+        if self.background is None:
+            # The first frame shows the figure and saves the background.
+            plt.pause(VIS_PAUSE_LENGTH)
+        else:
+            canvas.restore_region(self.background)
+            for artist in self._animated_artists():
+                self.axes.draw_artist(artist)
+            canvas.blit(self.figure.bbox)
+            canvas.flush_events()
+        self.pending_refreshes = 0
+        self.last_frame_time = time.perf_counter()
+
+    def edge_added(self, node: int) -> None:
+        self.tree_changed = True
+
+    def edge_removed(self, node: int) -> None:
+        self.tree_changed = True
+
+    def _set_path_data(self, line, path: List[Tuple[float, float]]) -> None:
+        line.set_data([p[0] for p in path], [p[1] for p in path])
+
+    def path_to_goal_changed(self, path: List[Tuple[float, float]]) -> None:
+        self._set_path_data(self.line_to_goal, path)
+
+    def trajectory_committed(self, trajectory: List[Tuple[float, float]]) -> None:
+        if len(self.line_from_current.get_xdata()):
+            self.lines_from_start.append(self.line_from_current)
+            self.line_from_current = self._path_line("#00FF00")
+        self._set_path_data(self.line_from_current, trajectory)
+
+    def trajectory_history_cleared(self) -> None:
+        for line in self.lines_from_start:
+            line.remove()
+        self.lines_from_start = []
+
+    def goal_moved(self) -> None:
+        self.goal_viz.set_xy(self.rrt.goal[0])
+        # The goal is part of the static background, so save a new one.
+        self.background = None
+
+    def obstacles_changed(self) -> None:
+        self._draw_obstacles()
+        # Obstacles are part of the static background, so save a new one.
+        self.background = None
+
+    def agent_moved(self) -> None:
+        self.agent_viz.set_xdata([self.rrt.agent_pos[0]])
+        self.agent_viz.set_ydata([self.rrt.agent_pos[1]])
+
+    def connect_click(self, callback: Callable) -> None:
+        self.figure.canvas.mpl_connect("button_press_event", callback)
+
+    def refresh(self) -> None:
+        self.pending_refreshes += 1
+        if self.steps_per_frame is not None:
+            if self.pending_refreshes < self.steps_per_frame:
+                return
+        elif time.perf_counter() - self.last_frame_time < 1 / self.max_fps:
+            return
+        self._draw_frame()
+
+    def show(self) -> None:
+        if self.tree_changed:
+            self._update_tree_lines()
+        # Nothing moves anymore, so draw everything normally from here on.
+        for artist in self._animated_artists():
+            artist.set_animated(False)
+        plt.show()
@@ -0,0 +1,475 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from itertools import chain, product
+from math import floor, inf, prod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from motion_planning.config.rrt_config import (
+    INITIAL_TREE_CAPACITY,
+    NEIGHBOR_INDEX_CELL_SIZE,
+)
+from motion_planning.rrt.tree import Tree
+
+
+class NeighborIndex(ABC):
+    """
+    Spatial index over the nodes of a tree, used to answer nearest-node and
+    radius queries without scanning the whole tree. Node positions are read
+    from the tree, so a node must be removed from the index before its slot
+    in the tree is reused. Query points have as many coordinates as the
+    tree's points.
+    """
+
+    def __init__(self, tree: Tree):
+        self.tree = tree
+
+    @abstractmethod
+    def insert(self, node: int) -> None:
+        """
+        Add a node of the tree to the index.
+
+        node: ID of the node
+        """
+        pass
+
+    def insert_many(self, nodes: np.ndarray) -> None:
+        """
+        Add many nodes of the tree to the index, in order.
+
+        nodes: array of node IDs
+        """
+        for node in nodes.tolist():
+            self.insert(node)
+
+    @abstractmethod
+    def remove(self, node: int) -> None:
+        """
+        Remove a node of the tree from the index.
+
+        node: ID of the node
+        """
+        pass
+
+    @abstractmethod
+    def nearest(self, point: Sequence[float]) -> Optional[int]:
+        """
+        Return the indexed node closest to the given point.
+
+        point: coordinates of the query point
+        return: ID of the closest indexed node, or None if the index is empty
+        """
+        pass
+
+    def nearest_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Return the indexed node closest to each of the given points.
+
+        points: (n, dim) array of query points
+        return: array of n node IDs
+        """
+        return np.array([self.nearest(point) for point in points.tolist()])
+
+    @abstractmethod
+    def within(self, point: Sequence[float], radius: float) -> List[int]:
+        """
+        Return all indexed nodes at most radius away from the given point.
+
+        point: coordinates of the query point
+        radius: maximum distance from the query point
+        return: list of IDs of the indexed nodes within the radius
+        """
+        pass
+
+    @abstractmethod
+    def within_box(self, low: Sequence[float], high: Sequence[float]) -> List[int]:
+        """
+        Return all indexed nodes inside an axis-aligned box, boundary
+        included.
+
+        low: lowest corner of the box, e.g. (x, y) of the bottom left
+        high: highest corner of the box, e.g. (x, y) of the top right
+        return: list of IDs of the indexed nodes in the box
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def _distances_squared(
+        self, point: Sequence[float], nodes: np.ndarray
+    ) -> np.ndarray:
+        offsets = self.tree.points.take(nodes, axis=0) - point
+        return np.einsum("ij,ij->i", offsets, offsets)
+
+    def _in_box(
+        self, low: Sequence[float], high: Sequence[float], nodes: np.ndarray
+    ) -> List[int]:
+        points = self.tree.points.take(nodes, axis=0)
+        return nodes[((low <= points) & (points <= high)).all(axis=1)].tolist()
+
+
+class BruteForceIndex(NeighborIndex):
+    """
+    Vectorized scan over every node. O(n) per query, kept as a reference
+    implementation to check other indexes against.
+
+    Works in any number of dimensions. GridIndex falls back to one in more
+    than two, for queries that would look up too many cells, so the indexed
+    nodes and a copy of their points are kept packed at the front of two
+    arrays, which a query scans without first gathering them from the tree.
+    Removing a node moves the last one into its slot.
+    """
+
+    def __init__(self, tree: Tree):
+        super().__init__(tree)
+        self._nodes = np.empty(INITIAL_TREE_CAPACITY, dtype=np.intp)
+        self._points = np.empty((INITIAL_TREE_CAPACITY, tree.dim))
+        # Slot in the arrays of each indexed node
+        self._slots: Dict[int, int] = {}
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grow the arrays, doubling them, until they hold count nodes.
+        """
+        capacity = len(self._nodes)
+        while capacity < count:
+            capacity *= 2
+        if capacity > len(self._nodes):
+            used = len(self._slots)
+            nodes, points = self._nodes, self._points
+            self._nodes = np.empty(capacity, dtype=np.intp)
+            self._points = np.empty((capacity, self.tree.dim))
+            self._nodes[:used] = nodes[:used]
+            self._points[:used] = points[:used]
+
+    def insert(self, node: int) -> None:
+        slot = len(self._slots)
+        self._reserve(slot + 1)
+        self._nodes[slot] = node
+        self._points[slot] = self.tree.points[node]
+        self._slots[node] = slot
+
+    def insert_many(self, nodes: np.ndarray) -> None:
+        used = len(self._slots)
+        self._reserve(used + len(nodes))
+        self._nodes[used : used + len(nodes)] = nodes
+        self._points[used : used + len(nodes)] = self.tree.points.take(nodes, axis=0)
+        self._slots.update(zip(nodes.tolist(), range(used, used + len(nodes))))
+
+    def remove(self, node: int) -> None:
+        slot = self._slots.pop(node)
+        last = len(self._slots)
+        if slot != last:
+            moved = int(self._nodes[last])
+            self._nodes[slot] = moved
+            self._points[slot] = self._points[last]
+            self._slots[moved] = slot
+
+    def _scan(self, point: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the indexed nodes and their squared distances to the point.
+        """
+        used = len(self._slots)
+        offsets = self._points[:used] - point
+        return self._nodes[:used], np.einsum("ij,ij->i", offsets, offsets)
+
+    def nearest(self, point: Sequence[float]) -> Optional[int]:
+        if not self._slots:
+            return None
+        nodes, distances = self._scan(point)
+        return int(nodes[distances.argmin()])
+
+    def nearest_batch(self, points: np.ndarray) -> np.ndarray:
+        used = len(self._slots)
+        nodes, node_points = self._nodes[:used], self._points[:used]
+        result = np.empty(len(points), dtype=np.intp)
+        # Limit the offsets to about a million entries at a time.
+        chunk = max(1, 2**20 // (used * self.tree.dim))
+        for i in range(0, len(points), chunk):
+            offsets = points[i : i + chunk, None, :] - node_points
+            distances = np.einsum("ijk,ijk->ij", offsets, offsets)
+            result[i : i + chunk] = nodes[distances.argmin(axis=1)]
+        return result
+
+    def within(self, point: Sequence[float], radius: float) -> List[int]:
+        nodes, distances = self._scan(point)
+        return nodes[distances <= radius**2].tolist()
+
+    def within_box(self, low: Sequence[float], high: Sequence[float]) -> List[int]:
+        used = len(self._slots)
+        points = self._points[:used]
+        return self._nodes[:used][
+            ((low <= points) & (points <= high)).all(axis=1)
+        ].tolist()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+class GridIndex(NeighborIndex):
+    """
+    Uniform hash grid. Nodes are bucketed into cube cells of side
+    cell_size, keyed by their integer cell coordinates, so a radius query
+    only looks at the cells overlapping the query ball, and a nearest query
+    searches rings of cells outwards from the query point until no closer
+    node can exist.
+
+    With cell_size on the order of DELTA (the max edge length), RRT*'s
+    radius queries touch a block of 3^d cells in d dimensions. In more than
+    two dimensions the rings grow as fast, and a ring far from the tree is
+    mostly empty cells, so the index also keeps its nodes in a
+    BruteForceIndex, and scans that instead of looking up more cells than
+    it's worth, see _cells_cost_more.
+
+    Every query loops over cells, so in 2D the loops in _ring and
+    _candidates are written out for the two axes, which makes planner steps
+    measurably faster than the loops that work in any number of dimensions.
+    """
+
+    def __init__(self, tree: Tree, cell_size: float = NEIGHBOR_INDEX_CELL_SIZE):
+        super().__init__(tree)
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.size = 0
+        self._scan = BruteForceIndex(tree) if tree.dim != 2 else None
+        # Offsets of the cells in each ring searched, by ring, in more
+        # than 2D
+        self._ring_offsets: Dict[int, np.ndarray] = {}
+
+    def _cell(self, point: Sequence[float]) -> Tuple[int, ...]:
+        return tuple([floor(x / self.cell_size) for x in point])
+
+    def _cells_cost_more(self, num_cells: int) -> bool:
+        """
+        Return whether looking up num_cells cells one at a time in Python
+        costs more than scanning every node with NumPy, which takes about
+        as long as looking up one cell per 20 nodes.
+        """
+        return num_cells * 20 > self.size
+
+    def insert(self, node: int) -> None:
+        self.cells[self._cell(self.tree.point(node))].append(node)
+        self.size += 1
+        if self._scan is not None:
+            self._scan.insert(node)
+
+    def insert_many(self, nodes: np.ndarray) -> None:
+        # Group the nodes by cell with one sort, keeping their order within
+        # each cell, so there's only Python work per cell instead of per node.
+        nodes = np.asarray(nodes, dtype=np.intp)
+        if not len(nodes):
+            return
+        if self._scan is not None:
+            self._scan.insert_many(nodes)
+        cells = np.floor(self.tree.points.take(nodes, axis=0) / self.cell_size)
+        cells = cells.astype(np.int64)
+        order = np.lexsort(cells.T[::-1])
+        cells, nodes = cells[order], nodes[order]
+        starts = np.flatnonzero(np.r_[True, (cells[1:] != cells[:-1]).any(axis=1)])
+        for cell, group in zip(cells[starts].tolist(), np.split(nodes, starts[1:])):
+            self.cells[tuple(cell)].extend(group.tolist())
+        self.size += len(nodes)
+
+    def remove(self, node: int) -> None:
+        cell = self._cell(self.tree.point(node))
+        bucket = self.cells[cell]
+        bucket.remove(node)
+        if not bucket:
+            del self.cells[cell]
+        self.size -= 1
+        if self._scan is not None:
+            self._scan.remove(node)
+
+    def _ring(self, cell: Tuple[int, ...], ring: int) -> List[int]:
+        """
+        Return the nodes in all cells at Chebyshev distance ring from the
+        given cell.
+        """
+        if ring == 0:
+            return list(self.cells.get(cell, ()))
+        nodes = []
+        if len(cell) == 2:
+            # The top and bottom rows, then the sides
+            cx, cy = cell
+            for i in range(cx - ring, cx + ring + 1):
+                for j in (cy - ring, cy + ring):
+                    bucket = self.cells.get((i, j))
+                    if bucket:
+                        nodes.extend(bucket)
+            for j in range(cy - ring + 1, cy + ring):
+                for i in (cx - ring, cx + ring):
+                    bucket = self.cells.get((i, j))
+                    if bucket:
+                        nodes.extend(bucket)
+            return nodes
+        offsets = self._ring_offsets.get(ring)
+        if offsets is None:
+            side = np.arange(-ring, ring + 1)
+            cube = np.stack(
+                np.meshgrid(*[side] * len(cell), indexing="ij"), axis=-1
+            ).reshape(-1, len(cell))
+            offsets = cube[np.abs(cube).max(axis=1) == ring]
+            self._ring_offsets[ring] = offsets
+        for ring_cell in (offsets + cell).tolist():
+            bucket = self.cells.get(tuple(ring_cell))
+            if bucket:
+                nodes.extend(bucket)
+        return nodes
+
+    def nearest(self, point: Sequence[float]) -> Optional[int]:
+        if not self.size:
+            return None
+        cell = self._cell(point)
+        dim = len(cell)
+        best, best_dist = None, inf
+        ring = 0
+        while True:
+            # In more than 2D, stop looking up cells once the cube out to
+            # the ring after this one would cost more than a scan, since a
+            # search that gets this far usually needs another ring.
+            if dim != 2 and self._cells_cost_more((2 * ring + 3) ** dim):
+                return self._scan.nearest(point)
+            # In 2D, once a ring has more cells than are occupied, it's
+            # cheaper to scan the remaining occupied cells directly.
+            scan_rest = dim == 2 and 8 * ring > len(self.cells)
+            if scan_rest:
+                cx, cy = cell
+                candidates = []
+                for (i, j), bucket in self.cells.items():
+                    if max(abs(i - cx), abs(j - cy)) >= ring:
+                        candidates.extend(bucket)
+            else:
+                candidates = self._ring(cell, ring)
+            if candidates:
+                nodes = np.array(candidates)
+                distances = self._distances_squared(point, nodes)
+                closest = distances.argmin()
+                if distances[closest] < best_dist:
+                    best, best_dist = int(nodes[closest]), distances[closest]
+            if scan_rest:
+                return best
+            # Any node outside the rings searched so far is at least
+            # ring * cell_size away from the query point.
+            if best is not None and best_dist <= (ring * self.cell_size) ** 2:
+                return best
+            ring += 1
+
+    def nearest_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized nearest for many points at once. In 2D, searches the 3x3
+        block of cells around every point with NumPy, then falls back to
+        nearest for the points where that block can't rule out a closer
+        node. In more dimensions, calls nearest for each point.
+        """
+        if self.tree.dim != 2:
+            return np.array(
+                [self.nearest(point) for point in points.tolist()], dtype=np.intp
+            )
+        nodes = np.fromiter(chain.from_iterable(self.cells.values()), dtype=np.intp)
+        # Sort nodes by cell key so each cell's nodes are a contiguous range.
+        node_points = self.tree.points.take(nodes, axis=0)
+        keys = self._cell_keys(node_points[:, 0], node_points[:, 1])
+        order = keys.argsort(kind="stable")
+        nodes, keys = nodes[order], keys[order]
+
+        px, py = points[:, 0], points[:, 1]
+        sample_cx = np.floor(px / self.cell_size)
+        sample_cy = np.floor(py / self.cell_size)
+        result = np.full(len(points), -1, dtype=np.intp)
+        best_dist = np.full(len(points), inf)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell_keys = self._cell_keys_from_cells(sample_cx + dx, sample_cy + dy)
+                start = keys.searchsorted(cell_keys, side="left")
+                counts = keys.searchsorted(cell_keys, side="right") - start
+                has_nodes = counts > 0
+                if not has_nodes.any():
+                    continue
+                start, counts = start[has_nodes], counts[has_nodes]
+                samples = np.flatnonzero(has_nodes)
+                # Expand each point's [start, start + count) range of nodes.
+                # Candidates end up grouped by point, in point order.
+                group_starts = counts.cumsum() - counts
+                offsets = np.arange(counts.sum()) - np.repeat(group_starts, counts)
+                candidates = nodes[np.repeat(start, counts) + offsets]
+                candidate_points = self.tree.points.take(candidates, axis=0)
+                distances = (
+                    candidate_points[:, 0] - np.repeat(px[samples], counts)
+                ) ** 2 + (candidate_points[:, 1] - np.repeat(py[samples], counts)) ** 2
+                group_min = np.minimum.reduceat(distances, group_starts)
+                # First candidate in each group that achieves the minimum
+                is_min = np.flatnonzero(distances == np.repeat(group_min, counts))
+                _, first = np.unique(
+                    np.repeat(np.arange(len(samples)), counts)[is_min],
+                    return_index=True,
+                )
+                closer = group_min < best_dist[samples]
+                result[samples[closer]] = candidates[is_min[first]][closer]
+                best_dist[samples[closer]] = group_min[closer]
+        # Nodes outside the 3x3 block are at least cell_size away.
+        for i in np.flatnonzero(best_dist > self.cell_size**2):
+            result[i] = self.nearest((px[i], py[i]))
+        return result
+
+    def _cell_keys(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return self._cell_keys_from_cells(
+            np.floor(x / self.cell_size), np.floor(y / self.cell_size)
+        )
+
+    def _cell_keys_from_cells(self, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        """
+        Pack cell coordinates into a single int64 key per cell.
+        """
+        return cx.astype(np.int64) * 2**32 + (cy.astype(np.int64) + 2**31)
+
+    def _candidates(
+        self, low: Tuple[int, ...], high: Tuple[int, ...]
+    ) -> Optional[List[int]]:
+        """
+        Return the nodes in the block of cells from low to high, or in more
+        than 2D, None if the block has too many cells to look up, see
+        _cells_cost_more.
+
+        low: cell at the low corner of the block
+        high: cell at the high corner of the block
+        """
+        candidates = []
+        if len(low) == 2:
+            for i in range(low[0], high[0] + 1):
+                for j in range(low[1], high[1] + 1):
+                    bucket = self.cells.get((i, j))
+                    if bucket:
+                        candidates.extend(bucket)
+            return candidates
+        if self._cells_cost_more(prod(b - a + 1 for a, b in zip(low, high))):
+            return None
+        for cell in product(*[range(a, b + 1) for a, b in zip(low, high)]):
+            bucket = self.cells.get(cell)
+            if bucket:
+                candidates.extend(bucket)
+        return candidates
+
+    def within(self, point: Sequence[float], radius: float) -> List[int]:
+        low = [x - radius for x in point]
+        high = [x + radius for x in point]
+        candidates = self._candidates(self._cell(low), self._cell(high))
+        if candidates is None:
+            return self._scan.within(point, radius)
+        if not candidates:
+            return []
+        nodes = np.array(candidates)
+        return nodes[self._distances_squared(point, nodes) <= radius**2].tolist()
+
+    def within_box(self, low: Sequence[float], high: Sequence[float]) -> List[int]:
+        candidates = self._candidates(self._cell(low), self._cell(high))
+        if candidates is None:
+            return self._scan.within_box(low, high)
+        if not candidates:
+            return []
+        return self._in_box(low, high, np.array(candidates))
+
+    def __len__(self) -> int:
+        return self.size
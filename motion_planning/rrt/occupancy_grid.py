@@ -0,0 +1,206 @@
+from math import floor
+from typing import Tuple
+
+import numpy as np
+
+from motion_planning.rrt.collision import CollisionMap
+
+
+class OccupancyGrid(CollisionMap):
+    """
+    Collision checks against a raster occupancy map, where every nonzero
+    cell is an obstacle.
+
+    Row i of the grid covers y from origin[1] + i * resolution upwards, and
+    column j covers x from origin[0] + j * resolution, so the first row is
+    at the bottom of the map. Everything outside the grid counts as an
+    obstacle.
+
+    The grid can be any array-like with a shape and integer indexing,
+    including a numpy.memmap, in which case only the pages a query touches
+    are ever read from disk. Use from_npy or from_raw to load a file that
+    way.
+
+    Segments are checked by walking every cell they pass through with a
+    DDA (Amanatides-Woo) traversal, so the cost of a check grows with the
+    segment's length in cells, not with the size of the map.
+    """
+
+    def __init__(
+        self,
+        grid: np.ndarray,
+        resolution: float = 1.0,
+        origin: Tuple[float, float] = (0.0, 0.0),
+    ):
+        """
+        grid: 2D array of cells, nonzero where occupied
+        resolution: side length of a cell
+        origin: (x, y) of the bottom left corner of the grid
+        """
+        self.grid = grid
+        self.resolution = resolution
+        self.origin = origin
+        self.rows, self.columns = grid.shape
+
+    @classmethod
+    def from_npy(
+        cls,
+        path: str,
+        resolution: float = 1.0,
+        origin: Tuple[float, float] = (0.0, 0.0),
+    ) -> "OccupancyGrid":
+        """
+        Memory-map a 2D array saved with numpy.save.
+
+        path: path to the .npy file
+        resolution: side length of a cell
+        origin: (x, y) of the bottom left corner of the grid
+        """
+        return cls(np.load(path, mmap_mode="r"), resolution, origin)
+
+    @classmethod
+    def from_raw(
+        cls,
+        path: str,
+        shape: Tuple[int, int],
+        dtype: np.dtype = np.uint8,
+        resolution: float = 1.0,
+        origin: Tuple[float, float] = (0.0, 0.0),
+        offset: int = 0,
+    ) -> "OccupancyGrid":
+        """
+        Memory-map a headerless binary file of cells stored row by row.
+
+        path: path to the file
+        shape: (rows, columns) of the grid
+        dtype: type of each cell
+        resolution: side length of a cell
+        origin: (x, y) of the bottom left corner of the grid
+        offset: number of bytes to skip at the start of the file
+        """
+        grid = np.memmap(path, dtype=dtype, mode="r", shape=shape, offset=offset)
+        return cls(grid, resolution, origin)
+
+    @property
+    def extent(self) -> Tuple[float, float, float, float]:
+        """
+        (left, right, bottom, top) of the area the grid covers.
+        """
+        return (
+            self.origin[0],
+            self.origin[0] + self.columns * self.resolution,
+            self.origin[1],
+            self.origin[1] + self.rows * self.resolution,
+        )
+
+    def _cell(self, point: Tuple[float, float]) -> Tuple[int, int]:
+        """
+        Return the (column, row) of the cell containing the point.
+        """
+        return (
+            floor((point[0] - self.origin[0]) / self.resolution),
+            floor((point[1] - self.origin[1]) / self.resolution),
+        )
+
+    def _cell_free(self, column: int, row: int) -> bool:
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return False
+        return not self.grid[row, column]
+
+    def point_free(self, point: Tuple[float, float]) -> bool:
+        return self._cell_free(*self._cell(point))
+
+    def segment_free(self, a: Tuple[float, float], b: Tuple[float, float]) -> bool:
+        column, row = self._cell(a)
+        end_column, end_row = self._cell(b)
+        steps_x, steps_y = abs(end_column - column), abs(end_row - row)
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        # Parameter t along the segment at which it crosses into the next
+        # column or row, and how much t grows per column or row crossed.
+        next_x, delta_x = self._first_crossing(a[0], dx, column, self.origin[0])
+        next_y, delta_y = self._first_crossing(a[1], dy, row, self.origin[1])
+
+        if not self._cell_free(column, row):
+            return False
+        for _ in range(steps_x + steps_y):
+            # Ties go to x, which visits a cell beside the corner the
+            # segment passes through instead of jumping diagonally past it.
+            if steps_x and (next_x <= next_y or not steps_y):
+                column += step_x
+                next_x += delta_x
+                steps_x -= 1
+            else:
+                row += step_y
+                next_y += delta_y
+                steps_y -= 1
+            if not self._cell_free(column, row):
+                return False
+        return True
+
+    def _first_crossing(
+        self, start: float, d: float, cell: int, origin: float
+    ) -> Tuple[float, float]:
+        """
+        Return the segment parameter of the first cell boundary crossed
+        along one axis, and the parameter distance between boundaries.
+        """
+        if d == 0:
+            return float("inf"), float("inf")
+        boundary = origin + (cell + (d > 0)) * self.resolution
+        return (boundary - start) / d, self.resolution / abs(d)
+
+    def segments_free(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Batched segment_free. Walks every segment's cells in lockstep, one
+        cell per segment per iteration, so the number of NumPy operations
+        grows with the longest segment, not with the number of segments.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.broadcast_to(np.asarray(ends, dtype=np.float64), starts.shape)
+        origin = np.asarray(self.origin, dtype=np.float64)
+        cells = np.floor((starts - origin) / self.resolution).astype(np.int64)
+        end_cells = np.floor((ends - origin) / self.resolution).astype(np.int64)
+        offsets = ends - starts
+        steps = np.abs(end_cells - cells)
+        direction = np.where(offsets > 0, 1, -1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundaries = origin + (cells + (offsets > 0)) * self.resolution
+            next_crossing = np.where(
+                offsets != 0, (boundaries - starts) / offsets, np.inf
+            )
+            crossing_delta = np.where(
+                offsets != 0, self.resolution / np.abs(offsets), np.inf
+            )
+
+        free = self._cells_free(cells)
+        for _ in range(int(steps.sum(axis=1).max(initial=0))):
+            active = free & (steps.sum(axis=1) > 0)
+            if not active.any():
+                break
+            along_x = (steps[:, 0] > 0) & (
+                (next_crossing[:, 0] <= next_crossing[:, 1]) | (steps[:, 1] == 0)
+            )
+            axis = np.where(along_x, 0, 1)
+            rows = np.flatnonzero(active)
+            moved_axis = axis[rows]
+            cells[rows, moved_axis] += direction[rows, moved_axis]
+            next_crossing[rows, moved_axis] += crossing_delta[rows, moved_axis]
+            steps[rows, moved_axis] -= 1
+            free[rows] = self._cells_free(cells[rows])
+        return free
+
+    def _cells_free(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Vectorized _cell_free for an (n, 2) array of (column, row) cells.
+        """
+        inside = (
+            (cells[:, 0] >= 0)
+            & (cells[:, 0] < self.columns)
+            & (cells[:, 1] >= 0)
+            & (cells[:, 1] < self.rows)
+        )
+        free = np.zeros(len(cells), dtype=bool)
+        inside_cells = cells[inside]
+        free[inside] = self.grid[inside_cells[:, 1], inside_cells[:, 0]] == 0
+        return free
@@ -0,0 +1,344 @@
+"""
+Answer many start/goal queries against a few static maps from a cache of
+grown RRT* trees, instead of growing a new tree for every query.
+
+Trees are cached per map and per start region. A query whose start falls in
+a region that already has a tree re-roots that tree at its start and moves
+its goal, the same way clicking a new goal does in the anytime demo, so it
+usually has a path after few or no steps. Trees are evicted in least
+recently used order once the cached trees use more memory than the budget.
+
+PlanningService can be used directly from any number of threads, or served
+over a socket with serve, which speaks one JSON object per line.
+"""
+
+from collections import OrderedDict
+from math import floor, inf
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+
+from motion_planning.config.rrt_config import (
+    BOUNDS,
+    SERVICE_MAX_STEPS,
+    SERVICE_MEMORY_BUDGET,
+    SERVICE_REFINE_STEPS,
+    SERVICE_START_REGION_SIZE,
+)
+from motion_planning.rrt.collision import CollisionMap
+from motion_planning.rrt.rrt_star import RRTStar
+
+
+class QueryResult(NamedTuple):
+    # Best path found, as a list of points from the start, and its cost
+    # (inf if none)
+    path: List[Tuple[float, float]]
+    cost: float
+    # Whether the query was answered from a cached tree
+    cache_hit: bool
+    steps: int
+    # Seconds from receiving the query to answering it
+    latency: float
+
+
+class ServiceStats(NamedTuple):
+    queries: int
+    cache_hits: int
+    hit_rate: float
+    # Seconds per query
+    mean_latency: float
+    p50_latency: float
+    p95_latency: float
+    # Queries answered per second, from the start of the first query to
+    # the end of the last
+    throughput: float
+    cached_trees: int
+    cached_bytes: int
+    evictions: int
+
+
+class _MapEntry(NamedTuple):
+    collision_map: CollisionMap
+    bounds: Tuple[Tuple[float, ...], Tuple[float, ...]]
+
+
+class _CachedTree:
+    def __init__(self):
+        # Held while a query uses the tree, so each tree serves one query at
+        # a time
+        self.lock = threading.Lock()
+        self.rrt: Optional[RRTStar] = None
+        self.nbytes = 0
+
+
+class PlanningService:
+    """
+    Long-lived planner that keeps grown trees between queries.
+
+    Queries on different trees run concurrently. Queries on the same tree
+    wait for each other. Planning holds the GIL, so concurrent queries
+    share one core, but a slow query never blocks cache hits on other
+    trees for longer than a thread switch.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = SERVICE_MEMORY_BUDGET,
+        start_region_size: float = SERVICE_START_REGION_SIZE,
+        max_steps: int = SERVICE_MAX_STEPS,
+        refine_steps: int = SERVICE_REFINE_STEPS,
+    ):
+        """
+        memory_budget: most bytes of tree arrays to keep cached
+        start_region_size: side length of the square start regions that
+            share a tree
+        max_steps: most steps a query may take to find a path
+        refine_steps: steps to take after a path is found to improve it
+        """
+        self.memory_budget = memory_budget
+        self.start_region_size = start_region_size
+        self.max_steps = max_steps
+        self.refine_steps = refine_steps
+        self._maps: Dict[str, _MapEntry] = {}
+        # (map name, start region) -> _CachedTree, least recently used first
+        self._cache: "OrderedDict[Tuple[str, Tuple[int, ...]], _CachedTree]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def add_map(
+        self,
+        name: str,
+        collision_map: CollisionMap,
+        bounds: Tuple[Sequence[float], Sequence[float]] = BOUNDS,
+    ) -> None:
+        """
+        Make a map available to queries, dropping any trees cached for an
+        earlier map with the same name.
+
+        name: name that queries refer to the map by
+        collision_map: the map's obstacles, e.g. a CollisionChecker or
+            OccupancyGrid
+        bounds: ((low corner), (high corner)) of the area points are
+            sampled from
+        """
+        with self._lock:
+            self._maps[name] = _MapEntry(collision_map, bounds)
+            for key in [key for key in self._cache if key[0] == name]:
+                del self._cache[key]
+
+    def plan(
+        self,
+        map_name: str,
+        start: Tuple[float, float],
+        goal: Tuple[Tuple[float, float], Tuple[float, float]],
+    ) -> QueryResult:
+        """
+        Return the best path found from start to goal on a map.
+
+        map_name: name the map was added with
+        start: (x, y) start position
+        goal: ((bottom left), (top right)) corners of the goal region
+        return: the path and how it was found
+        """
+        start_time = time.perf_counter()
+        start = tuple(start)
+        key = (map_name, self._start_region(start))
+        with self._lock:
+            map_entry = self._maps[map_name]
+            cached = self._cache.get(key)
+            if cached is None:
+                cached = self._cache[key] = _CachedTree()
+            self._cache.move_to_end(key)
+
+        with cached.lock:
+            cache_hit = cached.rrt is not None
+            if cache_hit:
+                try:
+                    cached.rrt.reroot(start)
+                except ValueError:
+                    # The start can't be joined to the tree, e.g. it's
+                    # behind a wall from every node in it
+                    cache_hit = False
+            if not cache_hit:
+                cached.rrt = self._new_planner(map_entry, start, goal)
+            rrt = cached.rrt
+            rrt.set_goal(goal)
+            steps = self._step(rrt)
+            path, cost = rrt.best_path_to_goal(), rrt.best_cost_to_goal()
+            nbytes = rrt.tree.nbytes
+
+        end_time = time.perf_counter()
+        result = QueryResult(path, cost, cache_hit, steps, end_time - start_time)
+        with self._lock:
+            cached.nbytes = nbytes
+            self._evict(keep=cached)
+            self._latencies.append(result.latency)
+            self._cache_hits += cache_hit
+            if self._first_start is None or start_time < self._first_start:
+                self._first_start = start_time
+            self._last_end = max(self._last_end, end_time)
+        return result
+
+    def _start_region(self, start: Sequence[float]) -> Tuple[int, ...]:
+        return tuple([floor(x / self.start_region_size) for x in start])
+
+    def _new_planner(
+        self,
+        map_entry: _MapEntry,
+        start: Tuple[float, float],
+        goal: Tuple[Tuple[float, float], Tuple[float, float]],
+    ) -> RRTStar:
+        return RRTStar(
+            start, goal, collision_map=map_entry.collision_map, bounds=map_entry.bounds
+        )
+
+    def _step(self, rrt: RRTStar) -> int:
+        """
+        Step until a path is found or max_steps is reached, then take
+        refine_steps more steps if a path was found.
+
+        return: number of steps taken
+        """
+        steps = 0
+        while rrt.best_goal_node is None and steps < self.max_steps:
+            rrt.step(visualize=False)
+            steps += 1
+        if rrt.best_goal_node is not None:
+            for _ in range(self.refine_steps):
+                rrt.step(visualize=False)
+            steps += self.refine_steps
+        return steps
+
+    def _evict(self, keep: _CachedTree) -> None:
+        """
+        Drop least recently used trees until the cache fits the memory
+        budget, never dropping keep. A query still using a dropped tree
+        finishes with it as usual. Needs self._lock.
+        """
+        total = sum(cached.nbytes for cached in self._cache.values())
+        for key in list(self._cache):
+            if total <= self.memory_budget:
+                break
+            cached = self._cache[key]
+            if cached is keep:
+                continue
+            total -= cached.nbytes
+            del self._cache[key]
+            self._evictions += 1
+
+    def stats(self) -> ServiceStats:
+        """
+        Return the cache and latency statistics since the last reset_stats.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies)
+            queries = len(latencies)
+            elapsed = (
+                self._last_end - self._first_start
+                if self._first_start is not None
+                else inf
+            )
+            return ServiceStats(
+                queries=queries,
+                cache_hits=self._cache_hits,
+                hit_rate=self._cache_hits / queries if queries else 0.0,
+                mean_latency=float(latencies.mean()) if queries else 0.0,
+                p50_latency=float(np.percentile(latencies, 50)) if queries else 0.0,
+                p95_latency=float(np.percentile(latencies, 95)) if queries else 0.0,
+                throughput=queries / elapsed if elapsed > 0 else 0.0,
+                cached_trees=len(self._cache),
+                cached_bytes=sum(cached.nbytes for cached in self._cache.values()),
+                evictions=self._evictions,
+            )
+
+    def reset_stats(self) -> None:
+        """
+        Forget the statistics so far, keeping the cached trees.
+        """
+        with self._lock:
+            self._latencies = []
+            self._cache_hits = 0
+            self._evictions = 0
+            self._first_start = None
+            self._last_end = 0.0
+
+
+async def _handle_connection(
+    service: PlanningService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        try:
+            request = json.loads(line)
+            if request.get("op", "plan") == "stats":
+                response = service.stats()._asdict()
+            else:
+                result = await loop.run_in_executor(
+                    None,
+                    service.plan,
+                    request["map"],
+                    request["start"],
+                    request["goal"],
+                )
+                response = result._asdict()
+                if result.cost == inf:
+                    response["cost"] = None
+        except (KeyError, TypeError, ValueError) as error:
+            response = {"error": repr(error)}
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+    writer.close()
+
+
+async def serve(
+    service: PlanningService, host: str = "127.0.0.1", port: int = 8765
+) -> None:
+    """
+    Serve queries over TCP until cancelled. Each line a client sends is a
+    JSON object, answered by one line of JSON:
+
+        {"map": name, "start": [x, y], "goal": [[x, y], [x, y]]}
+            -> the fields of QueryResult, with a cost of null if no path
+            was found
+        {"op": "stats"} -> the fields of ServiceStats
+
+    Queries run in the event loop's default thread pool, so a slow query
+    doesn't hold up other clients.
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer),
+        host,
+        port,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def run_planning_service() -> None:
+    from motion_planning.benchmark.scenarios import SCENARIOS
+    from motion_planning.rrt.collision import CollisionChecker
+
+    service = PlanningService()
+    for name, scenario in SCENARIOS.items():
+        service.add_map(
+            name,
+            CollisionChecker(scenario.obstacles),
+            scenario.bounds,
+        )
+    print("Serving maps", ", ".join(SCENARIOS), "on 127.0.0.1:8765")
+    asyncio.run(serve(service))
+
+
+if __name__ == "__main__":
+    run_planning_service()
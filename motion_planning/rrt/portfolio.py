@@ -0,0 +1,162 @@
+"""
+Run a portfolio of independent RRT* planners across a process pool and keep
+the best path any of them finds.
+
+Each planner differs only in its random seed and, optionally, its delta and
+gamma settings, so the planners never need to talk to each other. This
+spreads the search across cores without touching the single-threaded
+planner code.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from math import inf
+from multiprocessing import Manager
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import time
+
+from motion_planning.config.rrt_config import (
+    DELTA,
+    GAMMA_RRT_STAR,
+    OBSTACLES,
+    PORTFOLIO_CANCEL_CHECK_INTERVAL,
+)
+from motion_planning.rrt.rrt_star import RRTStar
+from motion_planning.rrt.sampling import UniformSampler
+
+
+class PlannerConfig(NamedTuple):
+    seed: int
+    delta: float = DELTA
+    gamma: float = GAMMA_RRT_STAR
+
+
+class WorkerResult(NamedTuple):
+    config: PlannerConfig
+    # Best path found, as a list of points, and its cost (inf if none)
+    path: List[Tuple[float, float]]
+    cost: float
+    steps: int
+    nodes: int
+    # Seconds from the start of planning until the first path was found,
+    # or None if no path was found
+    time_to_first_solution: Optional[float]
+    elapsed: float
+
+
+class PortfolioResult(NamedTuple):
+    # The cheapest result, or None if no planner found a path
+    best: Optional[WorkerResult]
+    # One result per config, in the order the configs were given
+    results: List[WorkerResult]
+
+
+def _run_worker(
+    start: Tuple[float, float],
+    goal: Tuple[Tuple[float, float], Tuple[float, float]],
+    obstacles: Sequence[Tuple[Tuple[float, float], float, float]],
+    config: PlannerConfig,
+    max_steps: Optional[int],
+    deadline: Optional[float],
+    first_solution: bool,
+    cancel,
+) -> WorkerResult:
+    """
+    Run one headless RRT* planner until it runs out of steps or time, or,
+    in first solution mode, until it or another worker finds a path.
+    """
+    rrt = RRTStar(start, goal, obstacles=obstacles, sampler=UniformSampler(config.seed))
+    rrt.delta = config.delta
+    rrt.gamma = config.gamma
+
+    start_time = time.time()
+    time_to_first_solution = None
+    steps = 0
+    while max_steps is None or steps < max_steps:
+        if deadline is not None and time.time() >= deadline:
+            break
+        if (
+            cancel is not None
+            and steps % PORTFOLIO_CANCEL_CHECK_INTERVAL == 0
+            and cancel.is_set()
+        ):
+            break
+        rrt.step(visualize=False)
+        steps += 1
+        if time_to_first_solution is None and rrt.best_goal_node is not None:
+            time_to_first_solution = time.time() - start_time
+            if first_solution:
+                cancel.set()
+                break
+
+    return WorkerResult(
+        config=config,
+        path=rrt.best_path_to_goal(),
+        cost=rrt.best_cost_to_goal(),
+        steps=steps,
+        nodes=len(rrt.tree),
+        time_to_first_solution=time_to_first_solution,
+        elapsed=time.time() - start_time,
+    )
+
+
+def plan_portfolio(
+    start: Tuple[float, float],
+    goal: Tuple[Tuple[float, float], Tuple[float, float]],
+    configs: Sequence[PlannerConfig],
+    max_steps: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    first_solution: bool = False,
+    workers: Optional[int] = None,
+    obstacles: Sequence[Tuple[Tuple[float, float], float, float]] = OBSTACLES,
+) -> PortfolioResult:
+    """
+    Return the best path found by one RRT* planner per config, run in a
+    process pool.
+
+    With only a step budget, every planner's result depends only on its
+    config, so the same configs always give the same result. A time budget
+    or first solution mode makes the number of steps each planner gets
+    depend on timing, though each planner's path is still the one its seed
+    gives after that many steps.
+
+    start: (x, y) start position
+    goal: ((bottom left), (top right)) corners of the goal region
+    configs: seed and settings for each planner
+    max_steps: most steps each planner may take
+    time_budget: seconds of wall-clock time for the whole portfolio; planners
+        still queued for a free worker get what is left when they start
+    first_solution: stop all planners as soon as any of them finds a path.
+        Still needs a step or time budget, in case none of them does.
+    workers: number of processes, defaults to one per core
+    obstacles: obstacles as ((bottom left), width, height)
+    return: the best result and the result of every planner
+    """
+    if max_steps is None and time_budget is None:
+        raise ValueError("Need a step budget or a time budget")
+
+    with ExitStack() as stack:
+        # The event that stops the other planners lives in a manager
+        # process, so only start one when it's needed
+        cancel = stack.enter_context(Manager()).Event() if first_solution else None
+        pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        deadline = time.time() + time_budget if time_budget is not None else None
+        futures = [
+            pool.submit(
+                _run_worker,
+                start,
+                goal,
+                obstacles,
+                config,
+                max_steps,
+                deadline,
+                first_solution,
+                cancel,
+            )
+            for config in configs
+        ]
+        results = [future.result() for future in futures]
+
+    found = [result for result in results if result.cost < inf]
+    best = min(found, key=lambda result: result.cost) if found else None
+    return PortfolioResult(best=best, results=results)
@@ -0,0 +1,174 @@
+from contextlib import nullcontext
+from typing import ContextManager, Dict
+import json
+import time
+
+# Shared by every disabled phase, so a disabled profiler allocates nothing
+_NULL_PHASE = nullcontext()
+
+
+class Profiler:
+    """
+    Collects timings and counts from the phases of a planner's step loop.
+    Planners call these hooks as they run. This base class ignores all of
+    them, so a planner with the default profiler only pays for the calls.
+    """
+
+    def phase(self, name: str) -> ContextManager:
+        """
+        Return a context manager that times the code run inside it.
+
+        name: name of the phase, e.g. "nearest"
+        """
+        return _NULL_PHASE
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Add to a running total.
+
+        name: name of the counter, e.g. "collision_checks"
+        n: amount to add
+        """
+        pass
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Record one value of a quantity that varies per step, such as the
+        size of a neighbor set.
+
+        name: name of the quantity
+        value: the value seen
+        """
+        pass
+
+
+class _Phase:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals: Dict[str, list], name: str):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        total = self.totals.get(self.name)
+        if total is None:
+            self.totals[self.name] = [elapsed, 1]
+        else:
+            total[0] += elapsed
+            total[1] += 1
+
+
+class PhaseProfiler(Profiler):
+    """
+    Profiler that keeps the total time and number of calls of each phase,
+    the total of each counter, and the count, mean, min and max of each
+    observed quantity.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget everything recorded so far.
+        """
+        # name -> [total seconds, calls]
+        self.phases: Dict[str, list] = {}
+        self.counters: Dict[str, int] = {}
+        # name -> [count, total, min, max]
+        self.observations: Dict[str, list] = {}
+
+    def phase(self, name: str) -> ContextManager:
+        return _Phase(self.phases, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        stats = self.observations.get(name)
+        if stats is None:
+            self.observations[name] = [1, value, value, value]
+        else:
+            stats[0] += 1
+            stats[1] += value
+            stats[2] = min(stats[2], value)
+            stats[3] = max(stats[3], value)
+
+    def summary(self) -> Dict:
+        """
+        Return everything recorded so far as a dict of plain values.
+        """
+        total_time = sum(seconds for seconds, _ in self.phases.values())
+        return {
+            "phases": {
+                name: {
+                    "seconds": seconds,
+                    "calls": calls,
+                    "fraction": seconds / total_time if total_time else 0,
+                }
+                for name, (seconds, calls) in self.phases.items()
+            },
+            "counters": dict(self.counters),
+            "observations": {
+                name: {
+                    "count": count,
+                    "mean": total / count,
+                    "min": low,
+                    "max": high,
+                }
+                for name, (count, total, low, high) in self.observations.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        """
+        Return the summary as a JSON string.
+        """
+        return json.dumps(self.summary(), indent=2)
+
+    def table(self) -> str:
+        """
+        Return the summary as a human-readable table, with the slowest
+        phases first.
+        """
+        summary = self.summary()
+        lines = [
+            "{:<16} {:>10} {:>10} {:>12} {:>7}".format(
+                "phase", "seconds", "calls", "us/call", "%"
+            )
+        ]
+        for name, stats in sorted(
+            summary["phases"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            lines.append(
+                "{:<16} {:>10.4f} {:>10} {:>12.2f} {:>7.1f}".format(
+                    name,
+                    stats["seconds"],
+                    stats["calls"],
+                    stats["seconds"] / stats["calls"] * 1e6,
+                    stats["fraction"] * 100,
+                )
+            )
+        if summary["counters"]:
+            lines.append("")
+            lines.append("{:<16} {:>10}".format("counter", "total"))
+            for name, total in sorted(summary["counters"].items()):
+                lines.append("{:<16} {:>10}".format(name, total))
+        if summary["observations"]:
+            lines.append("")
+            lines.append(
+                "{:<16} {:>10} {:>10} {:>10} {:>10}".format(
+                    "quantity", "count", "mean", "min", "max"
+                )
+            )
+            for name, stats in sorted(summary["observations"].items()):
+                lines.append(
+                    "{:<16} {:>10} {:>10.2f} {:>10} {:>10}".format(
+                        name, stats["count"], stats["mean"], stats["min"], stats["max"]
+                    )
+                )
+        return "\n".join(lines)
@@ -0,0 +1,254 @@
+"""
+Run an anytime RRT* planner continuously in a background thread, so that
+planning no longer waits on the controller and the controller never waits
+on planning for longer than its per-tick budget.
+
+The planner thread owns the tree. The controller only ever sees immutable
+PlanSnapshots, and asks for changes (a new trajectory, a new goal) through
+requests that the planner thread handles between steps. If a step raises,
+the planner thread stops, and the controller's next call raises the error.
+"""
+
+from math import inf
+from typing import NamedTuple, Optional, Tuple
+import threading
+import time
+
+from motion_planning.config.rrt_config import (
+    AGENT_SPEED,
+    AGENT_START_POSITION,
+    ANYTIME_TRAJECTORY_LENGTH,
+    GOAL_POSITION,
+    REALTIME_TICK_BUDGET,
+)
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from motion_planning.rrt.trajectory import Trajectory, TrajectoryFollower
+
+
+class PlanSnapshot(NamedTuple):
+    # Points of the most recently committed trajectory, from the agent's
+    # position onwards. Empty if no trajectory has been committed yet.
+    trajectory: Tuple[Tuple[float, float], ...]
+    # Increases by one with every committed trajectory
+    trajectory_number: int
+    # Cost of the best path from the end of the committed trajectory to the
+    # goal, or inf if there's no path yet
+    cost_to_goal: float
+    # Whether the end of the committed trajectory is in the goal
+    reached_goal: bool
+    # Total number of planner steps taken so far
+    steps: int
+
+
+class RealtimePlanner:
+    """
+    Steps an AnytimeRRTStar in a background thread.
+
+    The controller calls next_trajectory when its agent needs a new
+    trajectory to follow. The planner thread commits the first edges of the
+    best path, re-roots the tree at their end and keeps planning from there,
+    exactly like the anytime demo, but without stopping while the agent
+    moves.
+
+    Both threads need the GIL, so this doesn't plan any faster than stepping
+    in the control loop would. What it buys is that planning runs at its own
+    rate, and that next_trajectory returns within its budget, plus at most
+    one interpreter thread switch interval, even when no path exists.
+    """
+
+    def __init__(
+        self,
+        rrt: AnytimeRRTStar,
+        trajectory_length: int = ANYTIME_TRAJECTORY_LENGTH,
+    ):
+        self.rrt = rrt
+        self.trajectory_length = trajectory_length
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._commit_requested = False
+        self._new_goal = None
+        self._steps = 0
+        self._thread = None
+        self._snapshot = PlanSnapshot((), 0, inf, False, 0)
+        # Exception that stopped the planner thread, if any
+        self._error: Optional[Exception] = None
+
+    def start(self) -> "RealtimePlanner":
+        """
+        Start planning in the background.
+        """
+        self._stopped = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop planning and wait for the planner thread to finish its step.
+        Raises the exception that stopped the planner thread, if any.
+        """
+        with self._condition:
+            self._stopped = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+    def __enter__(self) -> "RealtimePlanner":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.stop()
+        except Exception:
+            # Don't hide an exception already leaving the with block, which
+            # is often the same planner error raised by next_trajectory
+            if exc_type is None:
+                raise
+
+    def _raise_error(self) -> None:
+        """
+        Raise the exception that stopped the planner thread, if any.
+        """
+        if self._error is not None:
+            raise self._error
+
+    def snapshot(self) -> PlanSnapshot:
+        """
+        Return the latest published state without waiting. Raises the
+        exception that stopped the planner thread, if any.
+        """
+        self._raise_error()
+        return self._snapshot
+
+    def next_trajectory(self, budget: float = REALTIME_TICK_BUDGET) -> PlanSnapshot:
+        """
+        Ask the planner to commit the next trajectory, and wait at most
+        budget seconds for it.
+
+        If the planner has no path to the goal by then, the returned
+        snapshot still holds the previous trajectory, which tells the
+        controller there's no path yet. The request stays open, so the
+        trajectory is committed as soon as a path is found, and a later call
+        or snapshot picks it up.
+
+        Raises the exception that stopped the planner thread, if any.
+
+        budget: most seconds to wait
+        return: the latest snapshot, with a new trajectory if one was
+        committed in time
+        """
+        with self._condition:
+            self._raise_error()
+            number = self._snapshot.trajectory_number
+            self._commit_requested = True
+            self._condition.wait_for(
+                lambda: self._snapshot.trajectory_number != number
+                or self._error is not None,
+                timeout=budget,
+            )
+            self._raise_error()
+            return self._snapshot
+
+    def set_goal(self, goal: Tuple[Tuple[float, float], Tuple[float, float]]) -> None:
+        """
+        Move the goal region. Takes effect before the planner's next step.
+
+        goal: ((bottom left), (top right)) corners of the new goal region
+        """
+        with self._condition:
+            self._new_goal = goal
+
+    def _run(self) -> None:
+        try:
+            self._plan()
+        except Exception as error:
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+
+    def _plan(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                new_goal, self._new_goal = self._new_goal, None
+                commit = self._commit_requested
+            if new_goal is not None:
+                self.rrt.set_goal(new_goal)
+            trajectory = None
+            if commit and self.rrt.best_goal_node is not None:
+                trajectory = self._commit_trajectory()
+            self.rrt.step(visualize=False)
+            self._steps += 1
+            self._publish(trajectory)
+
+    def _commit_trajectory(self) -> Tuple[Tuple[float, float], ...]:
+        """
+        Re-root the tree at the end of the first edges of the best path, and
+        return the points of those edges.
+        """
+        trajectory = self.rrt.best_node_path_to_goal()[: self.trajectory_length]
+        points = tuple(self.rrt.tree.point(node) for node in trajectory)
+        self.rrt.prune_tree_and_set_new_root(trajectory)
+        self.rrt.agent_pos = points[-1]
+        return points
+
+    def _publish(self, trajectory: Optional[Tuple[Tuple[float, float], ...]]) -> None:
+        snapshot = self._snapshot
+        if trajectory is None:
+            # Replacing the snapshot is atomic, so readers never need the lock
+            self._snapshot = snapshot._replace(
+                cost_to_goal=self.rrt.best_cost_to_goal(), steps=self._steps
+            )
+            return
+        with self._condition:
+            self._commit_requested = False
+            self._snapshot = PlanSnapshot(
+                trajectory,
+                snapshot.trajectory_number + 1,
+                self.rrt.best_cost_to_goal(),
+                self.rrt._is_in_goal(trajectory[-1]),
+                self._steps,
+            )
+            self._condition.notify_all()
+
+
+def run_realtime(control_rate: float = 20, max_ticks: int = 1000) -> None:
+    """
+    Headless demo: a controller ticking at control_rate Hz moves an agent
+    AGENT_SPEED per tick along whatever trajectory the background planner
+    has committed, and waits in place while there's no path yet.
+    """
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    follower = None
+    snapshot = None
+    with RealtimePlanner(rrt) as planner:
+        for tick in range(max_ticks):
+            tick_start = time.perf_counter()
+            if follower is not None and not follower.done:
+                follower.advance()
+            elif snapshot is not None and snapshot.reached_goal:
+                print("Reached goal after", tick, "ticks.")
+                break
+            else:
+                number = snapshot.trajectory_number if snapshot is not None else 0
+                snapshot = planner.next_trajectory(REALTIME_TICK_BUDGET)
+                if snapshot.trajectory_number != number:
+                    follower = TrajectoryFollower(
+                        Trajectory(snapshot.trajectory), AGENT_SPEED
+                    )
+                    print(
+                        "tick",
+                        tick,
+                        "planner steps",
+                        snapshot.steps,
+                        "cost to goal",
+                        snapshot.cost_to_goal,
+                    )
+            time.sleep(max(0, 1 / control_rate - (time.perf_counter() - tick_start)))
+
+
+if __name__ == "__main__":
+    run_realtime()
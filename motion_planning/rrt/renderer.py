@@ -0,0 +1,93 @@
+from typing import Callable, List, Tuple
+
+
+class Renderer:
+    """
+    Draws a planner as it runs. Planners call these hooks as their state
+    changes. This base class ignores all of them, so a planner with the
+    default renderer runs headless and never imports a plotting library.
+    """
+
+    def init_plot(self, rrt) -> None:
+        """
+        Attach to a planner and draw its bounds, obstacles, goal and agent.
+
+        rrt: planner to draw
+        """
+        pass
+
+    def edge_added(self, node: int) -> None:
+        """
+        Draw the edge from a node to its parent.
+
+        node: ID of the child node of the edge
+        """
+        pass
+
+    def edge_removed(self, node: int) -> None:
+        """
+        Stop drawing the edge from a node to its parent.
+
+        node: ID of the child node of the edge
+        """
+        pass
+
+    def path_to_goal_changed(self, path: List[Tuple[float, float]]) -> None:
+        """
+        Replace the drawn path to the goal.
+
+        path: list of points in order from root to goal
+        """
+        pass
+
+    def trajectory_committed(self, trajectory: List[Tuple[float, float]]) -> None:
+        """
+        Draw a trajectory the agent has committed to following. Earlier
+        trajectories stay drawn until trajectory_history_cleared is called.
+
+        trajectory: list of points in order from start to end
+        """
+        pass
+
+    def trajectory_history_cleared(self) -> None:
+        """
+        Stop drawing all committed trajectories except the current one.
+        """
+        pass
+
+    def goal_moved(self) -> None:
+        """
+        Redraw the goal region at the attached planner's current goal.
+        """
+        pass
+
+    def obstacles_changed(self) -> None:
+        """
+        Redraw the attached planner's obstacles after some were added, moved
+        or removed.
+        """
+        pass
+
+    def agent_moved(self) -> None:
+        """
+        Redraw the agent at the attached planner's current position.
+        """
+        pass
+
+    def connect_click(self, callback: Callable) -> None:
+        """
+        Call callback with the click event whenever the plot is clicked.
+        """
+        pass
+
+    def refresh(self) -> None:
+        """
+        Show any pending drawing changes.
+        """
+        pass
+
+    def show(self) -> None:
+        """
+        Block and keep showing the drawing until it's closed.
+        """
+        pass
@@ -1,38 +1,42 @@
-from matplotlib import pyplot as plt
-import random
+from typing import Tuple
 
-from rrt_base import RRTBase
+from motion_planning.rrt.rrt_base import RRTBase
 from motion_planning.config.rrt_config import (
     AGENT_START_POSITION,
     GOAL_POSITION,
-    BOTTOM_BOUND,
-    RIGHT_BOUND,
-    VIS_PAUSE_LENGTH,
 )
 
 
 class RRT(RRTBase):
     def step(self, visualize: bool = True) -> None:
-        random_point = random.random() * RIGHT_BOUND, random.random() * BOTTOM_BOUND
-        nearest = self.nearest_neighbor(random_point)
-        new_point = self.get_new_point(nearest, random_point)
+        self.profiler.count("steps")
+        with self.profiler.phase("sample"):
+            random_point = self.sample_point()
+        with self.profiler.phase("nearest"):
+            nearest = self.nearest_neighbor(random_point)
+        with self.profiler.phase("steer"):
+            new_point = self.get_new_point(self.tree.point(nearest), random_point)
         if new_point is None:
             return
-        self.edges[nearest].append(new_point)
-        self.parents[new_point] = nearest
-        self.points.append(new_point)
+        self.extend(nearest, new_point, visualize=visualize)
+
+    def extend(
+        self, nearest: int, new_point: Tuple[float, ...], visualize: bool = True
+    ) -> int:
+        with self.profiler.phase("add"):
+            new_node = self.add_node(new_point, nearest)
 
         if visualize:
-            line = plt.plot(
-                [nearest[0], new_point[0]],
-                [nearest[1], new_point[1]],
-            )[0]
-            self.edges_to_lines[(nearest, new_point)] = line
-            plt.pause(VIS_PAUSE_LENGTH)
+            with self.profiler.phase("draw"):
+                self.renderer.edge_added(new_node)
+                self.renderer.refresh()
+        return new_node
 
 
 def run_rrt(num_steps: int) -> None:
-    rrt = RRT(AGENT_START_POSITION, GOAL_POSITION)
+    from motion_planning.rrt.matplotlib_renderer import MatplotlibRenderer
+
+    rrt = RRT(AGENT_START_POSITION, GOAL_POSITION, renderer=MatplotlibRenderer())
     rrt.init_plot()
 
     for i in range(num_steps):
@@ -40,9 +44,10 @@ def run_rrt(num_steps: int) -> None:
             print(i, "steps completed.")
         rrt.step()
     rrt.redraw_path_to_goal()
-    path = rrt.best_path_to_goal()[::-1]
+    print("Path cost:", rrt.best_cost_to_goal())
+    path = rrt.best_path_to_goal()
     rrt.move_along_path_until_done(path)
-    plt.show()
+    rrt.renderer.show()
 
 
 if __name__ == "__main__":
@@ -1,55 +1,264 @@
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from matplotlib import pyplot as plt
-from matplotlib.patches import Rectangle
-from math import log2
-from typing import List, Tuple
-import random
-import time
+from math import dist, inf
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from motion_planning.config.rrt_config import (
     AGENT_SPEED,
-    BOTTOM_BOUND,
+    BOUNDS,
     DELTA,
-    GAMMA_RRT_STAR,
     OBSTACLES,
-    RIGHT_BOUND,
-    VIS_PAUSE_LENGTH,
 )
+from motion_planning.rrt.collision import CollisionChecker, CollisionMap
+from motion_planning.rrt.neighbor_index import GridIndex, NeighborIndex
+from motion_planning.rrt.profiler import Profiler
+from motion_planning.rrt.renderer import Renderer
+from motion_planning.rrt.sampling import Sampler, UniformSampler
+from motion_planning.rrt.trajectory import Trajectory, TrajectoryFollower
+from motion_planning.rrt.tree import Tree
 
 
 class RRTBase(ABC):
-    def __init__(self, start, goal):
-        self.points = [start]
-        self.parents = {}
-        self.edges = defaultdict(list)
+    """
+    Base class of the RRT planners. Points can have any number of
+    dimensions, set by the start, and are tuples of coordinates. The goal
+    region and the bounds of the search space are axis-aligned boxes,
+    ((low corner), (high corner)), with as many dimensions.
+
+    2D planners get the default bounds and rectangular obstacles from the
+    config. Planners in other numbers of dimensions need their own bounds and
+    a collision map, e.g. a BoxCollisionChecker.
+    """
+
+    # Distance to move towards random points, i.e. the max edge length.
+    # Can be overridden per instance.
+    delta = DELTA
+    # Box of the search space that points are sampled from. Can be
+    # overridden per instance.
+    bounds = BOUNDS
+
+    def __init__(
+        self,
+        start,
+        goal,
+        neighbor_index: Callable[[Tree], NeighborIndex] = GridIndex,
+        obstacles: Sequence[Tuple[Tuple[float, float], float, float]] = OBSTACLES,
+        renderer: Renderer = None,
+        profiler: Profiler = None,
+        collision_map: CollisionMap = None,
+        sampler: Sampler = None,
+        bounds: Tuple[Sequence[float], Sequence[float]] = None,
+    ):
+        """
+        start: start point, whose number of coordinates sets the number of
+        dimensions
+        goal: ((low corner), (high corner)) of the goal region
+        neighbor_index: spatial index to build over the tree
+        obstacles: rectangles for a CollisionChecker, ((bottom left corner),
+        length, height), if not given a collision_map. 2D only.
+        renderer: observer to draw the planner with
+        profiler: observer to record time spent per phase with
+        collision_map: the obstacles, instead of obstacles
+        sampler: chooses the points to grow the tree towards
+        bounds: ((low corner), (high corner)) of the search space, instead
+        of BOUNDS
+        """
+        self.tree = Tree(start)
+        if bounds is not None:
+            self.bounds = bounds
+        if len(self.bounds[0]) != self.tree.dim:
+            raise ValueError(
+                "A {}D planner needs {}D bounds".format(self.tree.dim, self.tree.dim)
+            )
+        if collision_map is None and self.tree.dim != 2:
+            raise ValueError(
+                "A {}D planner needs a collision_map".format(self.tree.dim)
+            )
+        # Rectangular obstacles, unless given another map such as an
+        # OccupancyGrid
+        self.collision_checker = (
+            collision_map if collision_map is not None else CollisionChecker(obstacles)
+        )
+        self._neighbor_index_factory = neighbor_index
+        self.neighbor_index = neighbor_index(self.tree)
+        self.neighbor_index.insert(self.tree.root)
+        # Length of the longest edge ever added, so at least that of every
+        # edge in the tree. Edges are steered to at most delta, but a loaded
+        # tree or a change of delta can leave longer ones.
+        self.longest_edge = 0.0
         self.goal = goal
+        # Nodes inside the goal region, and the cheapest of them
+        self.goal_nodes = set()
+        self.best_goal_node = None
+        self._rebuild_goal_nodes()
         self.agent_pos = start
 
-        # For visualization
-        self.edges_to_lines = {}
-        self.lines_to_goal = []
-        self.agent_viz = None
-        self.goal_viz = None
+        # Headless unless given a renderer
+        self.renderer = renderer if renderer is not None else Renderer()
+        # Records nothing unless given a profiler. Can be swapped at any time.
+        self.profiler = profiler if profiler is not None else Profiler()
+        # Uniform samples from the global random number generator unless
+        # given another sampler
+        self.sampler = sampler if sampler is not None else UniformSampler()
 
     def init_plot(self) -> None:
         """
         Set bounds and draw obstacles, goal, and agent.
         """
-        plt.xlim([0, RIGHT_BOUND])
-        plt.ylim([0, BOTTOM_BOUND])
-        plt.gca().set_aspect("equal")
-        for obstacle in OBSTACLES:
-            plt.gca().add_patch(Rectangle(*obstacle))
-        self.goal_viz = plt.gca().add_patch(
-            Rectangle(
-                self.goal[0],
-                self.goal[1][0] - self.goal[0][0],
-                self.goal[1][1] - self.goal[0][1],
-                color="#00FF00",
-            )
+        self.renderer.init_plot(self)
+
+    def set_goal(self, goal: Tuple[Sequence[float], Sequence[float]]) -> None:
+        """
+        Move the goal region.
+
+        goal: ((low corner), (high corner)) of the new goal region
+        """
+        self.goal = goal
+        self._rebuild_goal_nodes()
+        self.renderer.goal_moved()
+
+    def save_tree(self, path: str) -> None:
+        """
+        Save the tree, so a later planner on the same map can start from it
+        with load_tree.
+
+        path: path of the file to write
+        """
+        self.tree.save(path)
+
+    def load_tree(
+        self, path: str, start: Optional[Sequence[float]] = None, mmap: bool = True
+    ) -> None:
+        """
+        Replace the tree with one saved by save_tree, and optionally re-root
+        it at a new start.
+
+        If the tree can't be re-rooted at the start, the planner keeps its
+        current tree and the ValueError from reroot is raised.
+
+        path: path of the file to read
+        start: position to re-root the tree at, see reroot
+        mmap: whether to memory-map the tree's arrays instead of reading them
+        """
+        previous = (
+            self.tree,
+            self.neighbor_index,
+            self.longest_edge,
+            set(self.goal_nodes),
+            self.best_goal_node,
         )
-        self.agent_viz = plt.plot(10, 10, "ro", zorder=4)[0]
+        self.tree = Tree.load(path, mmap)
+        self.neighbor_index = self._neighbor_index_factory(self.tree)
+        self.neighbor_index.insert_many(self.tree.nodes())
+        self.longest_edge = self.tree.longest_edge()
+        if start is None:
+            self.agent_pos = self.tree.point(self.tree.root)
+            self._rebuild_goal_nodes()
+            return
+        try:
+            self.reroot(start)
+        except ValueError:
+            (
+                self.tree,
+                self.neighbor_index,
+                self.longest_edge,
+                self.goal_nodes,
+                self.best_goal_node,
+            ) = previous
+            raise
+
+    def reroot(self, start: Sequence[float]) -> None:
+        """
+        Make the given point the root of the tree, keeping every node. If
+        no node is at the point, it's added as a child of the closest node
+        it has a free edge to among those within delta, or else reached
+        from the nearest node by steering towards it, adding a node every
+        delta, so no edge is longer than delta. Edges on the path from the
+        old root to the new one are reversed and all costs are recomputed.
+
+        Raises ValueError, leaving the tree unchanged, if the point can't be
+        reached that way.
+
+        start: position of the new root
+        """
+        start = tuple(start)
+        nearest = self.nearest_neighbor(start)
+        if self.tree.point(nearest) == start:
+            node = nearest
+        else:
+            candidates = self.neighbor_index.within(start, self.delta)
+            candidates = sorted(
+                candidates,
+                key=lambda candidate: self._calculate_distance(
+                    self.tree.point(candidate), start
+                ),
+            )
+            parent = next(
+                (
+                    candidate
+                    for candidate in candidates
+                    if self._edge_free(self.tree.point(candidate), start)
+                ),
+                None,
+            )
+            if parent is not None:
+                node = self.add_node(start, parent)
+            else:
+                node = nearest
+                for point in self._steer_path(self.tree.point(nearest), start):
+                    node = self.add_node(point, node)
+        self.tree.reroot(node)
+        self.agent_pos = start
+        self._rebuild_goal_nodes()
+
+    def _steer_path(
+        self, source: Sequence[float], destination: Sequence[float]
+    ) -> List[Tuple[float, ...]]:
+        """
+        Return the points from steering repeatedly from the source to the
+        destination, each at most delta from the one before.
+
+        source: point to steer from
+        destination: point to reach, the last point returned
+        return: list of points after the source
+        """
+        points = []
+        point = tuple(source)
+        while point != destination:
+            point = self.get_new_point(point, destination)
+            if point is None:
+                raise ValueError(
+                    "No free edge from {} to the nearby nodes in the tree".format(
+                        destination
+                    )
+                )
+            points.append(point)
+        return points
+
+    def _rebuild_goal_nodes(self) -> None:
+        """
+        Find the nodes in the goal region from scratch with a region query.
+        """
+        self.goal_nodes = set(self.neighbor_index.within_box(*self.goal))
+        self._recompute_best_goal_node()
+
+    def _recompute_best_goal_node(self) -> None:
+        if not self.goal_nodes:
+            self.best_goal_node = None
+            return
+        goal_nodes = np.fromiter(self.goal_nodes, dtype=np.intp)
+        self.best_goal_node = int(goal_nodes[self.tree.cost[goal_nodes].argmin()])
+
+    def _offer_best_goal_node(self, node: int) -> None:
+        """
+        Make a node in the goal the best one if it's cheaper than the current
+        best.
+        """
+        if self.best_goal_node is None or self._get_cost(node) < self._get_cost(
+            self.best_goal_node
+        ):
+            self.best_goal_node = node
 
     @abstractmethod
     def step(self):
@@ -60,189 +269,327 @@ class RRTBase(ABC):
         """
         pass
 
-    def _is_in_goal(self, point: Tuple[float, float]) -> bool:
+    @abstractmethod
+    def extend(
+        self, nearest: int, new_point: Tuple[float, ...], visualize: bool = True
+    ) -> Optional[int]:
+        """
+        Add a new point, already steered from its nearest node in the tree and
+        checked for collisions, to the RRT. The second half of a step.
+
+        nearest: ID of the node nearest to the sampled point
+        new_point: tuple of the point to add
+        visualize: Whether to draw the change
+        return: ID of the new node, or None if no edge to it is free
+        """
+        pass
+
+    def sample_point(self) -> Tuple[float, ...]:
+        """
+        Return a point to grow the tree towards, from the sampler.
+
+        return: tuple of the sampled point
+        """
+        return self.sampler.sample(self)
+
+    def _sample_points(self, n: int) -> np.ndarray:
+        """
+        Vectorized sample_point, giving the same points as n calls to it.
+
+        n: number of points to sample
+        return: (n, dim) array of sampled points
+        """
+        return self.sampler.sample_batch(self, n)
+
+    def step_batch(self, n: int, visualize: bool = True) -> bool:
+        """
+        Perform n steps at once. The samples, their nearest nodes, the steered
+        points and their collision checks are all computed together with
+        NumPy against the tree as it was before the batch. The new points are
+        then added in order, exactly as n calls to step would, after checking
+        whether a point added earlier in the batch is closer to the sample.
+
+        n: number of steps to perform
+        visualize: Whether to draw the changes
+        return: whether any new point is in the goal
+        """
+        self.profiler.count("steps", n)
+        with self.profiler.phase("sample"):
+            samples = self._sample_points(n)
+        with self.profiler.phase("nearest"):
+            nearest = self.neighbor_index.nearest_batch(samples)
+        with self.profiler.phase("steer"):
+            sources = self.tree.points.take(nearest, axis=0)
+            new_points, free = self._steer_batch(sources, samples)
+        offsets = samples - sources
+        distances = (offsets * offsets).sum(axis=1).tolist()
+
+        found_goal = False
+        batch_nodes = []
+        batch_points = np.empty((n, self.tree.dim))
+        for i, (sample, nearest_node, new_point, new_point_free) in enumerate(
+            zip(samples.tolist(), nearest.tolist(), new_points.tolist(), free.tolist())
+        ):
+            new_point = tuple(new_point) if new_point_free else None
+            if batch_nodes:
+                offsets = batch_points[: len(batch_nodes)] - sample
+                batch_distances = (offsets * offsets).sum(axis=1)
+                closest = batch_distances.argmin()
+                if batch_distances[closest] < distances[i]:
+                    nearest_node = batch_nodes[closest]
+                    with self.profiler.phase("steer"):
+                        new_point = self.get_new_point(
+                            self.tree.point(nearest_node), tuple(sample)
+                        )
+            if new_point is None:
+                continue
+            new_node = self.extend(nearest_node, new_point, visualize)
+            if new_node is None:
+                continue
+            batch_points[len(batch_nodes)] = new_point
+            batch_nodes.append(new_node)
+            found_goal = found_goal or self._is_in_goal(new_point)
+        return found_goal
+
+    def _is_in_goal(self, point: Sequence[float]) -> bool:
         """
         Return whether the given point is within the boundaries
         of the goal.
 
-        point: (x, y) tuple representing the point
+        point: tuple of the point's coordinates
         return: whether the point is in the goal
         """
-        return (
-            self.goal[0][0] <= point[0] <= self.goal[1][0]
-            and self.goal[0][1] <= point[1] <= self.goal[1][1]
-        )
+        low, high = self.goal
+        return all(a <= p <= b for a, p, b in zip(low, point, high))
+
+    def _get_cost(self, node: int) -> float:
+        """
+        Return the cost from the root of a node in the tree.
+        Cost is the sum of edge lengths from the root to this node, and is
+        cached per node as the tree is built.
+
+        node: ID of the node
+        return: cost from the root to this node along the tree
+        """
+        return self.tree.cost.item(node)
+
+    def add_node(self, point: Sequence[float], parent: int) -> int:
+        """
+        Add a point to the tree as a child of the given parent.
+
+        point: tuple of the new point's coordinates
+        parent: ID of the node to connect the point to
+        return: ID of the new node
+        """
+        distance = self._calculate_distance(self.tree.point(parent), point)
+        if distance > self.longest_edge:
+            self.longest_edge = distance
+        node = self.tree.add(point, parent, self._get_cost(parent) + distance)
+        self.neighbor_index.insert(node)
+        if self._is_in_goal(point):
+            self.goal_nodes.add(node)
+            self._offer_best_goal_node(node)
+        return node
 
-    def _get_cost(self, point: Tuple[float, float]) -> float:
+    def remove_node(self, node: int) -> None:
         """
-        Return the cost from the root of a point in the tree.
-        Cost is the sum of edge lengths from the root to this point.
+        Remove a node from the tree. Its children are not removed, see
+        Tree.remove.
 
-        point: (x, y) tuple representing the point
-        return: cost from the root to this point along the tree
+        node: ID of the node to remove
         """
-        cost = 0
-        while point in self.parents:
-            parent = self.parents[point]
-            cost += self._calculate_distance(point, parent)
-            point = parent
-        return cost
+        self.neighbor_index.remove(node)
+        self.tree.remove(node)
+        if node in self.goal_nodes:
+            self.goal_nodes.remove(node)
+            if node == self.best_goal_node:
+                self._recompute_best_goal_node()
 
-    def _obstacle_free(self, point: Tuple[float, float]) -> float:
+    def _shift_subtree_costs(self, node: int, delta: float) -> None:
+        """
+        Add delta to the cost of a node and every node below it in the tree,
+        keeping the best goal node up to date.
+
+        node: ID of the root of the subtree to update
+        delta: amount to add to each cost
+        """
+        changed = self.tree.shift_subtree_costs(node, delta)
+        if delta > 0 and self.best_goal_node in changed:
+            self._recompute_best_goal_node()
+        elif delta < 0:
+            for changed_node in changed:
+                if changed_node in self.goal_nodes:
+                    self._offer_best_goal_node(changed_node)
+
+    def _obstacle_free(self, point: Sequence[float]) -> bool:
         """
         Return whether this point is free of obstacles
 
-        point: (x, y) tuple representing the point
+        point: tuple of the point's coordinates
         return: False if the point collides with an obstacle, otherwise True
+        """
+        self.profiler.count("collision_checks")
+        return self.collision_checker.point_free(point)
+
+    def _edge_free(self, a: Sequence[float], b: Sequence[float]) -> bool:
+        """
+        Return whether the straight edge between two points is free of obstacles
 
-        TODO: more collision checks along an edge as opposed to just at one
-        point
+        a: first point
+        b: second point
+        return: False if any part of the edge collides with an obstacle,
+        otherwise True
         """
-        for obstacle in OBSTACLES:
-            left, top = obstacle[0]
-            right, bottom = left + obstacle[1], top + obstacle[2]
-            if left <= point[0] <= right and top <= point[1] <= bottom:
-                return False
-        return True
+        self.profiler.count("collision_checks")
+        return self.collision_checker.segment_free(a, b)
 
-    def best_path_to_goal(self) -> List[Tuple[float, float]]:
+    def _edges_free(self, nodes: List[int], point: Sequence[float]) -> np.ndarray:
+        """
+        Check the edges from each of the given nodes to a point in one batch.
+
+        nodes: list of node IDs to draw edges from
+        point: point that every edge ends at
+        return: boolean array, True where the edge from that node is free of
+        obstacles
+        """
+        self.profiler.count("collision_checks", len(nodes))
+        starts = self.tree.points.take(nodes, axis=0)
+        return self.collision_checker.segments_free(starts, point)
+
+    def best_node_path_to_goal(self) -> List[int]:
         """
         Return the lowest-cost path to the goal from the root of the RRT.
 
-        return: the shortest path, comprised of a list of points
+        return: the shortest path, comprised of a list of node IDs
         in order from root to goal.
         """
-        points_in_goal = [point for point in self.points if self._is_in_goal(point)]
-        if not points_in_goal:
+        if self.best_goal_node is None:
             return []
-        cur_point = min(points_in_goal, key=lambda x: self._get_cost(x))
-        print("Path cost:", self._get_cost(cur_point))
-        path = [cur_point]
-        while cur_point in self.parents:
-            cur_point = self.parents[cur_point]
-            path.append(cur_point)
-
-        return path[::-1]
+        return self.tree.path_from_root(self.best_goal_node)
 
-    def take_step_along_path(
-        self, path: List[Tuple[float, float]], to_travel: float = AGENT_SPEED
-    ) -> None:
+    def best_cost_to_goal(self) -> float:
         """
-        Note: path is expected to be in reverse order for computational
-        efficiency.
-        TODO: use a queue to make this more straightforward
+        Return the cost of the lowest-cost path to the goal, or inf if no path
+        has been found.
+        """
+        if self.best_goal_node is None:
+            return inf
+        return self._get_cost(self.best_goal_node)
 
-        Move the agent "to_travel" units along the path, updating the
-        path to remove points as they're reached.
+    def best_path_to_goal(self) -> List[Tuple[float, ...]]:
+        """
+        Return the lowest-cost path to the goal from the root of the RRT.
 
-        path: list of point tuples in reverse order
-        to_travel: distance left to travel, used for recursive calls if
-        the next point is less than to_travel away from the agent
+        return: the shortest path, comprised of a list of points
+        in order from root to goal.
         """
-        if not path:
-            return
-        point = path[-1]
-        distance = self._calculate_distance(self.agent_pos, point)
-        if distance <= to_travel:
-            self.agent_pos = point
-            path.pop()
-            self.take_step_along_path(path, to_travel - distance)
-        else:
-            dist_x = point[0] - self.agent_pos[0]
-            dist_y = point[1] - self.agent_pos[1]
-            new_point = (
-                self.agent_pos[0] + to_travel / distance * dist_x,
-                self.agent_pos[1] + to_travel / distance * dist_y,
-            )
-            self.agent_pos = new_point
+        return [self.tree.point(node) for node in self.best_node_path_to_goal()]
 
     def move_along_path_until_done(
         self,
-        path: List[Tuple[float, float]],
+        path: List[Tuple[float, ...]],
         keep_stepping: bool = False,
         visualize: bool = True,
     ) -> None:
         """
-        Keep moving the agent along the path until it's reached the end.
+        Keep moving the agent along the path, AGENT_SPEED per move, until
+        it's reached the end.
 
-        path: list of point tuples in reverse order
+        path: list of point tuples in order, starting at the agent
         keep_stepping: Whether to call the RRT's step function while moving.
         Useful for anytime planning.
-        visualize: Whether to call plt.pause()
+        visualize: Whether to refresh the renderer after each move
         """
-        while path:
-            self.take_step_along_path(path)
-            self.agent_viz.set_xdata(self.agent_pos[0])
-            self.agent_viz.set_ydata(self.agent_pos[1])
+        if not path:
+            return
+        follower = TrajectoryFollower(Trajectory(path), AGENT_SPEED)
+        while not follower.done:
+            self.agent_pos = follower.advance()
+            self.renderer.agent_moved()
             if keep_stepping:
                 self.step()
             if visualize:
-                plt.pause(VIS_PAUSE_LENGTH)
+                self.renderer.refresh()
 
-    def _calculate_distance(
-        self, a: Tuple[float, float], b: Tuple[float, float]
-    ) -> float:
+    def _calculate_distance(self, a: Sequence[float], b: Sequence[float]) -> float:
         """
         Calculate the Euclidean distance between two points
 
-        a: first (x, y) point
-        b: second (x, y) point
+        a: first point
+        b: second point
         return: Euclidean distance between a and b
         """
-        return ((b[1] - a[1]) ** 2 + (b[0] - a[0]) ** 2) ** 0.5
+        return dist(a, b)
 
-    def nearest_neighbor(self, new_point: Tuple[float, float]) -> Tuple[float, float]:
+    def _calculate_distances(
+        self, point: Sequence[float], nodes: List[int]
+    ) -> np.ndarray:
         """
-        Return the closest point in the RRT to the given new point
+        Calculate the Euclidean distance from a point to each of the given nodes
 
-        new_point: (x, y) tuple representing a new point
-        return: (x, y) tuple of a point in the tree nearest to this point.
+        point: tuple of the point's coordinates
+        nodes: list of node IDs
+        return: array of distances from point to each node
         """
-        return min(self.points, key=lambda x: self._calculate_distance(new_point, x))
+        offsets = self.tree.points.take(nodes, axis=0) - point
+        return np.sqrt((offsets * offsets).sum(axis=1))
+
+    def nearest_neighbor(self, new_point: Sequence[float]) -> int:
+        """
+        Return the closest node in the RRT to the given new point
+
+        new_point: tuple of the new point's coordinates
+        return: ID of the node in the tree nearest to this point.
+        """
+        return self.neighbor_index.nearest(new_point)
 
     def get_new_point(
-        self, source: Tuple[float, float], destination: Tuple[float, float]
-    ) -> Tuple[float, float]:
+        self, source: Sequence[float], destination: Sequence[float]
+    ) -> Optional[Tuple[float, ...]]:
         """
-        Returns a new point distance DELTA from the source, towards the destination
+        Returns a new point distance delta from the source, towards the destination
 
-        source: first (x, y) point
-        destination: second (x, y) point to steer from source to
+        source: first point
+        destination: second point to steer from source to
 
-        return: a new (x, y) point distance DELTA closer to destination, from source
+        return: a new point distance delta closer to destination, from source,
+        or None if the edge from source to it collides with an obstacle
         """
-        distance = self._calculate_distance(source, destination)
-        if distance <= DELTA:
-            if not self._obstacle_free(destination):
+        distance = dist(source, destination)
+        if distance <= self.delta:
+            if not self._edge_free(source, destination):
                 return None
             return destination
-        dist_x = destination[0] - source[0]
-        dist_y = destination[1] - source[1]
-        new_point = (
-            source[0] + DELTA / distance * dist_x,
-            source[1] + DELTA / distance * dist_y,
-        )
-        if not self._obstacle_free(new_point):
+        scale = self.delta / distance
+        new_point = tuple([a + scale * (b - a) for a, b in zip(source, destination)])
+        if not self._edge_free(source, new_point):
             return None
         return new_point
 
+    def _steer_batch(
+        self, sources: np.ndarray, destinations: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized get_new_point for many source and destination pairs.
+
+        sources: (n, dim) array of points to steer from
+        destinations: (n, dim) array of points to steer towards
+        return: (n, dim) array of new points, and a boolean array that is True
+        where the edge from the source to the new point is free of obstacles
+        """
+        offsets = destinations - sources
+        distances = np.sqrt((offsets * offsets).sum(axis=1))
+        close = distances <= self.delta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            steered = sources + (self.delta / distances)[:, None] * offsets
+        new_points = np.where(close[:, None], destinations, steered)
+        self.profiler.count("collision_checks", len(sources))
+        return new_points, self.collision_checker.segments_free(sources, new_points)
+
     def redraw_path_to_goal(self) -> None:
         """
         Remove the current path to goal from the visualization, and redraw
         a new one based on the current best path to the goal.
         """
-        for line in self.lines_to_goal:
-            line.remove()
-        self.lines_to_goal = []
-        path = self.best_path_to_goal()
-        for i in range(len(path) - 1):
-            start, end = path[i], path[i + 1]
-            line = plt.plot(
-                [start[0], end[0]],
-                [start[1], end[1]],
-            )[0]
-            line.set_color("black")
-            line.set_linewidth(2)
-            line.set_zorder(3)
-            self.lines_to_goal.append(line)
-        plt.pause(VIS_PAUSE_LENGTH)
+        self.renderer.path_to_goal_changed(self.best_path_to_goal())
+        self.renderer.refresh()
@@ -0,0 +1,248 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from motion_planning.config.rrt_config import (
+    AGENT_START_POSITION,
+    GOAL_POSITION,
+    OBSTACLES,
+    RRT_CONNECT_GOAL_ROOT_TRIES,
+    RRT_CONNECT_MAX_STEPS,
+)
+from motion_planning.rrt.collision import CollisionMap
+from motion_planning.rrt.neighbor_index import GridIndex, NeighborIndex
+from motion_planning.rrt.profiler import Profiler
+from motion_planning.rrt.renderer import Renderer
+from motion_planning.rrt.rrt_base import RRTBase
+from motion_planning.rrt.sampling import Sampler
+from motion_planning.rrt.tree import Tree
+
+
+class RRTConnect(RRTBase):
+    """
+    Bidirectional RRT in the style of RRT-Connect. Alongside the usual tree
+    from the start, a second tree grows from a point in the goal region.
+    Each step extends one tree towards a random point, then greedily
+    extends the other tree towards the new node until it reaches it or hits
+    an obstacle, and the trees swap roles for the next step.
+
+    When the trees meet, the path through the goal tree is copied into the
+    start tree, so the result is an ordinary tree with a node in the goal:
+    best_path_to_goal and everything else in RRTBase work unchanged, and
+    seed can hand the path to another planner to refine.
+    """
+
+    def __init__(
+        self,
+        start,
+        goal,
+        neighbor_index: Callable[[Tree], NeighborIndex] = GridIndex,
+        obstacles: Sequence[Tuple[Tuple[float, float], float, float]] = OBSTACLES,
+        renderer: Renderer = None,
+        profiler: Profiler = None,
+        collision_map: CollisionMap = None,
+        sampler: Sampler = None,
+        bounds: Tuple[Sequence[float], Sequence[float]] = None,
+    ):
+        super().__init__(
+            start,
+            goal,
+            neighbor_index,
+            obstacles,
+            renderer,
+            profiler,
+            collision_map,
+            sampler,
+            bounds,
+        )
+        self._reset_goal_tree()
+
+    def _reset_goal_tree(self) -> None:
+        self.goal_tree = Tree(self._goal_root())
+        self.goal_index = self._neighbor_index_factory(self.goal_tree)
+        self.goal_index.insert(self.goal_tree.root)
+        self._grow_start_tree = True
+
+    def _goal_root(self) -> Tuple[float, ...]:
+        """
+        Return the center of the goal region, or if that's inside an
+        obstacle, a random free point in the goal region. Raises ValueError
+        if no free point is found in RRT_CONNECT_GOAL_ROOT_TRIES tries.
+        """
+        low, high = self.goal
+        point = tuple([(a + b) / 2 for a, b in zip(low, high)])
+        for _ in range(RRT_CONNECT_GOAL_ROOT_TRIES):
+            if self._obstacle_free(point):
+                return point
+            point = tuple(
+                [self.sampler.random.uniform(a, b) for a, b in zip(low, high)]
+            )
+        raise ValueError(
+            "No free point found in the goal region {} to root the goal tree at".format(
+                self.goal
+            )
+        )
+
+    def set_goal(self, goal: Tuple[Sequence[float], Sequence[float]]) -> None:
+        super().set_goal(goal)
+        self._reset_goal_tree()
+
+    def connected(self) -> bool:
+        """
+        Return whether a path from the start to the goal has been found.
+        """
+        return self.best_goal_node is not None
+
+    def step(self, visualize: bool = True) -> bool:
+        """
+        Extend one tree towards a random point, then try to connect the
+        other tree to the new node.
+
+        return: whether the trees are connected
+        """
+        self.profiler.count("steps")
+        grow_start_tree = self._grow_start_tree
+        self._grow_start_tree = not grow_start_tree
+        with self.profiler.phase("sample"):
+            random_point = self.sample_point()
+        new_node = self._extend_towards(grow_start_tree, random_point, visualize)
+        if new_node is None:
+            return self.connected()
+        target = (self.tree if grow_start_tree else self.goal_tree).point(new_node)
+        with self.profiler.phase("connect"):
+            reached = self._connect(not grow_start_tree, target, visualize)
+        if reached is not None and not self.connected():
+            if grow_start_tree:
+                start_node, goal_node = new_node, reached
+            else:
+                start_node, goal_node = reached, new_node
+            self._join(start_node, goal_node, visualize)
+        return self.connected()
+
+    def extend(
+        self, nearest: int, new_point: Tuple[float, ...], visualize: bool = True
+    ) -> int:
+        with self.profiler.phase("add"):
+            new_node = self.add_node(new_point, nearest)
+
+        if visualize:
+            with self.profiler.phase("draw"):
+                self.renderer.edge_added(new_node)
+                self.renderer.refresh()
+        return new_node
+
+    def _extend_towards(
+        self, start_tree: bool, point: Sequence[float], visualize: bool
+    ) -> Optional[int]:
+        """
+        Add one edge to a tree from its node nearest the point towards the
+        point.
+
+        start_tree: whether to extend the start tree, or else the goal tree
+        point: point to extend towards
+        return: ID of the new node in that tree, or None if the edge is
+        blocked
+        """
+        tree, index = (
+            (self.tree, self.neighbor_index)
+            if start_tree
+            else (self.goal_tree, self.goal_index)
+        )
+        with self.profiler.phase("nearest"):
+            nearest = index.nearest(point)
+        with self.profiler.phase("steer"):
+            new_point = self.get_new_point(tree.point(nearest), point)
+        if new_point is None:
+            return None
+        if start_tree:
+            return self.extend(nearest, new_point, visualize)
+        return self._add_goal_tree_node(new_point, nearest)
+
+    def _connect(
+        self, start_tree: bool, target: Sequence[float], visualize: bool
+    ) -> Optional[int]:
+        """
+        Keep extending a tree towards the target until it reaches it or is
+        blocked.
+
+        start_tree: whether to extend the start tree, or else the goal tree
+        target: point to reach
+        return: ID of the node at the target, or None if it wasn't reached
+        """
+        while True:
+            new_node = self._extend_towards(start_tree, target, visualize)
+            if new_node is None:
+                return None
+            tree = self.tree if start_tree else self.goal_tree
+            if tree.point(new_node) == target:
+                return new_node
+
+    def _add_goal_tree_node(self, point: Sequence[float], parent: int) -> int:
+        cost = self.goal_tree.cost.item(parent) + self._calculate_distance(
+            self.goal_tree.point(parent), point
+        )
+        node = self.goal_tree.add(point, parent, cost)
+        self.goal_index.insert(node)
+        return node
+
+    def _join(self, start_node: int, goal_node: int, visualize: bool) -> None:
+        """
+        Copy the path from a goal tree node to the goal tree's root into the
+        start tree, below a start tree node at the same point.
+        """
+        parent = start_node
+        goal_parent = self.goal_tree.parent.item(goal_node)
+        for node in self.goal_tree.path_from_root(goal_parent)[::-1]:
+            parent = self.extend(parent, self.goal_tree.point(node), visualize)
+
+    def step_until_connected(
+        self, max_steps: Optional[int] = RRT_CONNECT_MAX_STEPS
+    ) -> bool:
+        """
+        Keep stepping until the trees connect or max_steps steps are taken.
+
+        max_steps: most steps to take, or no limit if None
+        return: whether the trees are connected
+        """
+        steps = 0
+        while not self.connected() and (max_steps is None or steps < max_steps):
+            self.step(visualize=False)
+            steps += 1
+        return self.connected()
+
+    def seed(self, planner: RRTBase, visualize: bool = False) -> List[int]:
+        """
+        Add the best path found to another planner's tree, so it can refine
+        the path instead of first having to find one. The planner's root
+        must be at this planner's start.
+
+        planner: planner to add the path to, e.g. an RRTStar or
+        AnytimeRRTStar
+        visualize: Whether the planner should draw the new edges
+        return: IDs of the added nodes in the planner's tree, from the start
+        """
+        parent = planner.tree.root
+        added = []
+        for point in self.best_path_to_goal()[1:]:
+            parent = planner.extend(parent, point, visualize)
+            added.append(parent)
+        return added
+
+
+def run_rrt_connect() -> None:
+    from motion_planning.rrt.matplotlib_renderer import MatplotlibRenderer
+
+    rrt = RRTConnect(AGENT_START_POSITION, GOAL_POSITION, renderer=MatplotlibRenderer())
+    rrt.init_plot()
+
+    steps = 0
+    while not rrt.step():
+        steps += 1
+    print("Connected after", steps, "steps.")
+    rrt.redraw_path_to_goal()
+    print("Path cost:", rrt.best_cost_to_goal())
+    path = rrt.best_path_to_goal()
+    rrt.move_along_path_until_done(path)
+    rrt.renderer.show()
+
+
+if __name__ == "__main__":
+    run_rrt_connect()
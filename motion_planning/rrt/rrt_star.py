@@ -1,144 +1,447 @@
-from matplotlib import pyplot as plt
-from math import log2
-from typing import List, Tuple
-import random
+from math import cos, dist, inf, log2, pi, sin
+from typing import List, Optional, Sequence, Tuple
 
-from rrt_base import RRTBase
+import numpy as np
+
+from motion_planning.rrt.rrt_base import RRTBase
 from motion_planning.config.rrt_config import (
     AGENT_START_POSITION,
     GOAL_POSITION,
-    DELTA,
     GAMMA_RRT_STAR,
-    RIGHT_BOUND,
-    BOTTOM_BOUND,
-    VIS_PAUSE_LENGTH,
     EPSILON,
+    INFORMED_SAMPLING,
+    INFORMED_SAMPLING_MAX_TRIES,
+    LAZY_COLLISION_CHECKING,
 )
 
 
 class RRTStar(RRTBase):
+    # Constant multiplier for the near neighbors search radius. Can be
+    # overridden per instance.
+    gamma = GAMMA_RRT_STAR
+    # Whether to sample only points that could improve the current best path,
+    # once there is one. Can be overridden per instance.
+    informed_sampling = INFORMED_SAMPLING
+    # Run branch-and-bound pruning every this many steps once a path is
+    # found, or never if None. Can be overridden per instance.
+    branch_and_bound_interval = None
+    _steps_since_pruning = 0
+    # Whether to check the edges to nearby nodes one at a time, only as far
+    # as needed, instead of all at once. Can be overridden per instance.
+    lazy_collision_checking = LAZY_COLLISION_CHECKING
+
+    def sample_point(self) -> Tuple[float, ...]:
+        """
+        Return a random point to grow the tree towards. With informed
+        sampling on and a path to the goal already found, the point comes
+        from the informed set, see _sample_informed.
+
+        return: tuple of the sampled point
+        """
+        if self.informed_sampling and self.best_goal_node is not None:
+            return self._sample_informed(self._get_cost(self.best_goal_node))
+        return super().sample_point()
+
+    def _sample_points(self, n: int) -> np.ndarray:
+        if self.informed_sampling and self.best_goal_node is not None:
+            return np.array([self.sample_point() for _ in range(n)])
+        return super()._sample_points(n)
+
+    def _sample_informed(self, best_cost: float) -> Tuple[float, ...]:
+        """
+        Return a uniformly random point from the set of points that could be
+        on a path cheaper than best_cost. A point is in that set if its
+        straight-line distance from the root plus its distance to the goal
+        region is less than best_cost.
+
+        The set lies inside an ellipse with the root and the goal's center as
+        foci, widened by the goal's half diagonal, so points are drawn from
+        that ellipse and rejected until one is in the set and in bounds. The
+        ellipse shrinks as best_cost does. Falls back to a uniform sample
+        after INFORMED_SAMPLING_MAX_TRIES rejections. In more than two
+        dimensions the ellipse is an ellipsoid, see
+        _sample_informed_ellipsoid.
+
+        best_cost: cost of the current best path to the goal
+        return: tuple of the sampled point
+        """
+        if self.tree.dim != 2:
+            return self._sample_informed_ellipsoid(best_cost)
+        root = self.tree.point(self.tree.root)
+        (left, bottom), (right, top) = self.goal
+        center = ((left + right) / 2, (bottom + top) / 2)
+        half_diagonal = self._calculate_distance((left, bottom), center)
+        focal_distance = self._calculate_distance(root, center)
+        # Semi-major and semi-minor axes of the ellipse
+        major = (best_cost + half_diagonal) / 2
+        minor = max(major**2 - (focal_distance / 2) ** 2, 0) ** 0.5
+        if focal_distance > 0:
+            cos_angle = (center[0] - root[0]) / focal_distance
+            sin_angle = (center[1] - root[1]) / focal_distance
+        else:
+            cos_angle, sin_angle = 1, 0
+        middle = ((root[0] + center[0]) / 2, (root[1] + center[1]) / 2)
+        (low_x, low_y), (high_x, high_y) = self.bounds
+
+        for _ in range(INFORMED_SAMPLING_MAX_TRIES):
+            # Uniform point in the unit disk, stretched onto the ellipse
+            radius = self.sampler.random.random() ** 0.5
+            theta = 2 * pi * self.sampler.random.random()
+            x = major * radius * cos(theta)
+            y = minor * radius * sin(theta)
+            point = (
+                middle[0] + cos_angle * x - sin_angle * y,
+                middle[1] + sin_angle * x + cos_angle * y,
+            )
+            if not (low_x <= point[0] <= high_x and low_y <= point[1] <= high_y):
+                continue
+            to_goal = self._calculate_distance(
+                point,
+                (min(max(point[0], left), right), min(max(point[1], bottom), top)),
+            )
+            if self._calculate_distance(root, point) + to_goal < best_cost:
+                return point
+        return super().sample_point()
+
+    def _sample_informed_ellipsoid(self, best_cost: float) -> Tuple[float, ...]:
+        """
+        _sample_informed in any number of dimensions. Points uniform in the
+        unit ball are stretched onto an ellipsoid whose major axis runs
+        along the x axis, then reflected onto the axis from the root to the
+        goal's center. The ellipsoid is symmetric about its major axis, so
+        the reflection maps it onto the one around the root and goal.
+        """
+        root = np.array(self.tree.point(self.tree.root))
+        low, high = (np.asarray(corner, dtype=np.float64) for corner in self.goal)
+        center = (low + high) / 2
+        half_diagonal = dist(low, center)
+        focal_distance = dist(root, center)
+        # Semi-major and semi-minor axes of the ellipsoid
+        major = (best_cost + half_diagonal) / 2
+        minor = max(major**2 - (focal_distance / 2) ** 2, 0) ** 0.5
+        axes = np.full(self.tree.dim, minor)
+        axes[0] = major
+        # Householder reflection taking the x axis to the root-goal axis
+        mirror = np.zeros(self.tree.dim)
+        if focal_distance > 0:
+            mirror[0] = 1
+            mirror -= (center - root) / focal_distance
+        mirror_length = mirror @ mirror
+        middle = (root + center) / 2
+        bounds_low, bounds_high = self.bounds
+
+        random = self.sampler.random
+        for _ in range(INFORMED_SAMPLING_MAX_TRIES):
+            # Uniform point in the unit ball: a random direction, at a radius
+            # with density proportional to radius^(dim - 1)
+            direction = np.array([random.gauss(0, 1) for _ in range(self.tree.dim)])
+            radius = random.random() ** (1 / self.tree.dim)
+            offset = axes * radius * direction / np.sqrt(direction @ direction)
+            if mirror_length > 0:
+                offset -= 2 * (mirror @ offset) / mirror_length * mirror
+            point = middle + offset
+            if not ((bounds_low <= point) & (point <= bounds_high)).all():
+                continue
+            to_goal = dist(point, np.clip(point, low, high))
+            if dist(root, point) + to_goal < best_cost:
+                return tuple(point.tolist())
+        return super().sample_point()
+
     def min_cost_neighbor(
-        self, new_point: Tuple[float, float], neighbors: List[Tuple[float, float]]
-    ) -> Tuple[float, float]:
+        self,
+        new_point: Sequence[float],
+        neighbors: List[int],
+        edge_free: Optional[np.ndarray] = None,
+    ) -> Optional[int]:
         """
         Given a new point and a list of neighbors, return the one that minimizes
-        cost(neighbor) + distance(neighbor, new_point)
+        cost(neighbor) + distance(neighbor, new_point), out of those whose edge
+        to the new point is free of obstacles.
 
-        new_point: (x, y) tuple describing the new point
-        neighbors: list of points from which we want to choose
-        return: The point in neighbors that minimizes distance through it to new_point
+        new_point: tuple describing the new point
+        neighbors: list of node IDs from which we want to choose
+        edge_free: result of _edges_free(neighbors, new_point), if already known
+        return: The node in neighbors that minimizes distance through it to
+        new_point, or None if no neighbor has a free edge to it
         """
-        return min(
-            neighbors,
-            key=lambda neighbor: (
-                self._get_cost(neighbor) + self._calculate_distance(neighbor, new_point)
-            ),
+        if edge_free is None:
+            edge_free = self._edges_free(neighbors, new_point)
+        costs = self.tree.cost[neighbors] + self._calculate_distances(
+            new_point, neighbors
         )
+        costs[~edge_free] = inf
+        best = costs.argmin()
+        if costs[best] == inf:
+            return None
+        return neighbors[best]
 
-    def near_neighbors(
-        self, new_point: Tuple[float, float]
-    ) -> List[Tuple[float, float]]:
+    def _min_cost_neighbor_lazily(
+        self, new_point: Sequence[float], neighbors: List[int]
+    ) -> Tuple[Optional[int], np.ndarray, np.ndarray]:
+        """
+        Lazy version of min_cost_neighbor. Checks the edges from the
+        neighbors to the new point in order of the cost through them, and
+        stops at the first free one. Gives the same result as checking them
+        all.
+
+        new_point: tuple of the new point
+        neighbors: list of node IDs to choose from
+        return: ID of the chosen neighbor, or None if no edge is free, along
+        with whether each edge is free and whether it was checked at all
+        """
+        edge_free = np.zeros(len(neighbors), dtype=bool)
+        checked = np.zeros(len(neighbors), dtype=bool)
+        costs = self.tree.cost[neighbors] + self._calculate_distances(
+            new_point, neighbors
+        )
+        for i in np.argsort(costs, kind="stable").tolist():
+            checked[i] = True
+            if self._edge_free(self.tree.point(neighbors[i]), new_point):
+                edge_free[i] = True
+                return neighbors[i], edge_free, checked
+        return None, edge_free, checked
+
+    def _neighbors_to_rewire_lazily(
+        self,
+        neighbors: List[int],
+        new_node: int,
+        edge_free: np.ndarray,
+        checked: np.ndarray,
+    ) -> List[int]:
         """
-        Finds all points in the tree that are within
-        GAMMA_RRT_STAR * sqrt(log_2(number of points) / number of points)
-        distance from the new point.
+        Lazy version of neighbors_to_rewire. Only checks the edges to
+        neighbors that would improve, and that weren't already checked.
 
-        new_point: (x, y) tuple describing the new point
-        return: List of points in the RRT this distance from the new point
+        neighbors: list of node IDs from which we choose a subset to rewire
+        new_node: ID of the new node
+        edge_free: whether the edge from each neighbor to the new node is
+        free, where known
+        checked: whether each entry of edge_free is known
+        return: a list of node IDs from neighbors that should be rewired.
         """
-        if len(self.points) == 1:
-            return self.points
-        neighbors = []
+        if not neighbors:
+            return []
+        new_point = self.tree.point(new_node)
+        new_costs = self._get_cost(new_node) + self._calculate_distances(
+            new_point, neighbors
+        )
+        improves = new_costs < self.tree.cost[neighbors]
+        for i in np.flatnonzero(improves & ~checked).tolist():
+            checked[i] = True
+            edge_free[i] = self._edge_free(self.tree.point(neighbors[i]), new_point)
+        return np.asarray(neighbors)[improves & edge_free].tolist()
+
+    def near_neighbors(self, new_point: Sequence[float]) -> List[int]:
+        """
+        Finds all nodes in the tree that are within
+        gamma * (log_2(number of nodes) / number of nodes)^(1 / d), capped at
+        delta, distance from the new point, where d is the number of
+        dimensions. The radius shrinks slower in more dimensions, so that
+        there are still about log(number of nodes) nodes within it.
+
+        new_point: tuple describing the new point
+        return: List of IDs of nodes in the RRT this distance from the new point
+        """
+        num_nodes = len(self.tree)
+        if num_nodes == 1:
+            return [self.tree.root]
         distance_cutoff = min(
-            GAMMA_RRT_STAR * (log2(len(self.points)) / len(self.points)) ** 0.5, DELTA
+            self.gamma * (log2(num_nodes) / num_nodes) ** (1 / self.tree.dim),
+            self.delta,
         )
-        for point in self.points:
-            dist = self._calculate_distance(new_point, point)
-            if dist - EPSILON <= distance_cutoff:
-                neighbors.append(point)
-        return neighbors
+        return self.neighbor_index.within(new_point, distance_cutoff + EPSILON)
 
     def neighbors_to_rewire(
-        self, neighbors: List[Tuple[float, float]], new_point: Tuple[float, float]
-    ) -> List[Tuple[float, float]]:
+        self,
+        neighbors: List[int],
+        new_node: int,
+        edge_free: Optional[np.ndarray] = None,
+    ) -> List[int]:
         """
         Return neighbors that should be rewired given a list of neighbors and a new
-        point to rewire through. Neighbors should be rewired if:
-        cost(new_point) + distance(new_point, neighbor) < cost(neighbor)
-
-        neighbors: list of points from which we choose a subset to rewire
-        new_point: (x, y) tuple describing the new point
-        return: a list of points describing the points from neighbors that should
-        be rewired.
-        """
-        resulting_neighbors = []
-        for neighbor in neighbors:
-            if self._get_cost(new_point) + self._calculate_distance(
-                new_point, neighbor
-            ) < self._get_cost(neighbor):
-                resulting_neighbors.append(neighbor)
-        return resulting_neighbors
+        node to rewire through. Neighbors should be rewired if the edge between
+        them is free of obstacles and:
+        cost(new_node) + distance(new_node, neighbor) < cost(neighbor)
+
+        neighbors: list of node IDs from which we choose a subset to rewire
+        new_node: ID of the new node
+        edge_free: result of _edges_free(neighbors, new_node's point), if
+        already known
+        return: a list of node IDs from neighbors that should be rewired.
+        """
+        if not neighbors:
+            return []
+        new_point = self.tree.point(new_node)
+        if edge_free is None:
+            edge_free = self._edges_free(neighbors, new_point)
+        new_costs = self._get_cost(new_node) + self._calculate_distances(
+            new_point, neighbors
+        )
+        improves = (new_costs < self.tree.cost[neighbors]) & edge_free
+        return np.asarray(neighbors)[improves].tolist()
 
     def rewire_neighbor_through_new_point(
         self,
-        neighbor: Tuple[float, float],
-        new_point: Tuple[float, float],
+        neighbor: int,
+        new_node: int,
         visualize: bool = True,
     ) -> None:
         """
-        Given a neighbor and a new point (both points in the RRT),
-        rewire the neighbor through the new point. The new point becomes
+        Given a neighbor and a new node (both nodes in the RRT),
+        rewire the neighbor through the new node. The new node becomes
         its new parent, and we remove the edge between the neigbhbor and
-        its previous parent.
+        its previous parent. The change in cost is pushed down to every node
+        below the neighbor.
 
-        neighbor: (x, y) tuple representing point to rewire through new point
-        new_point: (x, y) tuple representing new parent of the neighbor
+        neighbor: ID of the node to rewire through the new node
+        new_node: ID of the new parent of the neighbor
         """
-        parent = self.parents[neighbor]
-        self.parents[neighbor] = new_point
-        self.edges[parent].remove(neighbor)
-        self.edges[new_point].append(neighbor)
+        distance = self._calculate_distance(
+            self.tree.point(new_node), self.tree.point(neighbor)
+        )
+        if distance > self.longest_edge:
+            self.longest_edge = distance
+        new_cost = self._get_cost(new_node) + distance
+        if visualize:
+            self.renderer.edge_removed(neighbor)
+        self.tree.set_parent(neighbor, new_node)
+        self._shift_subtree_costs(neighbor, new_cost - self._get_cost(neighbor))
 
         if visualize:
-            line = plt.plot(
-                [new_point[0], neighbor[0]],
-                [new_point[1], neighbor[1]],
-            )[0]
-            self.edges_to_lines[(new_point, neighbor)] = line
-            self.edges_to_lines[(parent, neighbor)].remove()
-            del self.edges_to_lines[(parent, neighbor)]
+            self.renderer.edge_added(neighbor)
 
     def step(self, visualize=True):
-        random_point = random.random() * RIGHT_BOUND, random.random() * BOTTOM_BOUND
-        nearest = self.nearest_neighbor(random_point)
-        new_point = self.get_new_point(nearest, random_point)
+        self.profiler.count("steps")
+        with self.profiler.phase("sample"):
+            random_point = self.sample_point()
+        with self.profiler.phase("nearest"):
+            nearest = self.nearest_neighbor(random_point)
+        with self.profiler.phase("steer"):
+            new_point = self.get_new_point(self.tree.point(nearest), random_point)
         if new_point is None:
             return
+        new_node = self.extend(nearest, new_point, visualize=visualize)
+        self._count_steps_towards_pruning(1, visualize)
+        return new_node is not None and self._is_in_goal(new_point)
+
+    def step_batch(self, n: int, visualize: bool = True) -> bool:
+        # Prune only after the batch, since the batch keeps the IDs of the
+        # nodes it adds to use as nearest nodes
+        found_goal = super().step_batch(n, visualize)
+        self._count_steps_towards_pruning(n, visualize)
+        return found_goal
+
+    def _count_steps_towards_pruning(self, n: int, visualize: bool) -> None:
+        if self.branch_and_bound_interval is None:
+            return
+        self._steps_since_pruning += n
+        if self._steps_since_pruning >= self.branch_and_bound_interval:
+            self._steps_since_pruning = 0
+            self.prune_branch_and_bound(visualize)
+
+    def prune_branch_and_bound(self, visualize: bool = True) -> int:
+        """
+        Remove every node that can't be on a path cheaper than the current
+        best path to the goal. A node's cost from the root plus its
+        straight-line distance to the goal region is a lower bound on the
+        cost of any path through it, so nodes where that exceeds the best
+        cost can go. Every descendant of such a node has a bound at least as
+        large, so whole subtrees are removed and no node is left orphaned.
+
+        visualize: Whether to draw the change
+        return: number of nodes removed
+        """
+        if self.best_goal_node is None:
+            return 0
+        with self.profiler.phase("branch_and_bound"):
+            nodes = self.tree.nodes()
+            bounds = self.tree.cost[nodes] + self._distances_to_goal(nodes)
+            prune = bounds > self._get_cost(self.best_goal_node) + EPSILON
+            pruned = set(nodes[prune].tolist())
+            # Take whole subtrees, in case rounding kept a descendant of a
+            # pruned node under the bound
+            subtree_roots = [
+                node for node in pruned if self.tree.parent.item(node) not in pruned
+            ]
+            removed = 0
+            for node in subtree_roots:
+                for descendant in self.tree.subtree(node):
+                    if visualize:
+                        self.renderer.edge_removed(descendant)
+                    self.remove_node(descendant)
+                    removed += 1
+        self.profiler.count("nodes_pruned", removed)
+        return removed
+
+    def _distances_to_goal(self, nodes: np.ndarray) -> np.ndarray:
+        """
+        Return the straight-line distance from each of the given nodes to
+        the nearest point of the goal region, 0 for nodes inside it.
+
+        nodes: array of node IDs
+        return: array of distances
+        """
+        low, high = self.goal
+        points = self.tree.points.take(nodes, axis=0)
+        outside = np.maximum(np.maximum(low - points, points - high), 0)
+        return np.sqrt((outside * outside).sum(axis=1))
+
+    def extend(
+        self, nearest: int, new_point: Tuple[float, ...], visualize: bool = True
+    ) -> Optional[int]:
         # get nearby neighbors to the new point, including nearest
-        nearby = self.near_neighbors(new_point) + [nearest]
-        best_neighbor = self.min_cost_neighbor(new_point, nearby)
-        self.edges[best_neighbor].append(new_point)
-        self.parents[new_point] = best_neighbor
-        self.points.append(new_point)
+        with self.profiler.phase("near_neighbors"):
+            nearby = self.near_neighbors(new_point) + [nearest]
+        self.profiler.observe("neighbors", len(nearby))
+        if self.lazy_collision_checking:
+            with self.profiler.phase("choose_parent"):
+                best_neighbor, edge_free, checked = self._min_cost_neighbor_lazily(
+                    new_point, nearby
+                )
+        else:
+            # The edges to check for choosing a parent and for rewiring are
+            # the same, so check them all in one batch.
+            with self.profiler.phase("collision"):
+                edge_free = self._edges_free(nearby, new_point)
+            with self.profiler.phase("choose_parent"):
+                best_neighbor = self.min_cost_neighbor(new_point, nearby, edge_free)
+        if best_neighbor is None:
+            # Every edge to the new point is blocked
+            return None
+        with self.profiler.phase("add"):
+            new_node = self.add_node(new_point, best_neighbor)
         # Rewire neighbors that would have a better cost if they went
         # through our new point instead.
-        for neighbor in self.neighbors_to_rewire(nearby[:-1], new_point):
-            self.rewire_neighbor_through_new_point(
-                neighbor, new_point, visualize=visualize
-            )
+        with self.profiler.phase("rewire"):
+            if self.lazy_collision_checking:
+                to_rewire = self._neighbors_to_rewire_lazily(
+                    nearby[:-1], new_node, edge_free[:-1], checked[:-1]
+                )
+                self.profiler.count(
+                    "collision_checks_avoided", len(nearby) - checked.sum().item()
+                )
+            else:
+                to_rewire = self.neighbors_to_rewire(
+                    nearby[:-1], new_node, edge_free[:-1]
+                )
+            for neighbor in to_rewire:
+                self.rewire_neighbor_through_new_point(
+                    neighbor, new_node, visualize=visualize
+                )
+        self.profiler.count("rewires", len(to_rewire))
+        self.profiler.observe("rewires_per_step", len(to_rewire))
 
         if visualize:
-            line = plt.plot(
-                [best_neighbor[0], new_point[0]],
-                [best_neighbor[1], new_point[1]],
-            )[0]
-            self.edges_to_lines[(best_neighbor, new_point)] = line
-            plt.pause(VIS_PAUSE_LENGTH)
-        return self._is_in_goal(new_point)
+            with self.profiler.phase("draw"):
+                self.renderer.edge_added(new_node)
+                self.renderer.refresh()
+        return new_node
 
 
 def run_rrt_star(num_steps):
-    rrt = RRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    from motion_planning.rrt.matplotlib_renderer import MatplotlibRenderer
+
+    rrt = RRTStar(AGENT_START_POSITION, GOAL_POSITION, renderer=MatplotlibRenderer())
     rrt.init_plot()
 
     for i in range(num_steps):
@@ -146,9 +449,10 @@ def run_rrt_star(num_steps):
             print(i, "steps completed.")
         rrt.step()
     rrt.redraw_path_to_goal()
-    path = rrt.best_path_to_goal()[::-1]
+    print("Path cost:", rrt.best_cost_to_goal())
+    path = rrt.best_path_to_goal()
     rrt.move_along_path_until_done(path)
-    plt.show()
+    rrt.renderer.show()
 
 
 if __name__ == "__main__":
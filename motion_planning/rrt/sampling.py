@@ -0,0 +1,371 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+import random
+
+import numpy as np
+
+from motion_planning.config.rrt_config import (
+    GOAL_SAMPLING_BIAS,
+    SAMPLER_PREFETCH_BLOCK,
+)
+
+# Bits of precision of the Sobol sequence
+_SOBOL_BITS = 32
+
+# Primitive polynomials and initial direction numbers of the Sobol sequence
+# from its second dimension on, from Joe and Kuo's new-joe-kuo-6.21201
+# table: (degree s, coefficients a, (m_1, ..., m_s)). The first dimension
+# is the van der Corput sequence.
+_SOBOL_POLYNOMIALS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+
+
+class Sampler(ABC):
+    """
+    Chooses the points a planner grows its tree towards. Planners call
+    sample once per step, or sample_batch for a batch of steps, passing
+    themselves so the sampler can read their bounds and goal. Points have
+    as many coordinates as the planner's bounds.
+
+    Every sampler has its own source of random numbers, random, which the
+    planner also uses for anything else random it does. Unless given a seed,
+    that's the global random module, so random.seed seeds the planner as it
+    always has. With a seed, it's a random.Random of its own, so planners in
+    the same process don't affect each other's results.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        seed: seed for this sampler's own random number generator, or None
+        to use the global one
+        """
+        self.random = random.Random(seed) if seed is not None else random
+
+    @abstractmethod
+    def sample(self, rrt) -> Tuple[float, ...]:
+        """
+        Return the next point to grow the tree towards.
+
+        rrt: planner to sample for
+        return: tuple of the sampled point's coordinates
+        """
+        pass
+
+    def sample_batch(self, rrt, n: int) -> np.ndarray:
+        """
+        Return the next n points, the same ones n calls to sample would.
+
+        rrt: planner to sample for
+        n: number of points to sample
+        return: (n, dim) array of sampled points
+        """
+        return np.array([self.sample(rrt) for _ in range(n)], dtype=np.float64)
+
+
+class UnitCubeSampler(Sampler):
+    """
+    Sampler that draws points from a sequence in the unit cube, with as
+    many dimensions as the planner's bounds, and scales them to the
+    planner's search space.
+
+    In prefetch mode, points are generated prefetch at a time with NumPy
+    and handed out one by one, which makes each call to sample much
+    cheaper. Since only unit cube points are stored, changing the planner's
+    bounds still takes effect at once, as long as their number of
+    dimensions stays the same.
+    """
+
+    def __init__(self, seed: Optional[int] = None, prefetch: int = 1):
+        """
+        seed: seed for this sampler's own random number generator, or None
+        to use the global one
+        prefetch: how many points to generate at once, or 1 to generate
+        each point as it's needed
+        """
+        super().__init__(seed)
+        self.prefetch = prefetch
+        # Prefetched points not handed out yet, the next one last
+        self._block: List[List[float]] = []
+
+    @abstractmethod
+    def _unit_points(self, n: int, dim: int) -> np.ndarray:
+        """
+        Return the next n points of the sequence, as an (n, dim) array.
+        """
+        pass
+
+    def _unit_point(self, dim: int) -> Sequence[float]:
+        """
+        Return the next point of the sequence.
+        """
+        return self._unit_points(1, dim)[0].tolist()
+
+    def _prefetch_block(self, n: int, dim: int) -> np.ndarray:
+        """
+        Return the next n points of the sequence in prefetch mode.
+        """
+        return self._unit_points(n, dim)
+
+    def sample(self, rrt) -> Tuple[float, ...]:
+        low, high = rrt.bounds
+        if self.prefetch > 1:
+            if not self._block:
+                block = self._prefetch_block(self.prefetch, len(low))
+                self._block = block.tolist()[::-1]
+            unit = self._block.pop()
+        else:
+            unit = self._unit_point(len(low))
+        return tuple([a + u * (b - a) for a, u, b in zip(low, unit, high)])
+
+    def sample_batch(self, rrt, n: int) -> np.ndarray:
+        low, high = (np.asarray(corner, dtype=np.float64) for corner in rrt.bounds)
+        if self.prefetch > 1:
+            taken = self._block[-n:][::-1] if n else []
+            del self._block[len(self._block) - len(taken) :]
+            rest = n - len(taken)
+            points = np.array(taken, dtype=np.float64).reshape(-1, len(low))
+            if rest:
+                points = np.concatenate((points, self._prefetch_block(rest, len(low))))
+        else:
+            points = self._unit_points(n, len(low))
+        return low + points * (high - low)
+
+
+class UniformSampler(UnitCubeSampler):
+    """
+    Independent uniformly random points. The default sampler.
+
+    Without prefetch, each point takes one draw from random per coordinate,
+    so sample_batch and sample give the same points. In prefetch mode, blocks
+    come from a NumPy generator seeded from random, which is much faster
+    but gives different points.
+    """
+
+    def __init__(self, seed: Optional[int] = None, prefetch: int = 1):
+        super().__init__(seed, prefetch)
+        self._numpy_random = None
+
+    def _unit_point(self, dim: int) -> Sequence[float]:
+        return [self.random.random() for _ in range(dim)]
+
+    def _unit_points(self, n: int, dim: int) -> np.ndarray:
+        return np.array(
+            [self.random.random() for _ in range(dim * n)], dtype=np.float64
+        ).reshape(n, dim)
+
+    def _prefetch_block(self, n: int, dim: int) -> np.ndarray:
+        if self._numpy_random is None:
+            self._numpy_random = np.random.default_rng(self.random.getrandbits(64))
+        return self._numpy_random.random((n, dim))
+
+
+class HaltonSampler(UnitCubeSampler):
+    """
+    The Halton sequence, with the first dim primes as bases: 2 and 3 in 2D.
+    Its points cover the search space more evenly than random ones, so the
+    tree spreads out faster. In more than about ten dimensions, its
+    projections onto pairs of high dimensions get badly correlated, and
+    SobolSampler is the better choice.
+
+    The sequence is shifted by a random offset, wrapping around at the
+    edges (a Cranley-Patterson rotation), so different seeds give different
+    points that are just as evenly spread.
+
+    Generating a point costs about the same as a block of them, so this is
+    in prefetch mode by default.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        prefetch: int = SAMPLER_PREFETCH_BLOCK,
+        dim: int = 2,
+    ):
+        """
+        seed: seed for this sampler's own random number generator, or None
+        to use the global one
+        prefetch: how many points to generate at once, or 1 to generate
+        each point as it's needed
+        dim: number of dimensions of the planner's bounds
+        """
+        super().__init__(seed, prefetch)
+        self.dim = dim
+        self.bases = _first_primes(dim)
+        self.shift = np.array([self.random.random() for _ in range(dim)])
+        # Index of the next point. Point 0 is the corner, so start at 1.
+        self.index = 1
+
+    def _unit_points(self, n: int, dim: int) -> np.ndarray:
+        _check_dim(self, dim)
+        indices = np.arange(self.index, self.index + n, dtype=np.int64)
+        self.index += n
+        points = np.column_stack(
+            [_radical_inverse(indices, base) for base in self.bases]
+        )
+        return (points + self.shift) % 1.0
+
+
+def _check_dim(sampler: UnitCubeSampler, dim: int) -> None:
+    if dim != sampler.dim:
+        raise ValueError(
+            "{} was made for {}D points, not {}D ones".format(
+                type(sampler).__name__, sampler.dim, dim
+            )
+        )
+
+
+def _first_primes(n: int) -> List[int]:
+    """
+    Return the first n prime numbers.
+    """
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def _radical_inverse(indices: np.ndarray, base: int) -> np.ndarray:
+    """
+    Return the digits of each index in the given base, mirrored about the
+    point, e.g. 6 = 110 in base 2 becomes 0.011 = 0.375.
+    """
+    result = np.zeros(len(indices))
+    scale = 1.0 / base
+    while indices.any():
+        result += scale * (indices % base)
+        indices = indices // base
+        scale /= base
+    return result
+
+
+def _sobol_directions(dim: int) -> np.ndarray:
+    """
+    Return the direction numbers of the first dim dimensions of the Sobol
+    sequence, as a (dim, _SOBOL_BITS) array.
+    """
+    if dim > len(_SOBOL_POLYNOMIALS) + 1:
+        raise ValueError(
+            "SobolSampler supports at most {} dimensions".format(
+                len(_SOBOL_POLYNOMIALS) + 1
+            )
+        )
+    directions = np.zeros((dim, _SOBOL_BITS), dtype=np.uint64)
+    for bit in range(_SOBOL_BITS):
+        directions[0, bit] = 1 << (_SOBOL_BITS - 1 - bit)
+    for axis, (degree, coefficients, initial) in enumerate(
+        _SOBOL_POLYNOMIALS[: dim - 1], 1
+    ):
+        # m_k = 2 a_1 m_(k-1) ^ 4 a_2 m_(k-2) ^ ... ^ 2^s m_(k-s) ^ m_(k-s)
+        m = list(initial)
+        for k in range(degree, _SOBOL_BITS):
+            new = m[k - degree] ^ (m[k - degree] << degree)
+            for j in range(1, degree):
+                if (coefficients >> (degree - 1 - j)) & 1:
+                    new ^= m[k - j] << j
+            m.append(new)
+        for bit in range(_SOBOL_BITS):
+            directions[axis, bit] = m[bit] << (_SOBOL_BITS - 1 - bit)
+    return directions
+
+
+class SobolSampler(UnitCubeSampler):
+    """
+    The Sobol sequence, in up to 16 dimensions. Like the Halton sequence,
+    its points cover the search space more evenly than random ones,
+    especially in runs of a power of two points.
+
+    The sequence is scrambled with a random digital shift, XORing every
+    point with the same random bits, which keeps it just as evenly spread.
+
+    In prefetch mode by default, like HaltonSampler.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        prefetch: int = SAMPLER_PREFETCH_BLOCK,
+        dim: int = 2,
+    ):
+        """
+        seed: seed for this sampler's own random number generator, or None
+        to use the global one
+        prefetch: how many points to generate at once, or 1 to generate
+        each point as it's needed
+        dim: number of dimensions of the planner's bounds
+        """
+        super().__init__(seed, prefetch)
+        self.dim = dim
+        self.directions = _sobol_directions(dim)
+        self.shift = np.array(
+            [self.random.getrandbits(_SOBOL_BITS) for _ in range(dim)],
+            dtype=np.uint64,
+        )
+        # Index of the next point. Point 0 is the corner, so start at 1.
+        self.index = 1
+
+    def _unit_points(self, n: int, dim: int) -> np.ndarray:
+        _check_dim(self, dim)
+        indices = np.arange(self.index, self.index + n, dtype=np.uint64)
+        self.index += n
+        # Point i is the XOR of the direction numbers of the set bits of the
+        # Gray code of i
+        gray = indices ^ (indices >> np.uint64(1))
+        points = np.zeros((n, dim), dtype=np.uint64)
+        for bit in range(_SOBOL_BITS):
+            set_bits = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+            points[set_bits] ^= self.directions[:, bit]
+        return (points ^ self.shift) / float(1 << _SOBOL_BITS)
+
+
+class GoalBiasedSampler(Sampler):
+    """
+    Sampler that draws a fraction of its points uniformly from the goal
+    region, and the rest from another sampler. Pulling the tree towards the
+    goal usually finds a first path in fewer steps, at the cost of
+    exploring less.
+    """
+
+    def __init__(
+        self,
+        base: Sampler = None,
+        bias: float = GOAL_SAMPLING_BIAS,
+        seed: Optional[int] = None,
+    ):
+        """
+        base: sampler for the points not drawn from the goal region,
+        a UniformSampler by default
+        bias: fraction of points to draw from the goal region
+        seed: seed for this sampler's own random number generator, or None
+        to use the global one. Also seeds the default base sampler.
+        """
+        super().__init__(seed)
+        if base is None:
+            base = UniformSampler(
+                self.random.getrandbits(64) if seed is not None else None
+            )
+        self.base = base
+        self.bias = bias
+
+    def sample(self, rrt) -> Tuple[float, ...]:
+        if self.random.random() < self.bias:
+            low, high = rrt.goal
+            return tuple([self.random.uniform(a, b) for a, b in zip(low, high)])
+        return self.base.sample(rrt)
@@ -0,0 +1,175 @@
+from bisect import bisect_right
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from motion_planning.config.rrt_config import AGENT_SPEED
+
+
+class Trajectory:
+    """
+    A path of straight segments, parameterized by arc length: the position
+    at distance s along the path, from 0 at the first point to length at
+    the last.
+
+    The cumulative length up to each point is computed once, so a position
+    costs a binary search over the points, or with positions many at once.
+    To move along the path tick by tick, use a TrajectoryFollower, which
+    remembers its segment and costs amortized O(1) per tick.
+    """
+
+    def __init__(self, points: Sequence[Sequence[float]]):
+        """
+        points: points of the path in order, at least one, each with the
+        same number of coordinates
+        """
+        if not len(points):
+            raise ValueError("A trajectory needs at least one point")
+        self.points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        self.dim = self.points.shape[1]
+        offsets = np.diff(self.points, axis=0)
+        segment_lengths = np.sqrt((offsets**2).sum(axis=1))
+        # Distance along the path to each point
+        self.arc_lengths = np.concatenate(([0.0], np.cumsum(segment_lengths)))
+        self.length = self.arc_lengths[-1].item()
+        # Python copies for the scalar lookups, which are faster on lists
+        self._points = self.points.tolist()
+        self._arc_lengths = self.arc_lengths.tolist()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _segment(self, s: float) -> int:
+        """
+        Return the index of the first point of the segment containing
+        distance s, which must be within the path.
+        """
+        return min(bisect_right(self._arc_lengths, s), len(self._points) - 1) - 1
+
+    def _interpolate(self, segment: int, s: float) -> Tuple[float, ...]:
+        """
+        Return the position at distance s, which must be on the given
+        segment.
+        """
+        if segment < 0:
+            return tuple(self._points[0])
+        start, end = self._arc_lengths[segment], self._arc_lengths[segment + 1]
+        a, b = self._points[segment], self._points[segment + 1]
+        if end == start:
+            return tuple(b)
+        t = (s - start) / (end - start)
+        return tuple([p + t * (q - p) for p, q in zip(a, b)])
+
+    def position(self, s: float) -> Tuple[float, ...]:
+        """
+        Return the position at a distance along the path. Distances outside
+        the path give its ends.
+
+        s: distance from the first point
+        return: tuple of the position's coordinates
+        """
+        s = min(max(s, 0.0), self.length)
+        return self._interpolate(self._segment(s), s)
+
+    def positions(self, s: np.ndarray) -> np.ndarray:
+        """
+        Vectorized position, e.g. for many agents on the same path or many
+        timestamps of one agent.
+
+        s: array of distances from the first point, of any shape
+        return: array of positions, with the shape of s plus a trailing
+        axis of coordinates
+        """
+        s = np.clip(np.asarray(s, dtype=np.float64), 0.0, self.length)
+        if len(self.points) == 1:
+            return np.broadcast_to(self.points[0], s.shape + (self.dim,)).copy()
+        segment = np.clip(
+            np.searchsorted(self.arc_lengths, s, side="right") - 1,
+            0,
+            len(self.points) - 2,
+        )
+        start = self.arc_lengths[segment]
+        segment_length = self.arc_lengths[segment + 1] - start
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(segment_length > 0, (s - start) / segment_length, 1.0)
+        start_points = self.points[segment]
+        return start_points + t[..., None] * (self.points[segment + 1] - start_points)
+
+
+class TrajectoryFollower:
+    """
+    Moves along a trajectory at a fixed distance per tick. Distance only
+    ever increases, so the current segment is found by walking forward from
+    the last one, which takes amortized O(1) per tick.
+    """
+
+    def __init__(self, trajectory: Trajectory, speed: float = AGENT_SPEED):
+        """
+        trajectory: path to follow
+        speed: distance to move per tick
+        """
+        self.trajectory = trajectory
+        self.speed = speed
+        # Distance travelled so far
+        self.s = 0.0
+        self._segment = -1
+        self._next_segment()
+
+    def _next_segment(self) -> None:
+        """
+        Move on to the next segment, caching its start, direction and the
+        distances at its ends, so a tick within it is a couple of
+        multiply-adds.
+        """
+        trajectory = self.trajectory
+        self._segment += 1
+        if self._segment >= len(trajectory) - 1:
+            # Past the last segment: stay at the end point
+            self._segment = len(trajectory) - 1
+            self._start_s = self._end_s = trajectory.length
+            self._start = trajectory._points[-1]
+            self._direction = [0.0] * trajectory.dim
+            return
+        start_s = trajectory._arc_lengths[self._segment]
+        end_s = trajectory._arc_lengths[self._segment + 1]
+        a, b = trajectory._points[self._segment : self._segment + 2]
+        self._start_s, self._end_s = start_s, end_s
+        self._start = a
+        segment_length = end_s - start_s
+        if segment_length > 0:
+            self._direction = [(q - p) / segment_length for p, q in zip(a, b)]
+        else:
+            self._direction = [0.0] * trajectory.dim
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the end of the trajectory has been reached.
+        """
+        return self.s >= self.trajectory.length
+
+    @property
+    def position(self) -> Tuple[float, ...]:
+        along = self.s - self._start_s
+        return tuple([p + along * d for p, d in zip(self._start, self._direction)])
+
+    def advance(self, distance: float = None) -> Tuple[float, ...]:
+        """
+        Move forward, stopping at the end of the trajectory.
+
+        distance: distance to move, or speed if None
+        return: position after moving
+        """
+        s = self.s + (self.speed if distance is None else distance)
+        if s >= self._end_s:
+            length = self.trajectory.length
+            if s >= length:
+                s = length
+                # Land exactly on the end point
+                while self._segment < len(self.trajectory) - 1:
+                    self._next_segment()
+            else:
+                while s > self._end_s:
+                    self._next_segment()
+        self.s = s
+        return self.position
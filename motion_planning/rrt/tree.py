@@ -0,0 +1,439 @@
+from typing import List, Sequence, Tuple
+import json
+
+import numpy as np
+
+from motion_planning.config.rrt_config import INITIAL_TREE_CAPACITY
+
+# Parent/child/sibling value for "no such node"
+NO_NODE = -1
+
+# Saved trees start with this, followed by the length of a JSON header as a
+# 4 byte little-endian integer, the header, and then each array in
+# _SAVED_ARRAYS order, each starting at a multiple of _SAVED_ALIGNMENT bytes.
+_SAVED_MAGIC = b"RRTTREE\x02"
+_SAVED_ARRAYS = (
+    ("points", "<f8"),
+    ("cost", "<f8"),
+    ("parent", "<i4"),
+    ("first_child", "<i4"),
+    ("next_sibling", "<i4"),
+    ("prev_sibling", "<i4"),
+    ("alive", "|b1"),
+    ("free", "<i4"),
+)
+_SAVED_ALIGNMENT = 64
+# Version 1 files, written before trees could have any number of
+# dimensions, hold 2D trees with separate x and y arrays and no "dim" in
+# the header.
+_SAVED_MAGIC_V1 = b"RRTTREE\x01"
+_SAVED_ARRAYS_V1 = (("x", "<f8"), ("y", "<f8")) + _SAVED_ARRAYS[1:]
+
+
+def _saved_shape(name: str, end: int, num_free: int, dim: int) -> Tuple[int, ...]:
+    """
+    Return the shape of a saved array in a saved tree file.
+    """
+    if name == "points":
+        return end, dim
+    return (num_free if name == "free" else end,)
+
+
+def _saved_offsets(
+    header_end: int,
+    end: int,
+    num_free: int,
+    dim: int,
+    arrays: Tuple[Tuple[str, str], ...] = _SAVED_ARRAYS,
+) -> List[int]:
+    """
+    Return the byte offset of each saved array in a saved tree file.
+    """
+    offsets = []
+    offset = header_end
+    for name, dtype in arrays:
+        offset = -(-offset // _SAVED_ALIGNMENT) * _SAVED_ALIGNMENT
+        offsets.append(offset)
+        length = np.prod(_saved_shape(name, end, num_free, dim), dtype=np.int64)
+        offset += int(length) * np.dtype(dtype).itemsize
+    return offsets
+
+
+class Tree:
+    """
+    Structure-of-arrays storage for an RRT. Nodes are integer IDs indexing
+    into growable NumPy arrays of coordinates, parents and costs. Children
+    are kept as intrusive doubly linked sibling lists, so attaching and
+    detaching a node is O(1). Slots of removed nodes go on a free list and
+    are reused by later insertions.
+
+    Points can have any number of dimensions, the same for every node.
+    Node i's coordinates are row i of points, so the coordinates of many
+    nodes at once are points.take(nodes, axis=0).
+    """
+
+    def __init__(self, root: Sequence[float], capacity: int = INITIAL_TREE_CAPACITY):
+        self.dim = len(root)
+        self.points = np.empty((capacity, self.dim), dtype=np.float64)
+        self.cost = np.empty(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.next_sibling = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.prev_sibling = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = []
+        # One past the highest slot ever used
+        self.end = 0
+        self.size = 0
+        self.root = self.add(root, NO_NODE, 0.0)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return len(self.points)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes used by the node arrays, including unused capacity.
+        """
+        return sum(
+            array.nbytes
+            for array in (
+                self.points,
+                self.cost,
+                self.parent,
+                self.first_child,
+                self.next_sibling,
+                self.prev_sibling,
+                self.alive,
+            )
+        )
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of every node array.
+        """
+        capacity = self.capacity
+        for name, fill in (
+            ("points", 0.0),
+            ("cost", 0.0),
+            ("parent", NO_NODE),
+            ("first_child", NO_NODE),
+            ("next_sibling", NO_NODE),
+            ("prev_sibling", NO_NODE),
+            ("alive", False),
+        ):
+            old = getattr(self, name)
+            new = np.full((2 * capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def save(self, path: str) -> None:
+        """
+        Write the tree to a file in a compact binary format that load can
+        memory-map. Only slots up to end are written.
+
+        path: path of the file to write
+        """
+        header = json.dumps(
+            {"end": self.end, "size": self.size, "root": self.root, "dim": self.dim}
+        ).encode()
+        header_end = len(_SAVED_MAGIC) + 4 + len(header)
+        arrays = [
+            np.asarray(self.free if name == "free" else getattr(self, name)[: self.end])
+            for name, _ in _SAVED_ARRAYS
+        ]
+        offsets = _saved_offsets(header_end, self.end, len(self.free), self.dim)
+        with open(path, "wb") as f:
+            f.write(_SAVED_MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            for array, (_, dtype), offset in zip(arrays, _SAVED_ARRAYS, offsets):
+                f.write(bytes(offset - f.tell()))
+                f.write(array.astype(dtype, copy=False).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Tree":
+        """
+        Load a tree written by save. Files from before trees could have
+        any number of dimensions are loaded as 2D trees, with their
+        coordinates always read into memory.
+
+        With mmap, the node arrays are copy-on-write memory maps of the
+        file, so loading reads almost nothing, and pages are read as nodes
+        are used. Changes to the tree never go back to the file. The arrays
+        are copied into memory the first time the tree has to grow.
+
+        path: path of the file to read
+        mmap: whether to memory-map the arrays instead of reading them
+        return: the loaded tree
+        """
+        with open(path, "rb") as f:
+            magic = f.read(len(_SAVED_MAGIC))
+            if magic == _SAVED_MAGIC:
+                arrays = _SAVED_ARRAYS
+            elif magic == _SAVED_MAGIC_V1:
+                arrays = _SAVED_ARRAYS_V1
+            elif magic[:-1] == _SAVED_MAGIC[:-1]:
+                raise ValueError(
+                    "{} is a saved tree of unsupported version {}".format(
+                        path, magic[-1]
+                    )
+                )
+            else:
+                raise ValueError("{} is not a saved tree".format(path))
+            header = json.loads(f.read(int.from_bytes(f.read(4), "little")))
+            header_end = f.tell()
+        tree = cls.__new__(cls)
+        tree.end, tree.size, tree.root = header["end"], header["size"], header["root"]
+        tree.dim = header.get("dim", 2)
+        num_free = tree.end - tree.size
+        offsets = _saved_offsets(header_end, tree.end, num_free, tree.dim, arrays)
+        for (name, dtype), offset in zip(arrays, offsets):
+            shape = _saved_shape(name, tree.end, num_free, tree.dim)
+            if name == "free" or not mmap:
+                array = np.fromfile(
+                    path, dtype=dtype, count=int(np.prod(shape)), offset=offset
+                ).reshape(shape)
+            else:
+                array = np.memmap(
+                    path, dtype=dtype, mode="c", offset=offset, shape=shape
+                )
+            setattr(tree, name, array)
+        if arrays is _SAVED_ARRAYS_V1:
+            tree.points = np.stack([tree.x, tree.y], axis=1)
+            del tree.x, tree.y
+        tree.free = tree.free.tolist()
+        return tree
+
+    def point(self, node: int) -> Tuple[float, ...]:
+        """
+        Return the coordinates of a node.
+
+        node: ID of the node
+        return: tuple of the node's coordinates
+        """
+        return tuple(self.points[node].tolist())
+
+    def nodes(self) -> np.ndarray:
+        """
+        Return the IDs of all nodes currently in the tree.
+        """
+        return np.flatnonzero(self.alive[: self.end])
+
+    def children(self, node: int) -> List[int]:
+        """
+        Return the IDs of the children of a node.
+
+        node: ID of the node
+        """
+        children = []
+        child = self.first_child.item(node)
+        while child != NO_NODE:
+            children.append(child)
+            child = self.next_sibling.item(child)
+        return children
+
+    def subtree(self, node: int) -> List[int]:
+        """
+        Return the IDs of a node and all of its descendants.
+
+        node: ID of the root of the subtree
+        """
+        result = []
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            result.append(cur)
+            stack.extend(self.children(cur))
+        return result
+
+    def path_from_root(self, node: int) -> List[int]:
+        """
+        Return the IDs of the nodes from the root down to the given node.
+
+        node: ID of the last node of the path
+        """
+        path = [node]
+        parent = self.parent.item(node)
+        while parent != NO_NODE:
+            path.append(parent)
+            parent = self.parent.item(parent)
+        return path[::-1]
+
+    def add(self, point: Sequence[float], parent: int, cost: float) -> int:
+        """
+        Add a node to the tree, reusing a free slot if one exists.
+
+        point: coordinates of the node's position
+        parent: ID of the node's parent, or NO_NODE for a root
+        cost: cost from the root to this node
+        return: ID of the new node
+        """
+        if self.free:
+            node = self.free.pop()
+        else:
+            if self.end == self.capacity:
+                self._grow()
+            node = self.end
+            self.end += 1
+        self.points[node] = point
+        self.cost[node] = cost
+        self.first_child[node] = NO_NODE
+        self.alive[node] = True
+        self.size += 1
+        self._link(node, parent)
+        return node
+
+    def remove(self, node: int) -> None:
+        """
+        Remove a node from the tree and free its slot. Children of the node
+        are left pointing at it, so the caller is responsible for removing or
+        reattaching them.
+
+        node: ID of the node to remove
+        """
+        parent = self.parent.item(node)
+        if parent != NO_NODE and self.alive[parent]:
+            self._unlink(node)
+        self.parent[node] = NO_NODE
+        self.alive[node] = False
+        self.free.append(node)
+        self.size -= 1
+
+    def set_parent(self, node: int, parent: int) -> None:
+        """
+        Move a node, along with its subtree, under a new parent.
+
+        node: ID of the node to move
+        parent: ID of its new parent
+        """
+        self._unlink(node)
+        self._link(node, parent)
+
+    def detach(self, node: int) -> None:
+        """
+        Cut a node, along with its subtree, off from its parent. It has no
+        parent until given one with set_parent.
+
+        node: ID of the node to detach
+        """
+        self._unlink(node)
+        self.parent[node] = NO_NODE
+
+    def set_root(self, node: int) -> None:
+        """
+        Detach a node from its parent and make it the root, re-basing every
+        cost so that the new root has cost 0. Nodes that are not below the new
+        root are not removed, so the caller is responsible for removing them.
+
+        node: ID of the new root
+        """
+        self._unlink(node)
+        self.parent[node] = NO_NODE
+        self.cost[: self.end] -= self.cost[node]
+        self.root = node
+
+    def reroot(self, node: int) -> None:
+        """
+        Make a node the root while keeping every node, by reversing the
+        edges on the path to it from the current root. Costs are recomputed
+        from the new root.
+
+        node: ID of the new root
+        """
+        previous, current = node, self.parent.item(node)
+        self._unlink(node)
+        self.parent[node] = NO_NODE
+        while current != NO_NODE:
+            next_ = self.parent.item(current)
+            self._unlink(current)
+            self._link(current, previous)
+            previous, current = current, next_
+        self.root = node
+        self.recompute_costs()
+
+    def recompute_costs(self) -> None:
+        """
+        Recompute every node's cost as the sum of the edge lengths from the
+        root. Works on all nodes at once by pointer jumping: each round adds
+        to every node the summed length of the edges above its current
+        ancestor and jumps to that ancestor's ancestor, so it takes about
+        log2(depth of the tree) rounds.
+        """
+        end = self.end
+        parent = self.parent[:end].astype(np.intp)
+        has_parent = parent != NO_NODE
+        above = np.where(has_parent, parent, 0)
+        offsets = self.points[:end] - self.points[:end][above]
+        cost = np.where(has_parent, np.sqrt((offsets**2).sum(axis=1)), 0.0)
+        ancestor = parent
+        while True:
+            jumping = ancestor != NO_NODE
+            if not jumping.any():
+                break
+            target = np.where(jumping, ancestor, 0)
+            cost = cost + np.where(jumping, cost[target], 0.0)
+            ancestor = np.where(jumping, ancestor[target], NO_NODE)
+        self.cost[:end] = cost
+
+    def longest_edge(self) -> float:
+        """
+        Return the length of the longest edge in the tree, or 0 if it has
+        none.
+        """
+        nodes = self.nodes()
+        parents = self.parent[nodes]
+        nodes, parents = nodes[parents != NO_NODE], parents[parents != NO_NODE]
+        if not len(nodes):
+            return 0.0
+        offsets = self.points.take(nodes, axis=0) - self.points.take(parents, axis=0)
+        return np.sqrt(np.einsum("ij,ij->i", offsets, offsets).max()).item()
+
+    def shift_subtree_costs(self, node: int, delta: float) -> List[int]:
+        """
+        Add delta to the cost of a node and every node below it in the tree.
+        Used when the cost to reach a node changes, e.g. when it is rewired.
+
+        node: ID of the root of the subtree to update
+        delta: amount to add to each cost
+        return: IDs of the nodes whose cost changed
+        """
+        subtree = self.subtree(node)
+        self.cost[subtree] += delta
+        return subtree
+
+    def _link(self, node: int, parent: int) -> None:
+        """
+        Make node the first child of parent.
+        """
+        self.parent[node] = parent
+        self.prev_sibling[node] = NO_NODE
+        if parent == NO_NODE:
+            self.next_sibling[node] = NO_NODE
+            return
+        first = self.first_child.item(parent)
+        self.next_sibling[node] = first
+        if first != NO_NODE:
+            self.prev_sibling[first] = node
+        self.first_child[parent] = node
+
+    def _unlink(self, node: int) -> None:
+        """
+        Remove node from its parent's list of children.
+        """
+        parent = self.parent.item(node)
+        if parent == NO_NODE:
+            return
+        prev, next_ = self.prev_sibling.item(node), self.next_sibling.item(node)
+        if prev == NO_NODE:
+            self.first_child[parent] = next_
+        else:
+            self.next_sibling[prev] = next_
+        if next_ != NO_NODE:
+            self.prev_sibling[next_] = prev
+        self.prev_sibling[node] = NO_NODE
+        self.next_sibling[node] = NO_NODE
@@ -0,0 +1,58 @@
+"""
+Invariant checks shared by the tests.
+"""
+
+from math import dist
+
+import pytest
+
+from motion_planning.rrt.tree import NO_NODE, Tree
+
+
+def assert_tree_consistent(tree: Tree) -> None:
+    """
+    Assert that the parent, child and sibling links of every live node
+    agree, that every live node is reachable from the root, and that every
+    cost is its parent's cost plus the length of the edge between them.
+    """
+    nodes = set(tree.nodes().tolist())
+    assert len(nodes) == tree.size
+    assert tree.root in nodes
+    assert not nodes & set(tree.free)
+    assert len(tree.free) + tree.size == tree.end
+    for node in nodes:
+        parent = tree.parent.item(node)
+        if node == tree.root:
+            assert parent == NO_NODE
+            assert tree.cost[node] == pytest.approx(0, abs=1e-9)
+        else:
+            assert parent in nodes
+            edge = dist(tree.point(parent), tree.point(node))
+            assert tree.cost[node] == pytest.approx(
+                tree.cost[parent] + edge, rel=1e-9, abs=1e-9
+            )
+        previous = NO_NODE
+        for child in tree.children(node):
+            assert tree.parent[child] == node
+            assert tree.prev_sibling[child] == previous
+            previous = child
+    assert sorted(tree.subtree(tree.root)) == sorted(nodes)
+
+
+def assert_planner_consistent(rrt) -> None:
+    """
+    Assert that a planner's tree is consistent, that its neighbor index
+    holds exactly the live nodes, and that its goal tracking matches the
+    nodes in the goal.
+    """
+    tree = rrt.tree
+    assert_tree_consistent(tree)
+    nodes = sorted(tree.nodes().tolist())
+    assert len(rrt.neighbor_index) == len(nodes)
+    assert sorted(rrt.neighbor_index.within_box(*rrt.bounds)) == nodes
+    in_goal = {node for node in nodes if rrt._is_in_goal(tree.point(node))}
+    assert rrt.goal_nodes == in_goal
+    if in_goal:
+        assert tree.cost[rrt.best_goal_node] == min(tree.cost[node] for node in in_goal)
+    else:
+        assert rrt.best_goal_node is None
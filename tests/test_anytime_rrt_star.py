@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from tests.checks import assert_planner_consistent
+
+
+def grow(seed: int, steps: int) -> AnytimeRRTStar:
+    random.seed(seed)
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    for _ in range(steps):
+        rrt.step(visualize=False)
+    return rrt
+
+
+def assert_edges_free(rrt: AnytimeRRTStar) -> None:
+    tree = rrt.tree
+    for node in tree.nodes().tolist():
+        assert rrt.collision_checker.point_free(tree.point(node))
+        if node != tree.root:
+            parent = tree.parent.item(node)
+            assert rrt.collision_checker.segment_free(
+                tree.point(parent), tree.point(node)
+            )
+
+
+def test_obstacle_changes_keep_tree_valid():
+    rrt = grow(0, 3000)
+    cost = rrt.best_cost_to_goal()
+
+    # Across the best path, between the two default obstacles
+    obstacle = rrt.add_obstacle(((30, 45), 40, 10), visualize=False)
+    assert_planner_consistent(rrt)
+    assert_edges_free(rrt)
+    # Repaired around the obstacle, and never cheaper for it
+    assert cost <= rrt.best_cost_to_goal() < float("inf")
+
+    rrt.move_obstacle(obstacle, ((60, 45), 30, 10), visualize=False)
+    assert_planner_consistent(rrt)
+    assert_edges_free(rrt)
+
+    cost = rrt.best_cost_to_goal()
+    rrt.remove_obstacle(0, visualize=False)
+    assert_planner_consistent(rrt)
+    assert_edges_free(rrt)
+    # Freed space only ever makes paths cheaper
+    assert rrt.best_cost_to_goal() <= cost
+
+    for _ in range(500):
+        rrt.step(visualize=False)
+    assert_planner_consistent(rrt)
+    assert_edges_free(rrt)
+
+
+def test_changing_a_removed_obstacle_raises():
+    rrt = grow(0, 200)
+    obstacle = rrt.add_obstacle(((60, 45), 30, 10), visualize=False)
+    rrt.remove_obstacle(obstacle, visualize=False)
+    with pytest.raises(ValueError, match="was removed"):
+        rrt.move_obstacle(obstacle, ((60, 45), 30, 10), visualize=False)
+    with pytest.raises(ValueError, match="was removed"):
+        rrt.remove_obstacle(obstacle, visualize=False)
+
+
+def test_obstacle_over_the_root_raises():
+    rrt = grow(0, 200)
+    with pytest.raises(ValueError):
+        rrt.add_obstacle(((5, 5), 10, 10), visualize=False)
+
+
+def test_evict_keeps_root_and_best_path():
+    rrt = grow(0, 3000)
+    root = rrt.tree.root
+    best_path = rrt.best_node_path_to_goal()
+    assert best_path
+
+    size = len(rrt.tree)
+    assert rrt.evict(1000, visualize=False) == 1000
+    assert len(rrt.tree) == size - 1000
+    assert rrt.tree.root == root
+    assert rrt.best_node_path_to_goal() == best_path
+    assert_planner_consistent(rrt)
+
+    # Asking for more than there is leaves only the root and the best path
+    rrt.evict(len(rrt.tree), visualize=False)
+    assert sorted(rrt.tree.nodes().tolist()) == sorted(best_path)
+    assert_planner_consistent(rrt)
+
+
+def test_node_budget_is_respected():
+    random.seed(0)
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    rrt.node_budget = 500
+    for _ in range(3000):
+        rrt.step(visualize=False)
+        assert len(rrt.tree) <= rrt.node_budget
+    assert rrt.evictions > 0
+    assert rrt.best_goal_node is not None
+    assert_planner_consistent(rrt)
+
+    rrt.step_batch(200, visualize=False)
+    assert len(rrt.tree) <= rrt.node_budget
+    assert_planner_consistent(rrt)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from motion_planning.rrt.neighbor_index import BruteForceIndex, GridIndex
+from motion_planning.rrt.tree import Tree
+
+
+def random_tree(rng: np.random.Generator, dim: int, size: int, side: float) -> Tree:
+    tree = Tree((0.0,) * dim)
+    for point in rng.uniform(0, side, (size - 1, dim)).tolist():
+        tree.add(point, tree.root, 1.0)
+    return tree
+
+
+def squared_distance(tree: Tree, node: int, point: np.ndarray) -> float:
+    offset = tree.points[node] - point
+    return float(offset @ offset)
+
+
+@pytest.mark.parametrize(
+    "dim, size, side",
+    [
+        (2, 50, 100),
+        (2, 3000, 100),
+        (2, 3000, 1000),
+        (3, 3000, 100),
+        (6, 3000, 60),
+        (6, 20000, 30),
+    ],
+)
+def test_grid_matches_brute_force(dim, size, side):
+    rng = np.random.default_rng(dim * size)
+    tree = random_tree(rng, dim, size, side)
+    nodes = tree.nodes()
+    grid, brute_force = GridIndex(tree), BruteForceIndex(tree)
+    # Half in one batch, half one at a time, then remove a fifth
+    for index in (grid, brute_force):
+        index.insert_many(nodes[: size // 2])
+        for node in nodes[size // 2 :].tolist():
+            index.insert(node)
+    for node in rng.choice(nodes, size // 5, replace=False).tolist():
+        grid.remove(node)
+        brute_force.remove(node)
+    assert len(grid) == len(brute_force)
+
+    queries = rng.uniform(-10, side + 10, (100, dim))
+    for query in queries:
+        point = tuple(query.tolist())
+        # Ties can pick different nodes at the same distance
+        assert squared_distance(tree, grid.nearest(point), query) == pytest.approx(
+            squared_distance(tree, brute_force.nearest(point), query)
+        )
+        for radius in (5.0, 20.0):
+            assert sorted(grid.within(point, radius)) == sorted(
+                brute_force.within(point, radius)
+            )
+        low, high = tuple((query - 15).tolist()), tuple((query + 25).tolist())
+        assert sorted(grid.within_box(low, high)) == sorted(
+            brute_force.within_box(low, high)
+        )
+    for query, a, b in zip(
+        queries, grid.nearest_batch(queries), brute_force.nearest_batch(queries)
+    ):
+        assert squared_distance(tree, a, query) == pytest.approx(
+            squared_distance(tree, b, query)
+        )
+
+
+@pytest.mark.parametrize("index", [GridIndex, BruteForceIndex])
+def test_empty_index(index):
+    tree = Tree((1.0, 2.0, 3.0))
+    neighbor_index = index(tree)
+    assert neighbor_index.nearest((0.0, 0.0, 0.0)) is None
+    assert neighbor_index.within((1.0, 2.0, 3.0), 5.0) == []
+    assert len(neighbor_index) == 0
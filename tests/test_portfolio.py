@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from motion_planning.config.rrt_config import (
+    AGENT_START_POSITION,
+    GOAL_POSITION,
+    OBSTACLES,
+)
+from motion_planning.rrt import portfolio
+from motion_planning.rrt.portfolio import PlannerConfig, _run_worker, plan_portfolio
+from motion_planning.rrt.rrt_star import RRTStar
+
+
+def test_needs_a_budget_with_first_solution():
+    with pytest.raises(ValueError):
+        plan_portfolio(
+            AGENT_START_POSITION,
+            GOAL_POSITION,
+            [PlannerConfig(seed=0)],
+            first_solution=True,
+        )
+
+
+def test_worker_leaves_global_random_state_alone():
+    random.seed(1)
+    state = random.getstate()
+    result = _run_worker(
+        AGENT_START_POSITION,
+        GOAL_POSITION,
+        OBSTACLES,
+        PlannerConfig(seed=0),
+        200,
+        None,
+        False,
+        None,
+    )
+    assert random.getstate() == state
+
+    # Same path as a planner seeded through the global random module
+    random.seed(0)
+    rrt = RRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    for _ in range(200):
+        rrt.step(visualize=False)
+    assert result.nodes == len(rrt.tree)
+    assert result.path == rrt.best_path_to_goal()
+
+
+def test_step_budget_without_manager(monkeypatch):
+    def no_manager():
+        raise AssertionError("started a manager without first_solution")
+
+    monkeypatch.setattr(portfolio, "Manager", no_manager)
+    configs = [PlannerConfig(seed=0), PlannerConfig(seed=1)]
+    first = plan_portfolio(
+        AGENT_START_POSITION, GOAL_POSITION, configs, max_steps=300, workers=2
+    )
+    second = plan_portfolio(
+        AGENT_START_POSITION, GOAL_POSITION, configs, max_steps=300, workers=2
+    )
+    assert [result.steps for result in first.results] == [300, 300]
+    assert [result.path for result in first.results] == [
+        result.path for result in second.results
+    ]
+
+
+def test_first_solution_stops_with_step_budget():
+    result = plan_portfolio(
+        AGENT_START_POSITION,
+        GOAL_POSITION,
+        [PlannerConfig(seed=0)],
+        max_steps=20000,
+        first_solution=True,
+        workers=1,
+    )
+    assert result.best is not None
+    assert result.best.steps < 20000
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from motion_planning.rrt.realtime import RealtimePlanner
+
+
+class FailingRRT(AnytimeRRTStar):
+    """
+    Planner whose step raises after a number of steps.
+    """
+
+    def __init__(self, *args, fail_after: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_after = fail_after
+        self.steps = 0
+
+    def step(self, visualize: bool = True):
+        self.steps += 1
+        if self.steps > self.fail_after:
+            raise RuntimeError("step failed")
+        return super().step(visualize)
+
+
+def test_commits_trajectories():
+    random.seed(0)
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION)
+    with RealtimePlanner(rrt) as planner:
+        snapshot = planner.next_trajectory(budget=30)
+    assert snapshot.trajectory_number == 1
+    assert snapshot.trajectory[0] == AGENT_START_POSITION
+    assert snapshot.cost_to_goal < float("inf")
+
+
+def test_step_error_is_raised_to_the_controller():
+    random.seed(0)
+    planner = RealtimePlanner(FailingRRT(AGENT_START_POSITION, GOAL_POSITION))
+    planner.start()
+    with pytest.raises(RuntimeError, match="step failed"):
+        planner.next_trajectory(budget=30)
+    with pytest.raises(RuntimeError, match="step failed"):
+        planner.snapshot()
+    with pytest.raises(RuntimeError, match="step failed"):
+        planner.stop()
+
+
+def test_step_error_is_raised_when_leaving_with_block():
+    random.seed(0)
+    rrt = FailingRRT(AGENT_START_POSITION, GOAL_POSITION, fail_after=0)
+    with pytest.raises(RuntimeError, match="step failed"):
+        with RealtimePlanner(rrt) as planner:
+            planner._thread.join()
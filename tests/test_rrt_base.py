@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.rrt import RRT
+from tests.checks import assert_planner_consistent
+
+
+def grow(seed: int, steps: int) -> RRT:
+    random.seed(seed)
+    rrt = RRT(AGENT_START_POSITION, GOAL_POSITION)
+    for _ in range(steps):
+        rrt.step(visualize=False)
+    return rrt
+
+
+def test_load_tree_reroots_at_start(tmp_path):
+    path = str(tmp_path / "tree.bin")
+    grow(0, 1000).save_tree(path)
+    rrt = RRT(AGENT_START_POSITION, GOAL_POSITION)
+    rrt.load_tree(path, start=(12, 12))
+    assert rrt.tree.point(rrt.tree.root) == (12, 12)
+    assert rrt.agent_pos == (12, 12)
+
+
+def test_load_tree_keeps_old_tree_when_reroot_fails(tmp_path):
+    path = str(tmp_path / "tree.bin")
+    grow(0, 500).save_tree(path)
+    rrt = grow(1, 3000)
+    assert rrt.best_goal_node is not None
+    tree, goal_nodes = rrt.tree, set(rrt.goal_nodes)
+    best_path = rrt.best_path_to_goal()
+
+    # Inside the first obstacle, so unreachable from any node
+    with pytest.raises(ValueError):
+        rrt.load_tree(path, start=(50, 30))
+
+    assert rrt.tree is tree
+    assert rrt.goal_nodes == goal_nodes
+    assert rrt.best_path_to_goal() == best_path
+    assert len(rrt.neighbor_index) == len(tree)
+    rrt.step(visualize=False)
+
+
+def test_remove_node_and_slot_reuse_keep_planner_consistent():
+    rrt = grow(2, 2000)
+    assert rrt.goal_nodes
+    rng = random.Random(2)
+    for _ in range(300):
+        leaves = [
+            node
+            for node in rrt.tree.nodes().tolist()
+            if not rrt.tree.children(node) and node != rrt.tree.root
+        ]
+        # Take out the best goal node some of the time
+        if rrt.best_goal_node in leaves and rng.random() < 0.2:
+            rrt.remove_node(rrt.best_goal_node)
+        else:
+            rrt.remove_node(rng.choice(leaves))
+    assert_planner_consistent(rrt)
+    num_free, end, size = len(rrt.tree.free), rrt.tree.end, len(rrt.tree)
+    for _ in range(500):
+        rrt.step(visualize=False)
+    # New nodes went into the freed slots before new ones
+    added = len(rrt.tree) - size
+    assert added > num_free
+    assert rrt.tree.free == []
+    assert rrt.tree.end == end + added - num_free
+    assert_planner_consistent(rrt)
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from motion_planning.config.rrt_config import AGENT_START_POSITION, GOAL_POSITION
+from motion_planning.rrt.anytime_rrt_star import AnytimeRRTStar
+from motion_planning.rrt.rrt_connect import RRTConnect
+
+# Walls all the way around the goal region, so no path to it exists
+WALLED_GOAL = [
+    ((80, 80), 20, 2),
+    ((80, 80), 2, 20),
+    ((80, 98), 20, 2),
+    ((98, 80), 2, 20),
+]
+
+
+def test_connects_to_goal():
+    random.seed(0)
+    rrt = RRTConnect(AGENT_START_POSITION, GOAL_POSITION)
+    assert rrt.step_until_connected()
+    path = rrt.best_path_to_goal()
+    assert path[0] == AGENT_START_POSITION
+    assert rrt._is_in_goal(path[-1])
+
+
+def test_goal_inside_obstacle_raises():
+    # Inside the first obstacle of the default map
+    with pytest.raises(ValueError):
+        RRTConnect(AGENT_START_POSITION, ((30, 25), (40, 35)))
+
+
+def test_step_until_connected_gives_up_without_path():
+    random.seed(0)
+    rrt = RRTConnect(AGENT_START_POSITION, GOAL_POSITION, obstacles=WALLED_GOAL)
+    assert not rrt.step_until_connected(max_steps=500)
+    assert rrt.best_goal_node is None
+
+
+def test_step_until_found_goal_with_connect_gives_up_without_path():
+    random.seed(0)
+    rrt = AnytimeRRTStar(AGENT_START_POSITION, GOAL_POSITION, obstacles=WALLED_GOAL)
+    assert not rrt.step_until_found_goal(connect=True)
+    assert rrt.best_goal_node is None
+    assert len(rrt.tree) == 1
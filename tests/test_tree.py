@@ -0,0 +1,107 @@
+from math import dist
+import json
+
+import numpy as np
+import pytest
+
+from motion_planning.rrt.tree import NO_NODE, Tree
+from tests.checks import assert_tree_consistent
+
+
+def write_v1_tree(path: str, points, parents, costs) -> None:
+    """
+    Write a tree of the given nodes, none of them removed, in the version 1
+    format: a 2D tree with separate x and y arrays.
+    """
+    first_child = [NO_NODE] * len(points)
+    next_sibling = [NO_NODE] * len(points)
+    prev_sibling = [NO_NODE] * len(points)
+    for node in reversed(range(1, len(points))):
+        parent = parents[node]
+        if first_child[parent] != NO_NODE:
+            next_sibling[node] = first_child[parent]
+            prev_sibling[first_child[parent]] = node
+        first_child[parent] = node
+    arrays = [
+        np.array([x for x, _ in points], dtype="<f8"),
+        np.array([y for _, y in points], dtype="<f8"),
+        np.array(costs, dtype="<f8"),
+        np.array(parents, dtype="<i4"),
+        np.array(first_child, dtype="<i4"),
+        np.array(next_sibling, dtype="<i4"),
+        np.array(prev_sibling, dtype="<i4"),
+        np.ones(len(points), dtype="|b1"),
+        np.zeros(0, dtype="<i4"),
+    ]
+    header = json.dumps({"end": len(points), "size": len(points), "root": 0})
+    with open(path, "wb") as f:
+        f.write(b"RRTTREE\x01")
+        f.write(len(header).to_bytes(4, "little"))
+        f.write(header.encode())
+        for array in arrays:
+            f.write(bytes(-f.tell() % 64))
+            f.write(array.tobytes())
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_load_reads_version_1_files(tmp_path, mmap):
+    path = str(tmp_path / "tree.bin")
+    points = [(10.0, 10.0), (13.0, 14.0), (10.0, 15.0), (16.0, 18.0)]
+    parents = [NO_NODE, 0, 0, 1]
+    write_v1_tree(path, points, parents, [0.0, 5.0, 5.0, 10.0])
+
+    tree = Tree.load(path, mmap)
+
+    assert tree.dim == 2
+    assert [tree.point(node) for node in tree.nodes()] == points
+    assert sorted(tree.children(0)) == [1, 2]
+    assert tree.path_from_root(3) == [0, 1, 3]
+    assert tree.cost[3] == 10.0
+    node = tree.add((20.0, 20.0), 3, 15.0)
+    assert tree.point(node) == (20.0, 20.0)
+
+
+def test_load_rejects_unsupported_versions(tmp_path):
+    path = tmp_path / "tree.bin"
+    path.write_bytes(b"RRTTREE\x07" + bytes(64))
+    with pytest.raises(ValueError, match="unsupported version 7"):
+        Tree.load(str(path))
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "tree.bin"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError, match="not a saved tree"):
+        Tree.load(str(path))
+
+
+def test_links_and_costs_stay_consistent_with_free_slot_reuse():
+    rng = np.random.default_rng(0)
+    # Small capacity, so the tree also grows along the way
+    tree = Tree((50.0, 50.0), capacity=4)
+    for step in range(2000):
+        nodes = tree.nodes().tolist()
+        action = rng.random()
+        if action < 0.55 or len(nodes) < 3:
+            parent = int(rng.choice(nodes))
+            point = tuple(rng.uniform(0, 100, 2).tolist())
+            cost = tree.cost[parent] + dist(tree.point(parent), point)
+            expected = tree.free[-1] if tree.free else tree.end
+            assert tree.add(point, parent, cost) == expected
+            assert tree.children(expected) == []
+        elif action < 0.85:
+            # Remove a subtree, children before parents, as planners do
+            node = int(rng.choice([node for node in nodes if node != tree.root]))
+            for removed in tree.subtree(node)[::-1]:
+                tree.remove(removed)
+        else:
+            # Move a node under another node outside its subtree
+            node = int(rng.choice([node for node in nodes if node != tree.root]))
+            subtree = set(tree.subtree(node))
+            parent = int(rng.choice([node for node in nodes if node not in subtree]))
+            cost = tree.cost[parent] + dist(tree.point(parent), tree.point(node))
+            tree.set_parent(node, parent)
+            tree.shift_subtree_costs(node, cost - tree.cost[node])
+        if step % 50 == 0:
+            assert_tree_consistent(tree)
+    assert_tree_consistent(tree)